@@ -1,149 +1,564 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-import requests
+from http_client import get_http_client
+from fetch_engine import LookupEngine
+from lookup_cache import LookupCache, normalize_title
+from parsers import (
+    RavenscansStreamParser, parse_ravenscans_page, parse_anime_page, use_fast_parser, use_stream_parser,
+    anime_id_from_watch_url, parse_anime_episode_list, use_episode_list
+)
+from database import create_database_manager
+from jobs import JobManager, JobQueueFullError
+from sources import SourceAdapter, SourceRegistry
+from cover_cache import CoverCache, CoverNotFoundError
 from bs4 import BeautifulSoup
 import re
-import time
 import os
+import json
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 app = Flask(__name__)
 
+# MangaDex toplu sorgularında istek başına en fazla ID sayısı
+MANGADEX_BATCH_SIZE = 100
+# Toplu bölüm listesinde grup başına en fazla istek (bulunamayanlar tekil sorguya düşer)
+MANGADEX_BATCH_MAX_REQUESTS = int(os.environ.get('MANGADEX_BATCH_MAX_REQUESTS', 5))
+
+# Manga kaynak sorgulama modları; API varsayılanı düşük gecikme için hedge,
+# scheduler ise sıralı (sequential) modda kalır
+LOOKUP_MODES = ('sequential', 'hedge', 'race')
+API_LOOKUP_MODE = os.environ.get('API_LOOKUP_MODE', 'hedge')
+
+# Toplu sorgularda opsiyonel streaming cevap formatları
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+# GET /api/jobs/<id>?wait= ile long-poll'da beklenebilecek en uzun süre (saniye).
+# Bekleme süresince sync gunicorn worker'ı meşgul kalır; daha uzun long-poll
+# için gthread worker'ları (--worker-class gthread --threads N) kullanılmalı
+JOB_MAX_WAIT = float(os.environ.get('JOB_MAX_WAIT', 5))
+
+# Sonuçlara yerel kapak/thumbnail adresi eklenir (COVER_CACHE=false ile kapatılır)
+COVER_CACHE_ENABLED = os.environ.get('COVER_CACHE', 'true').lower() == 'true'
+COVER_MAX_AGE = int(os.environ.get('COVER_MAX_AGE', 7 * 24 * 3600))
+COVER_KEY_PATTERN = re.compile(r'^[0-9a-f]{20}$')
+
 # CORS ayarları - tüm originlere izin ver
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 
 class MangaScraper:
-    def __init__(self):
+    def __init__(self, http_client=None, cache=None, db_manager=None):
+        self.http = http_client or get_http_client()
+        self.cache = cache or LookupCache(name='manga')
+        # MangaDex ID'lerini kalıcı saklamak için (opsiyonel)
+        self.db_manager = db_manager
+        # Başlık bazlı en son başarılı kaynak: {normalized_title: kaynak_adı}
+        self.source_affinity = {}
+        self._affinity_lock = threading.Lock()
+        # Hedge/race modunda kaynakları paralel sorgulamak için
+        self.hedge_delay = float(os.environ.get('HEDGE_DELAY', 1.0))
+        self._race_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('RACE_MAX_WORKERS', 8)),
+            thread_name_prefix='source-race'
+        )
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        
+        # Kaynaklar (kayıt sırası = varsayılan deneme sırası). Scanlation
+        # sitesine karşı düşük, MangaDex API'sine karşı daha yüksek bütçe
+        self.sources = SourceRegistry(self.http.rate_limiter)
+        self.sources.register(SourceAdapter(
+            'ravenscans', 'ravenscans.org',
+            fetch=self._try_ravenscans,
+            parse=self._parse_ravenscans_page,
+            max_concurrency=2, rate=2, burst=4
+        ))
+        self.sources.register(SourceAdapter(
+            'mangadex', 'api.mangadex.org',
+            fetch=self._try_mangadex,
+            batch=self.get_latest_chapters_batch,
+            batch_filter=self._is_mangadex_backed,
+            max_concurrency=8, rate=5, burst=5
+        ))
+    
+    @staticmethod
+    def ravenscans_slug(manga_name):
+        """Manga adını Raven Scans URL slug'ına çevirir"""
+        return manga_name.lower().replace(' ', '-').replace(':', '')
     
     def _try_ravenscans(self, manga_name):
         """Raven Scans sitesinden veri çeker"""
         try:
-            manga_slug = manga_name.lower().replace(' ', '-').replace(':', '')
+            manga_slug = self.ravenscans_slug(manga_name)
             url = f"https://ravenscans.org/manga/{manga_slug}/"
             
-            response = requests.get(url, headers=self.headers, timeout=10)
+            # Sayfa değişmediyse (304 / aynı içerik) önceki parse sonucu döner
+            parse = self.sources.get('ravenscans').parse
+            # Bölüm listesi ve kapak bulununca sayfanın geri kalanı indirilmez
+            stream_parser = RavenscansStreamParser(manga_slug) if use_stream_parser() else None
+            status, result = self.http.get_parsed(
+                url,
+                lambda response: parse(response.content, manga_slug),
+                headers=self.headers,
+                stream_parser=stream_parser
+            )
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Manga kapak görselini bul
-                image_url = None
-                img_tag = soup.find('img', class_=re.compile('wp-post-image|attachment'))
-                if not img_tag:
-                    img_tag = soup.find('img', attrs={'loading': 'lazy'})
-                if img_tag:
-                    image_url = img_tag.get('src') or img_tag.get('data-src')
-                    if image_url and not image_url.startswith('http'):
-                        image_url = f"https://ravenscans.org{image_url}"
+            if status == 200 and result:
+                return result
+        except Exception as e:
+            pass
+        return None, None, None
+    
+    def _parse_ravenscans_page(self, content, manga_slug):
+        """Raven Scans manga sayfasını parse eder"""
+        if use_fast_parser():
+            return parse_ravenscans_page(content, manga_slug)
+        return self._parse_ravenscans_soup(content, manga_slug)
+    
+    def _parse_ravenscans_soup(self, content, manga_slug):
+        """Raven Scans sayfasını BeautifulSoup ile parse eder (PARSER_MODE=soup)"""
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Manga kapak görselini bul
+        image_url = None
+        img_tag = soup.find('img', class_=re.compile('wp-post-image|attachment'))
+        if not img_tag:
+            img_tag = soup.find('img', attrs={'loading': 'lazy'})
+        if img_tag:
+            image_url = img_tag.get('src') or img_tag.get('data-src')
+            if image_url and not image_url.startswith('http'):
+                image_url = f"https://ravenscans.org{image_url}"
+        
+        chapters = soup.find_all('a', href=re.compile(f'/{manga_slug}-chapter-'))
+        
+        if chapters:
+            # En yüksek bölüm numarasını bul
+            latest_chapter_num = None
+            latest_chapter_url = None
+            
+            for chapter_link in chapters:
+                chapter_text = chapter_link.get_text()
+                chapter_url = chapter_link.get('href')
                 
-                chapters = soup.find_all('a', href=re.compile(f'/{manga_slug}-chapter-'))
+                # Chapter numarasını bul
+                match = re.search(r'Chapter\s+(\d+(?:\.\d+)?)', chapter_text, re.IGNORECASE)
+                if not match:
+                    match = re.search(r'(\d+(?:\.\d+)?)', chapter_text)
                 
-                if chapters:
-                    # En yüksek bölüm numarasını bul
-                    latest_chapter_num = None
-                    latest_chapter_url = None
+                if match:
+                    chapter_num = float(match.group(1))
                     
-                    for chapter_link in chapters:
-                        chapter_text = chapter_link.get_text()
-                        chapter_url = chapter_link.get('href')
-                        
-                        # Chapter numarasını bul
-                        match = re.search(r'Chapter\s+(\d+(?:\.\d+)?)', chapter_text, re.IGNORECASE)
-                        if not match:
-                            match = re.search(r'(\d+(?:\.\d+)?)', chapter_text)
-                        
-                        if match:
-                            chapter_num = float(match.group(1))
-                            
-                            # En yüksek bölümü sakla
-                            if latest_chapter_num is None or chapter_num > latest_chapter_num:
-                                latest_chapter_num = chapter_num
-                                latest_chapter_url = chapter_url
-                    
-                    if latest_chapter_num:
-                        # Tam URL'i oluştur
-                        if latest_chapter_url and not latest_chapter_url.startswith('http'):
-                            latest_chapter_url = f"https://ravenscans.org{latest_chapter_url}"
-                        
-                        # Integer olarak döndür
-                        return str(int(latest_chapter_num)), latest_chapter_url, image_url
-        except Exception as e:
-            pass
+                    # En yüksek bölümü sakla
+                    if latest_chapter_num is None or chapter_num > latest_chapter_num:
+                        latest_chapter_num = chapter_num
+                        latest_chapter_url = chapter_url
+            
+            if latest_chapter_num:
+                # Tam URL'i oluştur
+                if latest_chapter_url and not latest_chapter_url.startswith('http'):
+                    latest_chapter_url = f"https://ravenscans.org{latest_chapter_url}"
+                
+                # Integer olarak döndür
+                return str(int(latest_chapter_num)), latest_chapter_url, image_url
+        
         return None, None, None
     
     def _try_mangadex(self, manga_name):
         """MangaDex API'sini kullanır - Yedek yöntem"""
         try:
-            search_url = "https://api.mangadex.org/manga"
-            params = {
-                'title': manga_name,
-                'limit': 5,
-                'contentRating[]': ['safe', 'suggestive', 'erotica'],
-                'order[relevance]': 'desc',
-                'includes[]': ['cover_art']
-            }
-            response = requests.get(search_url, params=params, timeout=10)
+            title_key = normalize_title(manga_name)
+            resolved = self._resolve_mangadex_id(manga_name)
+            if not resolved:
+                return None, None, None
             
-            if response.status_code == 200:
-                data = response.json()
-                if data['data']:
-                    for manga in data['data']:
-                        titles = manga['attributes']['title']
-                        alt_titles = manga['attributes'].get('altTitles', [])
-                        
-                        all_titles = list(titles.values())
-                        for alt in alt_titles:
-                            all_titles.extend(alt.values())
-                        
-                        if any(manga_name.lower() in title.lower() for title in all_titles):
-                            manga_id = manga['id']
-                            
-                            # Kapak görselini al
-                            image_url = None
-                            relationships = manga.get('relationships', [])
-                            for rel in relationships:
-                                if rel['type'] == 'cover_art':
-                                    cover_filename = rel['attributes'].get('fileName')
-                                    if cover_filename:
-                                        image_url = f"https://uploads.mangadex.org/covers/{manga_id}/{cover_filename}"
-                                    break
-                            
-                            chapters_url = f"https://api.mangadex.org/manga/{manga_id}/feed"
-                            chapters_params = {
-                                'limit': 1,
-                                'order[chapter]': 'desc',
-                                'translatedLanguage[]': ['en'],
-                                'includeFutureUpdates': '0'
-                            }
-                            time.sleep(0.5)
-                            chapters_response = requests.get(chapters_url, params=chapters_params, timeout=10)
-                            
-                            if chapters_response.status_code == 200:
-                                chapters_data = chapters_response.json()
-                                if chapters_data['data']:
-                                    chapter_num = chapters_data['data'][0]['attributes'].get('chapter')
-                                    chapter_id = chapters_data['data'][0]['id']
-                                    if chapter_num:
-                                        chapter_url = f"https://mangadex.org/chapter/{chapter_id}"
-                                        return chapter_num, chapter_url, image_url
-                            break
+            manga_id, cover_filename, from_store = resolved
+            status, chapter_num, chapter_url = self._fetch_mangadex_feed(manga_id)
+            
+            # Kayıtlı ID artık geçersizse (silinmiş/birleştirilmiş) bir kez yeniden çözümle
+            if status == 404 and from_store and self.db_manager:
+                self.db_manager.remove_mangadex_id(title_key)
+                resolved = self._resolve_mangadex_id(manga_name)
+                if not resolved:
+                    return None, None, None
+                manga_id, cover_filename, _ = resolved
+                status, chapter_num, chapter_url = self._fetch_mangadex_feed(manga_id)
+            
+            if chapter_num:
+                image_url = None
+                if cover_filename:
+                    image_url = f"https://uploads.mangadex.org/covers/{manga_id}/{cover_filename}"
+                return chapter_num, chapter_url, image_url
         except Exception as e:
             pass
         return None, None, None
     
-    def get_latest_chapter(self, manga_name):
+    def _resolve_mangadex_id(self, manga_name):
+        """
+        Başlığın MangaDex ID'sini döner
+        Önce kalıcı kayda bakar, yoksa arama yapıp sonucu kaydeder
+        Returns: (manga_id, cover_filename, kayıttan_mı) veya None
+        """
+        title_key = normalize_title(manga_name)
+        if self.db_manager:
+            stored = self.db_manager.get_mangadex_id(title_key)
+            if stored and stored.get('manga_id'):
+                return stored['manga_id'], stored.get('cover_filename'), True
+        
+        search_url = "https://api.mangadex.org/manga"
+        params = {
+            'title': manga_name,
+            'limit': 5,
+            'contentRating[]': ['safe', 'suggestive', 'erotica'],
+            'order[relevance]': 'desc',
+            'includes[]': ['cover_art']
+        }
+        response = self.http.get(search_url, params=params)
+        
+        if response.status_code == 200:
+            data = response.json()
+            for manga in data.get('data') or []:
+                titles = manga['attributes']['title']
+                alt_titles = manga['attributes'].get('altTitles', [])
+                
+                all_titles = list(titles.values())
+                for alt in alt_titles:
+                    all_titles.extend(alt.values())
+                
+                if any(manga_name.lower() in title.lower() for title in all_titles):
+                    manga_id = manga['id']
+                    
+                    # Kapak dosya adını al
+                    cover_filename = None
+                    for rel in manga.get('relationships', []):
+                        if rel['type'] == 'cover_art':
+                            cover_filename = rel.get('attributes', {}).get('fileName')
+                            break
+                    
+                    if self.db_manager:
+                        self.db_manager.set_mangadex_id(title_key, manga_id, cover_filename)
+                    return manga_id, cover_filename, False
+        return None
+    
+    def _fetch_mangadex_feed(self, manga_id):
+        """
+        Manganın en son İngilizce bölümünü feed'den alır
+        Returns: (status_code, chapter_num, chapter_url)
+        """
+        chapters_url = f"https://api.mangadex.org/manga/{manga_id}/feed"
+        chapters_params = {
+            'limit': 1,
+            'order[chapter]': 'desc',
+            'translatedLanguage[]': ['en'],
+            'includeFutureUpdates': '0'
+        }
+        chapters_response = self.http.get(chapters_url, params=chapters_params)
+        
+        if chapters_response.status_code == 200:
+            chapters_data = chapters_response.json()
+            if chapters_data['data']:
+                chapter_num = chapters_data['data'][0]['attributes'].get('chapter')
+                chapter_id = chapters_data['data'][0]['id']
+                if chapter_num:
+                    return 200, chapter_num, f"https://mangadex.org/chapter/{chapter_id}"
+        return chapters_response.status_code, None, None
+    
+    def get_latest_chapters_batch(self, manga_names):
+        """
+        MangaDex ID'si bilinen başlıkların son bölümlerini toplu sorgular
+        
+        100'lük gruplar halinde /chapter?manga[]=...&translatedLanguage[]=en
+        &order[chapter]=desc ile bölüm listesi alınır; her manganın listede
+        ilk görülen bölümü, tekil feed sorgusundaki gibi en yüksek İngilizce
+        bölümdür. Bir sayfayı çok bölümlü birkaç başlık doldurabildiğinden
+        bulunan başlıklar sonraki istekten çıkarılır (grup başına en fazla
+        MANGADEX_BATCH_MAX_REQUESTS istek).
+        
+        Returns: {manga_name: sonuç} - bulunamayanlar sözlükte yer almaz,
+        çağıran taraf bunlar için tekil sorguya düşmelidir
+        """
+        if not self.db_manager:
+            return {}
+        
+        titles_by_id = {}  # {manga_id: [(manga_name, cover_filename)]}
+        for manga_name in manga_names:
+            stored = self.db_manager.get_mangadex_id(normalize_title(manga_name))
+            if stored and stored.get('manga_id'):
+                titles_by_id.setdefault(stored['manga_id'], []).append((manga_name, stored.get('cover_filename')))
+        
+        results = {}
+        manga_ids = list(titles_by_id)
+        limit = 100
+        for start in range(0, len(manga_ids), MANGADEX_BATCH_SIZE):
+            remaining = manga_ids[start:start + MANGADEX_BATCH_SIZE]
+            try:
+                for _ in range(MANGADEX_BATCH_MAX_REQUESTS):
+                    response = self.http.get("https://api.mangadex.org/chapter", params={
+                        'manga[]': remaining,
+                        'translatedLanguage[]': ['en'],
+                        'order[chapter]': 'desc',
+                        'includeFutureUpdates': '0',
+                        'contentRating[]': ['safe', 'suggestive', 'erotica'],
+                        'limit': limit
+                    })
+                    if response.status_code != 200:
+                        break
+                    
+                    data = response.json().get('data') or []
+                    latest = {}  # {manga_id: en yüksek bölüm}
+                    for chapter in data:
+                        manga_id = next((rel['id'] for rel in chapter.get('relationships', []) if rel['type'] == 'manga'), None)
+                        if manga_id in titles_by_id and manga_id not in latest:
+                            latest[manga_id] = chapter
+                    
+                    for manga_id, chapter in latest.items():
+                        chapter_num = chapter['attributes'].get('chapter')
+                        # Numarasız (oneshot) bölüm tekil sorguda da bulunamaz; oraya bırakılır
+                        if not chapter_num:
+                            continue
+                        for manga_name, cover_filename in titles_by_id[manga_id]:
+                            results[manga_name] = {
+                                'name': manga_name,
+                                'chapter': chapter_num,
+                                'found': True,
+                                'url': f"https://mangadex.org/chapter/{chapter['id']}",
+                                'image': f"https://uploads.mangadex.org/covers/{manga_id}/{cover_filename}" if cover_filename else None
+                            }
+                    
+                    remaining = [manga_id for manga_id in remaining if manga_id not in latest]
+                    # Sayfa dolmadıysa kalan başlıkların İngilizce bölümü yok
+                    if not remaining or not latest or len(data) < limit:
+                        break
+            except Exception as e:
+                print(f"MangaDex toplu sorgu hatası: {e}")
+        return results
+    
+    def _is_mangadex_backed(self, manga_name):
+        """
+        Başlık MangaDex'ten mi takip ediliyor?
+        Yalnızca kaynağı açıkça MangaDex olan ve MangaDex ID'si kayıtlı
+        başlıklar için True döner. Hedge/race modunda ya da Raven Scans
+        kesintisinde Raven başlıkları için de ID kaydedilebildiğinden kayıtlı
+        ID tek başına yeterli değildir; kaynağı bilinmeyenler tekil sorguya
+        düşer ve orada kaynakları belirlenir.
+        """
+        if not self.db_manager or not self.db_manager.get_mangadex_id(normalize_title(manga_name)):
+            return False
+        return self.get_source_affinity(manga_name) == 'mangadex'
+    
+    def get_latest_chapters(self, manga_names, engine=None, mode=None, max_age=None):
+        """
+        Birden fazla manga için son bölümleri alır, sonuçlar giriş sırasıyla döner
+        
+        Cache'te taze olanlar doğrudan döner; MangaDex'ten takip edilen
+        başlıklar birden fazlaysa toplu sorgulanır; kalanlar tekil olarak
+        (engine verilmişse paralel, `mode` ile) sorgulanır.
+        max_age verilirse cache'ten yalnızca en fazla o kadar saniyelik
+        kayıtlar okunur, bayat kayıt dönmez (scheduler: bildirim kararı eski
+        veriyle verilmesin); alınan sonuçlar yine cache'e yazılır.
+        """
+        results = [None] * len(manga_names)
+        for index, result in self.iter_latest_chapters(manga_names, engine, mode, max_age):
+            results[index] = result
+        return results
+    
+    def iter_latest_chapters(self, manga_names, engine=None, mode=None, max_age=None):
+        """
+        get_latest_chapters ile aynı sorguları yapar, ancak (index, sonuç)
+        çiftlerini hazır oldukça üretir: önce cache'tekiler, sonra MangaDex
+        toplu sorgusu, en son tekil sorgular tamamlanma sırasıyla
+        """
+        pending = []
+        for index, manga_name in enumerate(manga_names):
+            cached = self.cache.get(normalize_title(manga_name), max_age)
+            if cached is not None:
+                yield index, dict(cached, name=manga_name)
+            else:
+                pending.append(index)
+        
+        # Toplu sorgu destekleyen kaynaklar (MangaDex) birden fazla uygun başlığı tek seferde alır
+        for adapter in self.sources:
+            if not adapter.supports_batch or not self.http.is_available(adapter.host):
+                continue
+            eligible = [index for index in pending if adapter.batch_filter(manga_names[index])]
+            if len(eligible) <= 1:
+                continue
+            batch = adapter.run_batch([manga_names[index] for index in eligible])
+            resolved = set()
+            for index in eligible:
+                result = batch.get(manga_names[index])
+                if result:
+                    self.cache.set(normalize_title(manga_names[index]), result)
+                    self._set_source_affinity(manga_names[index], adapter.name)
+                    resolved.add(index)
+                    yield index, result
+            pending = [index for index in pending if index not in resolved]
+        
+        names = [manga_names[index] for index in pending]
+        lookup = lambda name: self.get_latest_chapter(name, mode=mode, max_age=max_age)
+        if engine:
+            # Her başlık ilk denenecek kaynağın şeridinde (bütçesinde) çalışır
+            for position, result in engine.map_as_completed(lookup, names, route=self.primary_source):
+                yield pending[position], result
+        else:
+            for index, name in zip(pending, names):
+                yield index, lookup(name)
+    
+    def get_latest_chapter(self, manga_name, mode=None, max_age=None):
         """
         Belirtilen manga/manhwa'nın son bölüm numarasını alır
+        Sonuçlar normalize edilmiş başlığa göre cache'lenir
+        
+        mode:
+            - 'sequential' (varsayılan): Kaynaklar sırayla denenir
+            - 'hedge': Tercih edilen kaynak HEDGE_DELAY saniyede cevap
+              vermezse diğer kaynak da paralel başlatılır
+            - 'race': Tüm kaynaklar aynı anda sorgulanır
+        
+        max_age verilirse yalnızca en fazla o kadar saniyelik kayıt kullanılır,
+        değilse (bayat kayıt dahil) kaynaktan çekilir
+        """
+        key = normalize_title(manga_name)
+        loader = lambda: self._fetch_latest_chapter(manga_name, mode)
+        if max_age is None:
+            result = self.cache.get_or_load(key, loader)
+        else:
+            result = self.cache.get_recent_or_load(key, loader, max_age)
+        return dict(result, name=manga_name)
+    
+    def _source_order(self, manga_name):
         """
-        # Önce Raven Scans'i dene
-        chapter, url, image = self._try_ravenscans(manga_name)
+        Denenecek kaynak sırasını döner
+        Başlık için en son başarılı olan kaynak öne alınır, varsayılan
+        sıra Raven Scans -> MangaDex
+        """
+        preferred = self.get_source_affinity(manga_name)
+        order = self.sources.names()
+        if preferred in order:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        return order
+    
+    def primary_source(self, manga_name):
+        """Başlık için ilk denenecek, devresi açık olmayan kaynağın adı"""
+        for source in self._source_order(manga_name):
+            if self.http.is_available(self.sources.get(source).host):
+                return source
+        return None
+    
+    def get_source_affinity(self, manga_name):
+        """
+        Başlık için en son başarılı olan kaynağın adını döner
+        Bellekte yoksa (yeniden başlatma sonrası) kayıtlı son bölümün URL'inden çıkarılır
+        """
+        with self._affinity_lock:
+            affinity = self.source_affinity.get(normalize_title(manga_name))
+        if affinity or not self.db_manager:
+            return affinity
+        return self.source_from_url((self.db_manager.get_manga_chapter(manga_name) or {}).get('url'))
+    
+    @staticmethod
+    def source_from_url(url):
+        """Bölüm URL'inin ait olduğu kaynağın adı"""
+        url = url or ''
+        if 'ravenscans.org' in url:
+            return 'ravenscans'
+        if 'mangadex.org' in url:
+            return 'mangadex'
+        return None
+    
+    def _set_source_affinity(self, manga_name, source):
+        with self._affinity_lock:
+            self.source_affinity[normalize_title(manga_name)] = source
+    
+    def _race_sources(self, manga_name, sources, hedge_delay):
+        """
+        Kaynakları paralel sorgular, ilk geçerli sonucu döner
+        Aynı anda biten sonuçlar arasında sıradaki (tercih edilen) kaynak kazanır
+        Returns: (kaynak, sonuç, tercih edilen kaynağın future'ı)
+        """
+        futures = {}
+        remaining = list(sources)
+        
+        def launch():
+            source = remaining.pop(0)
+            future = self._race_executor.submit(self.sources.get(source).run, manga_name)
+            futures[future] = source
         
-        # Bulamazsa MangaDex'i dene
-        if not chapter:
-            chapter, url, image = self._try_mangadex(manga_name)
+        launch()
+        preferred = next(iter(futures))
+        if hedge_delay <= 0:
+            while remaining:
+                launch()
+        
+        while futures:
+            timeout = hedge_delay if remaining else None
+            done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            # Zaman aşımı (ya da başarısız sonuç) -> sıradaki kaynağı da başlat
+            if remaining and (not done or all(not future.result()[0] for future in done)):
+                launch()
+            
+            valid = [future for future in done if future.result()[0]]
+            if valid:
+                winner = min(valid, key=lambda future: sources.index(futures[future]))
+                return futures[winner], winner.result(), preferred
+            
+            for future in done:
+                del futures[future]
+        
+        return None, (None, None, None), preferred
+    
+    def _settle_race_affinity(self, manga_name, preferred, winner, preferred_future):
+        """
+        Yarışı tercih edilen kaynaktan farklı bir kaynak yalnızca daha hızlı cevap
+        verdiği için kazandıysa kayıt değişmez (ör. 2 rps ile sınırlı Raven'daki
+        başlık MangaDex'e taşınmasın). Tercih edilen kaynak bulamadıysa ya da hata
+        verdiyse - yarış bittikten sonra olsa bile - kazanan kaynağa geçilir.
+        """
+        if winner == preferred:
+            self._set_source_affinity(manga_name, winner)
+            return
+        
+        def settle(future):
+            if future.exception() is None and future.result()[0]:
+                return
+            key = normalize_title(manga_name)
+            with self._affinity_lock:
+                # Bu arada başka bir sorgu kaydı değiştirdiyse ona dokunulmaz
+                if self.source_affinity.get(key) in (None, preferred):
+                    self.source_affinity[key] = winner
+        
+        preferred_future.add_done_callback(settle)
+    
+    def _fetch_latest_chapter(self, manga_name, mode=None):
+        """Kaynaklardan son bölümü çeker (cache'siz)"""
+        chapter, url, image = None, None, None
+        mode = mode or 'sequential'
+        
+        # Devresi açık kaynaklar için timeout beklemeden atla
+        sources = [
+            source for source in self._source_order(manga_name)
+            if self.http.is_available(self.sources.get(source).host)
+        ]
+        
+        if mode in ('race', 'hedge') and len(sources) > 1:
+            hedge_delay = 0 if mode == 'race' else self.hedge_delay
+            source, (chapter, url, image), preferred = self._race_sources(manga_name, sources, hedge_delay)
+            if chapter:
+                self._settle_race_affinity(manga_name, sources[0], source, preferred)
+        else:
+            for source in sources:
+                chapter, url, image = self.sources.get(source).run(manga_name)
+                if chapter:
+                    self._set_source_affinity(manga_name, source)
+                    break
         
         return {
             'name': manga_name,
@@ -154,15 +569,28 @@ class MangaScraper:
         }
 
 
-scraper = MangaScraper()
+db_manager = create_database_manager()
+scraper = MangaScraper(db_manager=db_manager)
 
 
 class AnimeScraper:
-    def __init__(self):
+    def __init__(self, http_client=None, cache=None, db_manager=None):
+        self.http = http_client or get_http_client()
+        self.cache = cache or LookupCache(name='anime')
+        # Çözümlenmiş izleme sayfası URL'lerini kalıcı saklamak için (opsiyonel)
+        self.db_manager = db_manager
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         self.base_url = "https://9animetv.to"
+        
+        self.sources = SourceRegistry(self.http.rate_limiter)
+        self.sources.register(SourceAdapter(
+            '9animetv', '9animetv.to',
+            fetch=self._try_9animetv,
+            parse=self._parse_anime_content,
+            max_concurrency=2, rate=2, burst=4
+        ))
     
     def _clean_anime_name(self, anime_name):
         """Anime adını URL format\u0131na çevirir"""
@@ -176,53 +604,117 @@ class AnimeScraper:
     def _try_9animetv(self, anime_name):
         """9animetv.to sitesinden anime bilgilerini çeker"""
         try:
-            # Önce arama yap
-            search_url = f"{self.base_url}/filter"
-            params = {
-                'keyword': anime_name
-            }
+            title_key = normalize_title(anime_name)
             
-            response = requests.get(search_url, headers=self.headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Arama sonuçlarından ilk anime'yi bul
-                anime_items = soup.find_all('div', class_='item')
-                
-                if not anime_items:
-                    # Alternatif: Doğrudan anime sayfasına git
-                    cleaned_name = self._clean_anime_name(anime_name)
-                    direct_url = f"{self.base_url}/watch/{cleaned_name}"
-                    response = requests.get(direct_url, headers=self.headers, timeout=10)
+            # Daha önce çözümlenmiş izleme sayfası varsa doğrudan ona git
+            if self.db_manager:
+                stored = self.db_manager.get_anime_watch_url(title_key)
+                if stored and stored.get('url'):
+                    # Poster kayıtlıysa yalnızca küçük bölüm listesi parçası okunur
+                    if stored.get('image') and use_episode_list():
+                        episode, episode_url = self._fetch_episode_list(stored['url'])
+                        if episode:
+                            return episode, episode_url, stored['image']
                     
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        return self._parse_anime_page(soup, anime_name)
-                    return None, None, None
-                
-                # İlk sonucun linkini al
-                first_item = anime_items[0]
-                anime_link = first_item.find('a', class_='name')
-                
-                if anime_link:
-                    anime_url = anime_link.get('href')
-                    if not anime_url.startswith('http'):
-                        anime_url = f"{self.base_url}{anime_url}"
-                    
-                    # Anime sayfasına git
-                    time.sleep(0.5)
-                    response = requests.get(anime_url, headers=self.headers, timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        return self._parse_anime_page(soup, anime_name)
+                    status, result = self._fetch_anime_page(stored['url'], anime_name)
+                    if status not in (404, 410):
+                        if status == 200 and result[0]:
+                            self.db_manager.set_anime_watch_url(title_key, stored['url'], image=result[2])
+                        return result
+                    # Sayfa kaldırılmış/taşınmış - kaydı silip yeniden ara
+                    print(f"ℹ Kayıtlı izleme sayfası geçersiz, yeniden aranıyor: {anime_name}")
+                    self.db_manager.remove_anime_watch_url(title_key)
+            
+            anime_url = self._resolve_watch_url(anime_name)
+            if anime_url:
+                status, result = self._fetch_anime_page(anime_url, anime_name)
+                if status == 200 and result[0] and self.db_manager:
+                    self.db_manager.set_anime_watch_url(title_key, anime_url, image=result[2])
+                return result
             
         except Exception as e:
             print(f"9animetv scraping hatası: {e}")
         
         return None, None, None
     
+    def _resolve_watch_url(self, anime_name):
+        """Arama sayfasından anime'nin izleme sayfası URL'ini bulur"""
+        # Önce arama yap
+        search_url = f"{self.base_url}/filter"
+        params = {
+            'keyword': anime_name
+        }
+        
+        response = self.http.get(search_url, headers=self.headers, params=params)
+        
+        if response.status_code == 200:
+            soup = BeautifulSoup(response.content, 'html.parser')
+            
+            # Arama sonuçlarından ilk anime'yi bul
+            anime_items = soup.find_all('div', class_='item')
+            
+            if not anime_items:
+                # Alternatif: Doğrudan anime sayfasına git
+                cleaned_name = self._clean_anime_name(anime_name)
+                return f"{self.base_url}/watch/{cleaned_name}"
+            
+            # İlk sonucun linkini al
+            first_item = anime_items[0]
+            anime_link = first_item.find('a', class_='name')
+            
+            if anime_link:
+                anime_url = anime_link.get('href')
+                if not anime_url.startswith('http'):
+                    anime_url = f"{self.base_url}{anime_url}"
+                return anime_url
+        
+        return None
+    
+    def _fetch_anime_page(self, anime_url, anime_name):
+        """
+        İzleme sayfasını conditional GET ile çekip parse eder
+        Returns: (status_code, (episode, url, image))
+        """
+        parse = self.sources.get('9animetv').parse
+        status, result = self.http.get_parsed(
+            anime_url,
+            lambda response: parse(response.content, anime_name),
+            headers=self.headers
+        )
+        if status == 200 and result:
+            return status, result
+        return status, (None, None, None)
+    
+    def _fetch_episode_list(self, anime_url):
+        """
+        İzleme sayfasının kendisinin yüklediği /ajax/episode/list/<id> parçasından
+        son bölümü okur (uzun serilerde tam sayfanın küçük bir kısmı)
+        Returns: (episode, url) - parça alınamazsa (None, None)
+        """
+        anime_id = anime_id_from_watch_url(anime_url)
+        if not anime_id:
+            return None, None
+        headers = dict(self.headers, Referer=anime_url)
+        headers['X-Requested-With'] = 'XMLHttpRequest'
+        try:
+            status, result = self.http.get_parsed(
+                f"{self.base_url}/ajax/episode/list/{anime_id}",
+                lambda response: parse_anime_episode_list(response.content, self.base_url),
+                headers=headers
+            )
+        except Exception as e:
+            print(f"ℹ Bölüm listesi alınamadı, izleme sayfası okunacak: {e}")
+            return None, None
+        if status == 200 and result:
+            return result
+        return None, None
+    
+    def _parse_anime_content(self, content, anime_name):
+        """İzleme sayfası içeriğini hızlı parser ya da BeautifulSoup ile parse eder"""
+        if use_fast_parser():
+            return parse_anime_page(content, self.base_url)
+        return self._parse_anime_page(BeautifulSoup(content, 'html.parser'), anime_name)
+    
     def _parse_anime_page(self, soup, anime_name):
         """Anime sayfasını parse eder"""
         try:
@@ -284,11 +776,27 @@ class AnimeScraper:
         
         return None, None, None
     
-    def get_latest_episode(self, anime_name):
+    def primary_source(self, anime_name):
+        """LookupEngine şeridi için kaynak adı (tek kaynak)"""
+        return '9animetv'
+    
+    def get_latest_episode(self, anime_name, max_age=None):
         """
         Belirtilen anime'nin son bölüm numarasını alır
+        Sonuçlar normalize edilmiş başlığa göre cache'lenir
+        (max_age verilirse yalnızca en fazla o kadar saniyelik kayıt kullanılır)
         """
-        episode, url, image = self._try_9animetv(anime_name)
+        key = normalize_title(anime_name)
+        loader = lambda: self._fetch_latest_episode(anime_name)
+        if max_age is None:
+            result = self.cache.get_or_load(key, loader)
+        else:
+            result = self.cache.get_recent_or_load(key, loader, max_age)
+        return dict(result, name=anime_name)
+    
+    def _fetch_latest_episode(self, anime_name):
+        """Kaynaktan son bölümü çeker (cache'siz)"""
+        episode, url, image = self.sources.get('9animetv').run(anime_name)
         
         return {
             'name': anime_name,
@@ -299,7 +807,85 @@ class AnimeScraper:
         }
 
 
-anime_scraper = AnimeScraper()
+anime_scraper = AnimeScraper(db_manager=db_manager)
+lookup_engine = LookupEngine()
+job_manager = JobManager()
+
+# Her kaynağa kendi eşzamanlılık bütçesi kadar thread'lik şerit
+for adapter in list(scraper.sources) + list(anime_scraper.sources):
+    lookup_engine.set_lane(adapter.name, adapter.max_concurrency)
+
+cover_cache = CoverCache() if COVER_CACHE_ENABLED else None
+
+
+def _attach_cover(result):
+    """
+    Sonuca yerel kapak adresini ekler: "thumbnail": "/api/covers/<anahtar>?w=160"
+    Görsel burada indirilmez, ilk istekte bir kez indirilip saklanır
+    """
+    if not cover_cache:
+        return result
+    image = result.get('image')
+    thumbnail = f"/api/covers/{cover_cache.register(image)}?w={cover_cache.widths[0]}" if image else None
+    return dict(result, thumbnail=thumbnail)
+
+
+def _attach_covers(results):
+    """(index, sonuç) iterator'ündeki sonuçlara kapak adresini ekler"""
+    for index, result in results:
+        yield index, _attach_cover(result)
+
+
+def _requested_stream_format(data):
+    """
+    İstenen streaming formatını döner (None: normal JSON cevap)
+    ?stream=ndjson|sse, body'de "stream" ya da Accept başlığı ile seçilir
+    """
+    stream = request.args.get('stream') or data.get('stream')
+    if not stream:
+        accept = request.headers.get('Accept', '')
+        for name, mimetype in STREAM_FORMATS.items():
+            if mimetype in accept:
+                return name
+        return None
+    return str(stream).lower()
+
+
+def _stream_results(results, total, stream_format):
+    """
+    (index, sonuç) çiftlerini hazır oldukça NDJSON satırı ya da SSE olayı
+    olarak yazar, en sonda özet kaydı gönderir
+    """
+    def encode(event, record):
+        payload = json.dumps(record, ensure_ascii=False)
+        if stream_format == 'sse':
+            return f"event: {event}\ndata: {payload}\n\n"
+        return payload + "\n"
+    
+    def generate():
+        started = time.monotonic()
+        returned = 0
+        found = 0
+        summary = {'done': True, 'total': total}
+        try:
+            for index, result in results:
+                returned += 1
+                found += 1 if result.get('found') else 0
+                yield encode('result', dict(result, index=index))
+        except Exception as e:
+            summary['error'] = str(e)
+        summary.update({
+            'returned': returned,
+            'found': found,
+            'elapsed': round(time.monotonic() - started, 3)
+        })
+        yield encode('done', summary)
+    
+    return Response(generate(), mimetype=STREAM_FORMATS[stream_format], headers={
+        'Cache-Control': 'no-cache',
+        # Reverse proxy'lerin (nginx vb.) cevabı tamponlamasını engeller
+        'X-Accel-Buffering': 'no'
+    })
 
 
 @app.route('/', methods=['GET'])
@@ -325,6 +911,14 @@ def home():
                 'request_body': {
                     'anime_list': ['One Piece', 'Jujutsu Kaisen', 'Demon Slayer']
                 }
+            },
+            'jobs': {
+                'method': 'POST',
+                'url': '/api/jobs',
+                'description': 'Büyük listeyi arka planda sorgula, sonuçları GET /api/jobs/<id> ile al',
+                'request_body': {
+                    'manga_list': ['Solo Leveling', 'One Piece', 'Lookism']
+                }
             }
         }
     })
@@ -339,6 +933,22 @@ def health_check():
     })
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Lookup cache ve HTTP istemci istatistiklerini döner"""
+    return jsonify({
+        'manga': scraper.cache.get_stats(),
+        'anime': anime_scraper.cache.get_stats(),
+        'http': scraper.http.get_stats(),
+        'jobs': job_manager.get_stats(),
+        'sources': {
+            'manga': scraper.sources.get_stats(),
+            'anime': anime_scraper.sources.get_stats()
+        },
+        'covers': cover_cache.get_stats() if cover_cache else None
+    })
+
+
 @app.route('/api/manga/latest', methods=['POST', 'OPTIONS'])
 def get_latest_chapters():
     """
@@ -349,6 +959,11 @@ def get_latest_chapters():
         "manga_list": ["Solo Leveling", "One Piece", "Lookism"]
     }
     
+    Opsiyonel: ?stream=ndjson veya ?stream=sse (ya da Accept:
+    application/x-ndjson / text/event-stream) ile her başlığın sonucu hazır
+    olduğu anda "index" alanıyla birlikte gönderilir, en sonda
+    {"done": true, "total", "returned", "found", "elapsed"} özeti gelir.
+    
     Response:
     [
         {
@@ -391,12 +1006,28 @@ def get_latest_chapters():
                 'error': 'manga_list boş olamaz'
             }), 400
         
-        # Her manga için bilgileri al
-        results = []
-        for manga_name in manga_list:
-            result = scraper.get_latest_chapter(manga_name)
-            results.append(result)
-            time.sleep(0.5)  # Rate limiting
+        # Kaynak sorgulama modu: istek bazında seçilebilir (varsayılan hedge)
+        mode = request.args.get('mode') or data.get('mode') or API_LOOKUP_MODE
+        if mode not in LOOKUP_MODES:
+            return jsonify({
+                'error': f"mode şunlardan biri olmalı: {', '.join(LOOKUP_MODES)}"
+            }), 400
+        
+        stream_format = _requested_stream_format(data)
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({
+                'error': f"stream şunlardan biri olmalı: {', '.join(STREAM_FORMATS)}"
+            }), 400
+        if stream_format:
+            return _stream_results(
+                _attach_covers(scraper.iter_latest_chapters(manga_list, lookup_engine, mode=mode)),
+                len(manga_list),
+                stream_format
+            )
+        
+        # Mangaları paralel sorgula (hız sınırı host bazlı uygulanır,
+        # MangaDex'teki başlıklar toplu sorgulanır)
+        results = [_attach_cover(result) for result in scraper.get_latest_chapters(manga_list, lookup_engine, mode=mode)]
         
         # Sadece manga listesini döndür
         return jsonify(results)
@@ -417,6 +1048,9 @@ def get_latest_episodes():
         "anime_list": ["One Piece", "Jujutsu Kaisen", "Demon Slayer"]
     }
     
+    Opsiyonel: ?stream=ndjson veya ?stream=sse ile sonuçlar hazır oldukça
+    gönderilir (bkz. /api/manga/latest).
+    
     Response:
     [
         {
@@ -459,12 +1093,23 @@ def get_latest_episodes():
                 'error': 'anime_list boş olamaz'
             }), 400
         
-        # Her anime için bilgileri al
-        results = []
-        for anime_name in anime_list:
-            result = anime_scraper.get_latest_episode(anime_name)
-            results.append(result)
-            time.sleep(0.5)  # Rate limiting
+        stream_format = _requested_stream_format(data)
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({
+                'error': f"stream şunlardan biri olmalı: {', '.join(STREAM_FORMATS)}"
+            }), 400
+        if stream_format:
+            return _stream_results(
+                _attach_covers(lookup_engine.map_as_completed(
+                    anime_scraper.get_latest_episode, anime_list, route=anime_scraper.primary_source
+                )),
+                len(anime_list),
+                stream_format
+            )
+        
+        # Animeleri paralel sorgula (hız sınırı host bazlı uygulanır)
+        results = lookup_engine.map_ordered(anime_scraper.get_latest_episode, anime_list, route=anime_scraper.primary_source)
+        results = [_attach_cover(result) for result in results]
         
         # Anime listesini döndür
         return jsonify(results)
@@ -475,6 +1120,149 @@ def get_latest_episodes():
         }), 500
 
 
+@app.route('/api/jobs', methods=['POST', 'OPTIONS'])
+def create_job():
+    """
+    Büyük bir manga/anime listesi için arka plan işi başlatır
+    
+    Request Body (biri):
+    {"manga_list": ["Solo Leveling", "One Piece"], "mode": "sequential"}
+    {"anime_list": ["One Piece", "Jujutsu Kaisen"]}
+    
+    Response (202):
+    {"id": "...", "type": "manga", "status": "queued", "total": 2, "poll_url": "/api/jobs/..."}
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        data = request.get_json()
+        
+        if not data or ('manga_list' not in data and 'anime_list' not in data):
+            return jsonify({
+                'error': 'manga_list veya anime_list parametresi gerekli'
+            }), 400
+        
+        kind = 'manga' if 'manga_list' in data else 'anime'
+        items = data[f'{kind}_list']
+        
+        if not isinstance(items, list):
+            return jsonify({
+                'error': f'{kind}_list bir array olmalı'
+            }), 400
+        
+        if len(items) == 0:
+            return jsonify({
+                'error': f'{kind}_list boş olamaz'
+            }), 400
+        
+        if kind == 'manga':
+            mode = request.args.get('mode') or data.get('mode') or API_LOOKUP_MODE
+            if mode not in LOOKUP_MODES:
+                return jsonify({
+                    'error': f"mode şunlardan biri olmalı: {', '.join(LOOKUP_MODES)}"
+                }), 400
+            run = lambda names: _attach_covers(scraper.iter_latest_chapters(names, lookup_engine, mode=mode))
+        else:
+            run = lambda names: _attach_covers(lookup_engine.map_as_completed(
+                anime_scraper.get_latest_episode, names, route=anime_scraper.primary_source
+            ))
+        
+        try:
+            job = job_manager.submit(kind, items, run)
+        except JobQueueFullError as e:
+            return jsonify({
+                'error': str(e)
+            }), 503
+        
+        return jsonify({
+            'id': job['id'],
+            'type': job['type'],
+            'status': job['status'],
+            'total': job['total'],
+            'poll_url': f"/api/jobs/{job['id']}"
+        }), 202
+    
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    İşin durumunu ve (kısmi) sonuçlarını döner
+    
+    Query:
+        - wait: Long-poll; iş bitene ya da yeni sonuç gelene kadar en fazla
+          bu kadar saniye bekler (üst sınır JOB_MAX_WAIT)
+        - since: Long-poll'da istemcinin zaten gördüğü tamamlanmış sonuç sayısı
+    
+    Response:
+    {"id": "...", "status": "running", "total": 40, "completed": 12,
+     "results": [{...}, null, ...], "error": null, ...}
+    Henüz tamamlanmamış başlıklar için results içinde null döner.
+    """
+    try:
+        wait_seconds = float(request.args.get('wait', 0))
+        since = int(request.args.get('since', 0))
+        # nan/inf sınır karşılaştırmalarından geçip worker'ı iş bitene kadar bekletir
+        if not math.isfinite(wait_seconds):
+            raise ValueError(wait_seconds)
+    except ValueError:
+        return jsonify({
+            'error': 'wait ve since sayı olmalı'
+        }), 400
+    wait_seconds = min(max(wait_seconds, 0), JOB_MAX_WAIT)
+    
+    if wait_seconds:
+        job = job_manager.wait(job_id, wait_seconds, since)
+    else:
+        job = job_manager.get(job_id)
+    
+    if not job:
+        return jsonify({
+            'error': 'İş bulunamadı veya süresi doldu'
+        }), 404
+    return jsonify(job)
+
+
+@app.route('/api/covers/<key>', methods=['GET'])
+def get_cover(key):
+    """
+    Kapak görselini yerel cache'ten sunar (ilk istekte kaynaktan bir kez indirilir)
+    
+    Query:
+        - w: Thumbnail genişliği (COVER_THUMB_WIDTHS içinden); verilmezse orijinal
+    
+    Cevaplar uzun süreli Cache-Control ve içerik hash'inden üretilen ETag ile
+    döner; If-None-Match eşleşirse 304.
+    """
+    if not cover_cache:
+        return jsonify({'error': 'Kapak cache devre dışı'}), 404
+    if not COVER_KEY_PATTERN.match(key):
+        return jsonify({'error': 'Geçersiz kapak anahtarı'}), 404
+    
+    width = request.args.get('w', type=int)
+    if width and width not in cover_cache.widths:
+        return jsonify({
+            'error': f"w şunlardan biri olmalı: {', '.join(str(w) for w in cover_cache.widths)}"
+        }), 400
+    
+    try:
+        path, mimetype, etag = cover_cache.get(key, width)
+    except CoverNotFoundError:
+        return jsonify({'error': 'Kapak bulunamadı'}), 404
+    except Exception as e:
+        print(f"⚠ Kapak alınamadı ({key}): {e}")
+        return jsonify({'error': 'Kapak kaynaktan alınamadı'}), 502
+    
+    response = send_file(path, mimetype=mimetype, etag=etag, conditional=True, max_age=COVER_MAX_AGE)
+    response.cache_control.public = True
+    return response
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("MANGA & ANIME NOTIFICATOR API")
@@ -493,6 +1281,9 @@ if __name__ == '__main__':
     print("\n✨ Endpoints:")
     print("  POST /api/manga/latest  - Manga listesi gönder, son bölümleri al")
     print("  POST /api/anime/latest  - Anime listesi gönder, son bölümleri al")
+    print("  POST /api/jobs          - Büyük listeyi arka planda sorgula")
+    print("  GET  /api/jobs/<id>     - İş durumu ve sonuçları")
+    print("  GET  /api/covers/<key>  - Cache'lenmiş kapak / thumbnail")
     print("\n📝 Örnek Request Body:")
     print('  Manga: {"manga_list": ["Solo Leveling", "One Piece"]}')
     print('  Anime: {"anime_list": ["One Piece", "Jujutsu Kaisen"]}')
@@ -0,0 +1,587 @@
+"""
+Lokal stub sunucuya karşı performans ölçümleri
+
+Kullanım:
+    python benchmark.py http [--requests 200] [--latency 0.0]
+    python benchmark.py engine [--titles 40] [--latency 0.2]
+    python benchmark.py parse [--fixtures DIR] [--iterations 50]
+    python benchmark.py record --out DIR --manga "One Piece" --anime "Naruto" [--stub]
+    python benchmark.py scraper [--fixtures DIR] [--replay] [--latency 0.05] [--error-rate 0.0]
+    python benchmark.py http2 [--titles 80] [--workers 8] [--latency 0.05]
+    python benchmark.py store [--users 10000] [--titles 20] [--writes 200]
+
+parse için --fixtures dizinine kaydedilmiş gerçek sayfalar konulabilir:
+    ravenscans_<manga-slug>.html, 9anime_<isim>.html, 9anime-list_<isim>.json
+Dizin verilmezse stub sunucunun ürettiği sentetik sayfalar kullanılır.
+
+record, scraper'ları gerçek sitelere (ya da --stub ile stub'a) karşı
+çalıştırıp cevapları http_recorder formatında kaydeder. scraper bu
+kayıtları stub sunucular üzerinden (ağ gecikmesi/hata oranı ile) ya da
+--replay ile doğrudan HttpClient içinden oynatarak ölçüm yapar.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import requests
+
+from fetch_engine import LookupEngine
+from http_client import HttpClient
+from http_recorder import HttpRecorder
+from lookup_cache import LookupCache
+from rate_limiter import HostRateLimiter
+from http2_transport import http2_available
+from stub_server import SITE_HOSTS, H2StubServer, StubServer
+
+
+# record'un kaydettiği başlık listesi (fixture dizininde)
+TITLES_MANIFEST = 'titles.json'
+
+
+def _start_stub_sites(latency=0.0, jitter=0.0, error_rate=0.0, fixtures_dir=None):
+    """Üç stub siteyi başlatır ve HttpClient için host yönlendirmelerini döner"""
+    servers = {
+        host: StubServer(site, latency=latency, jitter=jitter, error_rate=error_rate,
+                         fixtures_dir=fixtures_dir, seed=0).start()
+        for site, host in SITE_HOSTS.items()
+    }
+    overrides = {host: server.base_url for host, server in servers.items()}
+    return servers, overrides
+
+
+def _stop_stub_sites(servers):
+    for server in servers.values():
+        server.stop()
+
+
+def _timed(func, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return time.perf_counter() - start
+
+
+def bench_http(args):
+    """Modül seviyesindeki requests.get ile havuzlu HttpClient'ı karşılaştırır"""
+    server = StubServer('ravenscans', latency=args.latency).start()
+    client = HttpClient(rate_limiter=HostRateLimiter(default_rate=0))
+    try:
+        url = f"{server.base_url}/manga/one-piece/"
+
+        before = _timed(lambda i: requests.get(url, timeout=10).content, args.requests)
+        after = _timed(lambda i: client.get(url).content, args.requests)
+
+        print("=" * 60)
+        print(f"HTTP İSTEMCİ BENCHMARK ({args.requests} istek, stub: {server.base_url})")
+        print("=" * 60)
+        print(f"  requests.get (havuzsuz): {before:.3f}s  ({args.requests / before:.1f} istek/s)")
+        print(f"  HttpClient (keep-alive): {after:.3f}s  ({args.requests / after:.1f} istek/s)")
+        print(f"  Hızlanma: {before / after:.2f}x")
+        print("  Not: stub düz HTTP kullanır; gerçek sitelerde TLS el sıkışması farkı daha da büyütür")
+        print("=" * 60)
+    finally:
+        client.close()
+        server.stop()
+
+
+def bench_engine(args):
+    """Eski sıralı döngü + sleep(0.5) ile paralel LookupEngine'i karşılaştırır"""
+    from api import MangaScraper
+
+    servers, overrides = _start_stub_sites(args.latency)
+    titles = [f"Stub Manga {i}" for i in range(args.titles)]
+    try:
+        scraper = MangaScraper(http_client=HttpClient(host_overrides=overrides))
+        start = time.perf_counter()
+        before_results = []
+        for title in titles:
+            before_results.append(scraper.get_latest_chapter(title))
+            time.sleep(0.5)
+        before = time.perf_counter() - start
+
+        raven = servers['ravenscans.org']
+        raven_before = raven.request_count
+
+        # Yeni istemci: taze token-bucket ile aynı host hız sınırı
+        scraper = MangaScraper(http_client=HttpClient(host_overrides=overrides))
+        engine = LookupEngine()
+        start = time.perf_counter()
+        after_results = engine.map_ordered(scraper.get_latest_chapter, titles)
+        after = time.perf_counter() - start
+        engine.shutdown()
+
+        raven_after = raven.request_count - raven_before
+        assert [r['name'] for r in after_results] == titles
+
+        print("=" * 60)
+        print(f"LOOKUP ENGINE BENCHMARK ({args.titles} başlık, stub gecikmesi {args.latency}s)")
+        print("=" * 60)
+        print(f"  Sıralı + sleep(0.5): {before:.2f}s")
+        print(f"  LookupEngine:        {after:.2f}s  ({engine.max_workers} worker)")
+        print(f"  Raven Scans hızı:    {raven_after / after:.2f} istek/s "
+              f"(limit: {scraper.http.rate_limiter.default_rate}/s)")
+        print(f"  Bulunan: {sum(r['found'] for r in after_results)}/{len(titles)}")
+        print("=" * 60)
+    finally:
+        _stop_stub_sites(servers)
+
+
+def _load_parse_fixtures(fixtures_dir):
+    """(tip, isim, içerik) listesi döner"""
+    if not fixtures_dir:
+        from stub_server import render_ravenscans_title_page, render_9anime_watch_page, render_9anime_episode_list
+        return [
+            ('ravenscans', 'one-piece', render_ravenscans_title_page('one-piece').encode('utf-8')),
+            ('9anime', 'one-piece', render_9anime_watch_page('one-piece').encode('utf-8')),
+            ('9anime-list', 'one-piece', json.dumps(render_9anime_episode_list(100)).encode('utf-8')),
+        ]
+
+    fixtures = []
+    paths = glob.glob(os.path.join(fixtures_dir, '*.html')) + glob.glob(os.path.join(fixtures_dir, '*.json'))
+    for path in sorted(paths):
+        kind, _, name = os.path.splitext(os.path.basename(path))[0].partition('_')
+        with open(path, 'rb') as f:
+            fixtures.append((kind, name, f.read()))
+    return fixtures
+
+
+def bench_parse(args):
+    """BeautifulSoup parser'ları ile lxml/XPath parser'larını karşılaştırır"""
+    from api import MangaScraper, AnimeScraper
+    from bs4 import BeautifulSoup
+    from parsers import parse_ravenscans_page, parse_anime_page, parse_anime_episode_list
+
+    manga = MangaScraper()
+    anime = AnimeScraper()
+
+    print("=" * 60)
+    print(f"PARSER MICRO-BENCHMARK ({args.iterations} tekrar)")
+    print("=" * 60)
+    for kind, name, content in _load_parse_fixtures(args.fixtures):
+        if kind == 'ravenscans':
+            soup_parse = lambda: manga._parse_ravenscans_soup(content, name)
+            fast_parse = lambda: parse_ravenscans_page(content, name)
+        elif kind == '9anime':
+            soup_parse = lambda: anime._parse_anime_page(BeautifulSoup(content, 'html.parser'), name)
+            fast_parse = lambda: parse_anime_page(content, anime.base_url)
+        elif kind == '9anime-list':
+            # Bölüm listesi parçasının BeautifulSoup karşılığı yok; boyut ve süre izleme sayfasıyla kıyaslanır
+            list_time = _timed(lambda i: parse_anime_episode_list(content, anime.base_url), args.iterations)
+            print(f"  {kind}/{name} ({len(content) // 1024} KB)")
+            print(f"    regex tarama:  {list_time / args.iterations * 1000:.2f} ms")
+            continue
+        else:
+            continue
+
+        assert soup_parse() == fast_parse(), f"Parser sonuçları farklı: {kind}/{name}"
+        soup_time = _timed(lambda i: soup_parse(), args.iterations) / args.iterations
+        fast_time = _timed(lambda i: fast_parse(), args.iterations) / args.iterations
+        print(f"  {kind}/{name} ({len(content) // 1024} KB)")
+        print(f"    BeautifulSoup: {soup_time * 1000:.2f} ms")
+        print(f"    lxml/XPath:    {fast_time * 1000:.2f} ms  ({soup_time / fast_time:.1f}x)")
+    print("=" * 60)
+
+
+def _load_titles_manifest(fixtures_dir):
+    path = os.path.join(fixtures_dir, TITLES_MANIFEST)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'manga': [], 'anime': []}
+
+
+def bench_record(args):
+    """Scraper'ları çalıştırıp tüm HTTP cevaplarını fixture olarak kaydeder"""
+    from api import MangaScraper, AnimeScraper
+
+    servers, overrides = _start_stub_sites() if args.stub else ({}, None)
+    recorder = HttpRecorder(args.out, 'record')
+    client = HttpClient(host_overrides=overrides, recorder=recorder)
+    try:
+        manga = MangaScraper(http_client=client)
+        anime = AnimeScraper(http_client=client)
+        for name in args.manga:
+            result = manga.get_latest_chapter(name, mode='sequential')
+            print(f"  📚 {name}: {result.get('chapter')} ({'bulundu' if result['found'] else 'bulunamadı'})")
+        for name in args.anime:
+            result = anime.get_latest_episode(name)
+            print(f"  📺 {name}: {result.get('episode')} ({'bulundu' if result['found'] else 'bulunamadı'})")
+    finally:
+        client.close()
+        _stop_stub_sites(servers)
+
+    manifest = _load_titles_manifest(args.out)
+    manifest['manga'] = list(dict.fromkeys(manifest['manga'] + args.manga))
+    manifest['anime'] = list(dict.fromkeys(manifest['anime'] + args.anime))
+    with open(os.path.join(args.out, TITLES_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"✓ {recorder.recorded} cevap kaydedildi: {args.out}")
+
+
+def _percentile(values, percent):
+    """En yakın sıra yöntemiyle yüzdelik"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _measure_lookups(lookup, titles, workers):
+    """
+    Başlıkları LookupEngine ile sorgular
+    Returns: (toplam süre, [gecikme], [cpu süresi], [sonuç])
+
+    CPU süresi sorguyu çalıştıran thread için ölçülür (time.thread_time);
+    stub sunucular aynı process'te çalıştığından process CPU'su kullanılmaz.
+    """
+    samples = []
+
+    def timed_lookup(title):
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        result = lookup(title)
+        samples.append((time.perf_counter() - start, time.thread_time() - cpu_start))
+        return result
+
+    engine = LookupEngine(max_workers=workers)
+    start = time.perf_counter()
+    results = engine.map_ordered(timed_lookup, titles)
+    elapsed = time.perf_counter() - start
+    engine.shutdown()
+    return elapsed, [sample[0] for sample in samples], [sample[1] for sample in samples], results
+
+
+def bench_scraper(args):
+    """MangaScraper ve AnimeScraper için başlık/s, p50/p99 gecikme ve sorgu başına CPU"""
+    from api import MangaScraper, AnimeScraper
+
+    manifest = _load_titles_manifest(args.fixtures) if args.fixtures else {'manga': [], 'anime': []}
+    manga_titles = manifest['manga'] or [f"Stub Manga {i}" for i in range(args.titles)]
+    anime_titles = manifest['anime'] or [f"Stub Anime {i}" for i in range(args.titles)]
+    if args.replay and not args.fixtures:
+        raise SystemExit("--replay için --fixtures gerekli")
+
+    servers = {}
+    if not args.replay:
+        servers, overrides = _start_stub_sites(args.latency, args.jitter, args.error_rate, args.fixtures)
+
+    def make_client():
+        rate_limiter = HostRateLimiter(default_rate=args.rate)
+        if args.replay:
+            return HttpClient(rate_limiter=rate_limiter, recorder=HttpRecorder(args.fixtures, 'replay'))
+        return HttpClient(rate_limiter=rate_limiter, host_overrides=overrides, recorder=False)
+
+    # Her sorgu ağa gitsin diye sonuç cache'i devre dışı
+    def no_cache(name):
+        return LookupCache(name=name, ttl=0, stale_ttl=0, negative_ttl=0)
+
+    source = 'replay (ağsız)' if args.replay else f"stub (gecikme {args.latency}s ± {args.jitter}s, hata %{args.error_rate * 100:g})"
+    print("=" * 60)
+    print(f"SCRAPER BENCHMARK ({args.rounds} tur, {args.workers} worker, kaynak: {source})")
+    print(f"Fixture: {args.fixtures or 'sentetik'}")
+    print("=" * 60)
+    try:
+        suites = [
+            ('MangaScraper', manga_titles,
+             lambda client: MangaScraper(http_client=client, cache=no_cache('manga')),
+             lambda scraper: (lambda name: scraper.get_latest_chapter(name, mode=args.mode))),
+            ('AnimeScraper', anime_titles,
+             lambda client: AnimeScraper(http_client=client, cache=no_cache('anime')),
+             lambda scraper: scraper.get_latest_episode),
+        ]
+        for label, titles, make_scraper, make_lookup in suites:
+            total_elapsed = 0.0
+            latencies, cpu_times, found = [], [], 0
+            requests_per_host = {}
+            for _ in range(args.rounds):
+                # Her tur yeni istemci: conditional GET doğrulayıcıları parse
+                # maliyetini gizlemesin
+                client = make_client()
+                lookup = make_lookup(make_scraper(client))
+                elapsed, round_latencies, round_cpu, results = _measure_lookups(lookup, titles, args.workers)
+                total_elapsed += elapsed
+                latencies.extend(round_latencies)
+                cpu_times.extend(round_cpu)
+                found += sum(1 for result in results if result.get('found'))
+                for host, count in client.get_stats()['requests_per_host'].items():
+                    requests_per_host[host] = requests_per_host.get(host, 0) + count
+                client.close()
+
+            lookups = len(latencies)
+            print(f"  {label} ({len(titles)} başlık x {args.rounds})")
+            print(f"    Hız:        {lookups / total_elapsed:.1f} başlık/s")
+            print(f"    Gecikme:    p50 {_percentile(latencies, 50) * 1000:.1f} ms, "
+                  f"p99 {_percentile(latencies, 99) * 1000:.1f} ms")
+            print(f"    CPU:        {statistics.mean(cpu_times) * 1000:.2f} ms/sorgu")
+            print(f"    Bulunan:    {found}/{lookups}")
+            print(f"    İstekler:   {requests_per_host}")
+        if servers:
+            print(f"  Stub hata cevabı: {sum(server.error_count for server in servers.values())}")
+        print("=" * 60)
+    finally:
+        _stop_stub_sites(servers)
+
+
+def bench_http2(args):
+    """MangaDex sorgularında HTTP/1.1 bağlantı havuzu ile HTTP/2 çoklamayı karşılaştırır"""
+    from api import MangaScraper
+
+    if not http2_available():
+        raise SystemExit("http2 benchmark'ı için httpx[http2] gerekli")
+
+    host = SITE_HOSTS['mangadex']
+    titles = [f"Stub Manga {i}" for i in range(args.titles)]
+    servers = {
+        'HTTP/1.1 (requests)': StubServer('mangadex', latency=args.latency).start(),
+        'HTTP/2 (httpx)': H2StubServer('mangadex', latency=args.latency).start(),
+    }
+
+    print("=" * 60)
+    print(f"HTTP/2 BENCHMARK ({args.titles} MangaDex sorgusu x {args.rounds}, {args.workers} worker, "
+          f"gecikme {args.latency}s)")
+    print("=" * 60)
+    try:
+        for label, server in servers.items():
+            http2_hosts = [host] if isinstance(server, H2StubServer) else []
+            total_elapsed, latencies, cpu_times, found = 0.0, [], [], 0
+            http2_stats = None
+            for _ in range(args.rounds):
+                client = HttpClient(
+                    rate_limiter=HostRateLimiter(default_rate=0),
+                    host_overrides={host: server.base_url},
+                    recorder=False,
+                    http2_hosts=http2_hosts,
+                    http2_prior_knowledge=True
+                )
+                scraper = MangaScraper(http_client=client, cache=LookupCache(name='manga', ttl=0, stale_ttl=0, negative_ttl=0))
+                adapter = scraper.sources.get('mangadex')
+                elapsed, round_latencies, round_cpu, results = _measure_lookups(adapter.run, titles, args.workers)
+                total_elapsed += elapsed
+                latencies.extend(round_latencies)
+                cpu_times.extend(round_cpu)
+                found += sum(1 for result in results if result[0])
+                http2_stats = client.get_stats()['http2']
+                client.close()
+
+            lookups = len(latencies)
+            print(f"  {label}")
+            print(f"    Hız:         {lookups / total_elapsed:.1f} başlık/s")
+            print(f"    Gecikme:     p50 {_percentile(latencies, 50) * 1000:.1f} ms, "
+                  f"p99 {_percentile(latencies, 99) * 1000:.1f} ms")
+            print(f"    CPU:         {statistics.mean(cpu_times) * 1000:.2f} ms/sorgu")
+            print(f"    Bulunan:     {found}/{lookups}")
+            print(f"    Bağlantılar: {server.connection_count} ({server.request_count} istek)")
+            if http2_stats:
+                print(f"    HTTP/2:      {http2_stats['http2_responses']}/{http2_stats['requests']} cevap, "
+                      f"{http2_stats['fallbacks']} HTTP/1.1'e düşüş")
+        print("  Not: stub TLS'siz (h2c) çalışır; gerçek sitelerde HTTP/2'nin asıl kazancı")
+        print("  bağlantı başına TLS el sıkışmasının tek sefere inmesidir")
+        print("=" * 60)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+def _seed_store_json(path, users, titles):
+    """users kullanıcılı, her birinde titles başlık olan database.json üretir"""
+    data = {
+        'users': {
+            f"user{i}": {
+                'password_hash': '',
+                'fcm_token': f"token{i}",
+                'manga_list': [f"Manga {(i + j) % (titles * 10)}" for j in range(titles)],
+                'anime_list': [f"Anime {(i + j) % (titles * 10)}" for j in range(titles // 2)],
+                'created_at': '2025-01-01T00:00:00'
+            }
+            for i in range(users)
+        },
+        'manga_chapters': {f"Manga {j}": {'chapter': '1'} for j in range(titles * 10)},
+        'anime_episodes': {},
+        'mangadex_ids': {},
+        'anime_watch_urls': {},
+        'last_check': None
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def bench_store(args):
+    """DatabaseManager depolarında tek değişikliğin (yazma) maliyeti"""
+    import contextlib
+    import io
+    from database import DatabaseManager
+    from sqlite_database import SQLiteDatabaseManager
+
+    workdir = tempfile.mkdtemp(prefix='store_bench_')
+    json_path = os.path.join(workdir, 'database.json')
+    _seed_store_json(json_path, args.users, args.titles)
+
+    backends = {
+        'json': lambda: DatabaseManager(os.path.join(workdir, 'json', 'database.json'), write_behind=False),
+        'json-write-behind': lambda: DatabaseManager(
+            os.path.join(workdir, 'json-write-behind', 'database.json'), write_behind=True,
+            flush_interval_ms=args.flush_interval
+        ),
+        'json-journal': lambda: DatabaseManager(os.path.join(workdir, 'json-journal', 'database.json'), journal=True),
+        'json-shared': lambda: DatabaseManager(os.path.join(workdir, 'json-shared', 'database.json'), shared=True),
+        'sqlite': lambda: SQLiteDatabaseManager(os.path.join(workdir, 'sqlite', 'database.sqlite3'), json_path),
+    }
+    operations = [
+        ('update_manga_chapter', lambda db, i: db.update_manga_chapter(f"Manga {i % 100}", str(i))),
+        ('add_manga_to_user', lambda db, i: db.add_manga_to_user(f"user{i}", f"Yeni {i}")),
+        ('update_fcm_token', lambda db, i: db.update_fcm_token(f"user{i}", f"yeni{i}")),
+        ('update_last_check', lambda db, i: db.update_last_check()),
+    ]
+
+    print("=" * 60)
+    print(f"DEPO BENCHMARK ({args.users} kullanıcı x {args.titles} başlık, işlem başına {args.writes} yazma)")
+    print(f"JSON boyutu: {os.path.getsize(json_path) // 1024} KB")
+    print("=" * 60)
+    try:
+        for name, factory in backends.items():
+            os.makedirs(os.path.join(workdir, name))
+            if name.startswith('json'):
+                shutil.copy(json_path, os.path.join(workdir, name, 'database.json'))
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                db = factory()
+                load_time = time.perf_counter() - start
+            print(f"  {name} (açılış {load_time * 1000:.0f} ms{', JSON migrasyonu dahil' if name == 'sqlite' else ''})")
+            for label, operation in operations:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    elapsed = _timed(lambda i: operation(db, i), args.writes)
+                print(f"    {label:<22} {elapsed / args.writes * 1000:8.3f} ms/yazma")
+            start = time.perf_counter()
+            db.close()
+            if getattr(db, 'journal', None):
+                print(f"    {'günlük':<22} {db.journal.seq} kayıt, "
+                      f"{os.path.getsize(db.journal.path) // 1024} KB ({db.flushes} snapshot)")
+            elif hasattr(db, 'flushes'):
+                print(f"    {'kapanış flush':<22} {(time.perf_counter() - start) * 1000:8.1f} ms "
+                      f"(toplam {db.flushes} dosya yazımı, {len(operations) * args.writes} değişiklik)")
+        print("=" * 60)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_fanout(args):
+    """Bildirim dağıtımı ve takip edilen başlık listesi: tüm kullanıcı taraması vs abonelik indeksi"""
+    import contextlib
+    import io
+    from database import DatabaseManager
+    from sqlite_database import SQLiteDatabaseManager
+
+    workdir = tempfile.mkdtemp(prefix='fanout_bench_')
+    json_path = os.path.join(workdir, 'database.json')
+    _seed_store_json(json_path, args.users, args.titles)
+    updates = [f"Manga {i % (args.titles * 10)}" for i in range(args.updates)]
+
+    def scan_tokens(db, title):
+        # Eski yöntem: her güncelleme için tüm kullanıcıların listesine bakılır
+        return [user['fcm_token'] for user in db.db['users'].values() if title in user.get('manga_list', [])]
+
+    def scan_tracked(db):
+        tracked = set()
+        for user in db.db['users'].values():
+            tracked.update(user.get('manga_list', []))
+        return list(tracked)
+
+    print("=" * 60)
+    print(f"ABONELİK BENCHMARK ({args.users} kullanıcı x {args.titles} başlık, {args.updates} güncelleme)")
+    print("=" * 60)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            json_db = DatabaseManager(json_path, write_behind=False)
+            load_time = time.perf_counter() - start
+            sqlite_db = SQLiteDatabaseManager(os.path.join(workdir, 'database.sqlite3'), json_path)
+        print(f"  json açılış (indeks kurulumu dahil): {load_time * 1000:.0f} ms")
+        rows = [
+            ('tarama', lambda i: scan_tokens(json_db, updates[i]), lambda i: scan_tracked(json_db)),
+            ('json-indeks', lambda i: json_db.get_subscriber_tokens(updates[i]),
+             lambda i: json_db.get_all_tracked_manga()),
+            ('sqlite', lambda i: sqlite_db.get_subscriber_tokens(updates[i]),
+             lambda i: sqlite_db.get_all_tracked_manga()),
+        ]
+        subscribers = len(json_db.get_subscribers(updates[0]))
+        print(f"  {'yöntem':<12} {'güncelleme başına':>18} {'takip listesi':>14}  (başlık başına ~{subscribers} abone)")
+        for name, fanout, tracked in rows:
+            fanout_time = _timed(fanout, args.updates) / args.updates
+            tracked_time = _timed(tracked, 10) / 10
+            print(f"  {name:<12} {fanout_time * 1000:15.3f} ms {tracked_time * 1000:11.3f} ms")
+        json_db.close()
+        sqlite_db.close()
+        print("=" * 60)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manga Notificator benchmark araçları')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    http_parser = subparsers.add_parser('http', help='Bağlantı havuzu karşılaştırması')
+    http_parser.add_argument('--requests', type=int, default=200)
+    http_parser.add_argument('--latency', type=float, default=0.0)
+    http_parser.set_defaults(func=bench_http)
+
+    engine_parser = subparsers.add_parser('engine', help='Paralel lookup motoru karşılaştırması')
+    engine_parser.add_argument('--titles', type=int, default=40)
+    engine_parser.add_argument('--latency', type=float, default=0.2)
+    engine_parser.set_defaults(func=bench_engine)
+
+    parse_parser = subparsers.add_parser('parse', help='Parser micro-benchmark')
+    parse_parser.add_argument('--fixtures', default=None)
+    parse_parser.add_argument('--iterations', type=int, default=50)
+    parse_parser.set_defaults(func=bench_parse)
+
+    record_parser = subparsers.add_parser('record', help='Scraper cevaplarını fixture olarak kaydet')
+    record_parser.add_argument('--out', default='fixtures')
+    record_parser.add_argument('--manga', nargs='*', default=[])
+    record_parser.add_argument('--anime', nargs='*', default=[])
+    record_parser.add_argument('--stub', action='store_true', help='Gerçek siteler yerine stub sunuculardan kaydet')
+    record_parser.set_defaults(func=bench_record)
+
+    scraper_parser = subparsers.add_parser('scraper', help='Scraper throughput/gecikme/CPU ölçümü')
+    scraper_parser.add_argument('--fixtures', default=None, help='record ile kaydedilmiş dizin')
+    scraper_parser.add_argument('--replay', action='store_true', help='Stub yerine HttpClient içinden oynat (ağsız)')
+    scraper_parser.add_argument('--titles', type=int, default=40, help='Fixture yoksa sentetik başlık sayısı')
+    scraper_parser.add_argument('--rounds', type=int, default=1)
+    scraper_parser.add_argument('--workers', type=int, default=8)
+    scraper_parser.add_argument('--mode', default='sequential', choices=('sequential', 'hedge', 'race'))
+    scraper_parser.add_argument('--rate', type=float, default=0, help='Host başına istek/s (0: sınırsız)')
+    scraper_parser.add_argument('--latency', type=float, default=0.05)
+    scraper_parser.add_argument('--jitter', type=float, default=0.0)
+    scraper_parser.add_argument('--error-rate', type=float, default=0.0)
+    scraper_parser.set_defaults(func=bench_scraper)
+
+    http2_parser = subparsers.add_parser('http2', help='MangaDex için HTTP/1.1 ve HTTP/2 karşılaştırması')
+    http2_parser.add_argument('--titles', type=int, default=80)
+    http2_parser.add_argument('--rounds', type=int, default=3)
+    http2_parser.add_argument('--workers', type=int, default=8)
+    http2_parser.add_argument('--latency', type=float, default=0.05)
+    http2_parser.set_defaults(func=bench_http2)
+
+    store_parser = subparsers.add_parser('store', help='Kullanıcı deposu yazma maliyeti (JSON / SQLite)')
+    store_parser.add_argument('--users', type=int, default=10000)
+    store_parser.add_argument('--titles', type=int, default=20)
+    store_parser.add_argument('--writes', type=int, default=200)
+    store_parser.add_argument('--flush-interval', type=int, default=500, help='write-behind flush aralığı (ms)')
+    store_parser.set_defaults(func=bench_store)
+
+    fanout_parser = subparsers.add_parser('fanout', help='Bildirim dağıtımı: kullanıcı taraması vs abonelik indeksi')
+    fanout_parser.add_argument('--users', type=int, default=10000)
+    fanout_parser.add_argument('--titles', type=int, default=20)
+    fanout_parser.add_argument('--updates', type=int, default=50)
+    fanout_parser.set_defaults(func=bench_fanout)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
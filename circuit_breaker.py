@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Devre açıkken kaynağa istek atılmaya çalışıldığında fırlatılır"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Kaynak bazlı devre kesici
+
+    - closed: İstekler normal şekilde geçer
+    - open: Art arda `failure_threshold` hatadan sonra istekler hiç
+      gönderilmeden reddedilir (timeout beklenmez)
+    - half_open: `reset_timeout` saniye sonra tek bir deneme isteğine izin
+      verilir; başarılıysa devre kapanır, başarısızsa tekrar açılır
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+        self.reset_timeout = reset_timeout or float(os.environ.get('CIRCUIT_RESET_TIMEOUT', 60))
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """İsteğin gönderilip gönderilmeyeceğine karar verir"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def is_available(self) -> bool:
+        """Durumu değiştirmeden kaynağın denenebilir olup olmadığını döner"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✓ Devre kapandı: {self.name}")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"⚠ Devre açıldı: {self.name} ({self.failures} art arda hata)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """Sonucu kaynağa bağlanamayan (ör. kapanışta kesilen) denemenin hakkını geri verir"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'rejected': self.rejected
+            }
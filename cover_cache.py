@@ -0,0 +1,276 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from http_client import get_http_client
+from lookup_cache import SingleFlight
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow yoksa küçük boyutlar yerine orijinal görsel sunulur
+    Image = None
+
+
+class CoverNotFoundError(Exception):
+    """Kayıtlı olmayan bir kapak anahtarı istendiğinde fırlatılır"""
+    pass
+
+
+class CoverCache:
+    """
+    Kapak görsellerinin yerel, içerik adresli (content-addressed) cache'i
+
+    - Sonuçlardaki kaynak görsel URL'i register() ile kısa bir anahtara
+      eşlenir (urls/<anahtar>.json); istemci /api/covers/<anahtar> ister
+    - Görsel ilk istendiğinde kaynaktan bir kez indirilir ve içerik
+      hash'iyle objects/<hash[:2]>/<hash> altına yazılır (aynı görsel
+      farklı URL'lerden gelse de tek kopya tutulur)
+    - Küçük boyutlar (thumbnail) Pillow ile ilk istekte üretilip saklanır
+
+    Her şey dosya sisteminde tutulduğundan tüm gunicorn worker'ları aynı
+    cache'i paylaşır. Görseller toplamı `max_total_bytes`'ı aşınca en uzun
+    süredir sunulmayanlar (dosya mtime'ı, sunuldukça yenilenir) silinir;
+    silinen kapak tekrar istendiğinde yeniden indirilir.
+
+    İndirmeler kaynak host'un bölüm sorgularıyla aynı devre kesiciyi
+    kullanmaz ("covers:<host>"), bozuk bir kapak CDN'i sorguları durdurmaz.
+    """
+
+    # Sunulan dosyanın mtime'ı en fazla bu sıklıkta yenilenir (saniye)
+    TOUCH_INTERVAL = 3600
+
+    def __init__(self, storage_dir=None, http_client=None, widths=None, max_bytes=None, max_total_bytes=None):
+        if storage_dir is None:
+            if os.environ.get('RENDER'):
+                # Render persistent disk (database.json ile aynı disk)
+                storage_dir = os.path.join(os.environ.get('DATABASE_PATH', '/var/data'), 'covers')
+            else:
+                storage_dir = os.environ.get('COVER_CACHE_DIR', 'covers')
+        self.storage_dir = os.path.abspath(storage_dir)
+        self.http = http_client or get_http_client()
+        self.widths = widths or tuple(
+            int(width) for width in os.environ.get('COVER_THUMB_WIDTHS', '160,320').split(',') if width.strip()
+        )
+        self.max_bytes = max_bytes or int(os.environ.get('COVER_MAX_BYTES', 5 * 1024 * 1024))
+        self.thumb_quality = int(os.environ.get('COVER_THUMB_QUALITY', 80))
+        # Toplam disk sınırı (0: sınırsız)
+        if max_total_bytes is None:
+            max_total_bytes = int(os.environ.get('COVER_CACHE_MAX_MB', 512)) * 1024 * 1024
+        self.max_total_bytes = max_total_bytes
+
+        self._registered = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._purge_lock = threading.Lock()
+        self.downloads = 0
+        self.download_errors = 0
+        self.thumbnails = 0
+        self.evictions = 0
+
+        for sub in ('urls', 'objects'):
+            os.makedirs(os.path.join(self.storage_dir, sub), exist_ok=True)
+        self._total_bytes = sum(group[0] for group in self._scan_objects().values()) if self.max_total_bytes else 0
+        if Image is None:
+            print("⚠ Pillow kurulu değil, kapaklar küçültülmeden sunulacak")
+
+    @staticmethod
+    def key_for(url):
+        """Kaynak URL için kısa, sabit anahtar"""
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+    def _url_path(self, key):
+        return os.path.join(self.storage_dir, 'urls', f"{key}.json")
+
+    def _object_path(self, content_hash, width=None):
+        name = content_hash if not width else f"{content_hash}_w{width}.jpg"
+        return os.path.join(self.storage_dir, 'objects', content_hash[:2], name)
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_entry(self, key):
+        try:
+            with open(self._url_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def register(self, url):
+        """Kaynak görsel URL'ini kaydeder, anahtarını döner (indirme yapmaz)"""
+        key = self.key_for(url)
+        with self._lock:
+            if key in self._registered:
+                return key
+        if not os.path.exists(self._url_path(key)):
+            self._write_atomic(self._url_path(key), json.dumps({'url': url}).encode('utf-8'))
+        with self._lock:
+            self._registered.add(key)
+        return key
+
+    def _download(self, key, entry):
+        """Görseli kaynaktan indirip içerik adresli olarak saklar"""
+        response = self.http.get(entry['url'], stream=True, breaker_key=f"covers:{urlparse(entry['url']).netloc}")
+        try:
+            content_type = response.headers.get('Content-Type', '')
+            if response.status_code != 200 or not content_type.startswith('image/'):
+                raise IOError(f"Kapak indirilemedi ({response.status_code}, {content_type}): {entry['url']}")
+            data = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                data.extend(chunk)
+                if len(data) > self.max_bytes:
+                    raise IOError(f"Kapak çok büyük: {entry['url']}")
+        finally:
+            response.close()
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(content_hash)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, bytes(data))
+            self._stored(len(data))
+        entry = dict(entry, hash=content_hash, content_type=content_type)
+        self._write_atomic(self._url_path(key), json.dumps(entry).encode('utf-8'))
+        with self._lock:
+            self.downloads += 1
+        return entry
+
+    def _ensure_object(self, key):
+        entry = self._read_entry(key)
+        if entry is None:
+            raise CoverNotFoundError(key)
+        if entry.get('hash') and os.path.exists(self._object_path(entry['hash'])):
+            return entry
+        try:
+            return self._flight.do(key, lambda: self._download(key, entry))
+        except Exception:
+            with self._lock:
+                self.download_errors += 1
+            raise
+
+    def _make_thumbnail(self, content_hash, width):
+        """Orijinalden `width` genişliğinde JPEG üretip saklar"""
+        with Image.open(self._object_path(content_hash)) as image:
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=self.thumb_quality, optimize=True)
+        self._write_atomic(self._object_path(content_hash, width), buffer.getvalue())
+        with self._lock:
+            self.thumbnails += 1
+        self._stored(buffer.tell())
+
+    def _scan_objects(self):
+        """objects/ altındaki dosyaları içerik hash'ine göre gruplar: {hash: [toplam_boyut, son_sunulma, [yollar]]}"""
+        groups = {}
+        root = os.path.join(self.storage_dir, 'objects')
+        for prefix in os.listdir(root):
+            directory = os.path.join(root, prefix)
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                # Orijinal ve thumbnail'ları birlikte silinir
+                group = groups.setdefault(name.split('_', 1)[0], [0, 0, []])
+                group[0] += stat.st_size
+                group[1] = max(group[1], stat.st_mtime)
+                group[2].append(path)
+        return groups
+
+    def _stored(self, size):
+        """Yeni yazılan dosyayı toplama ekler, sınır aşıldıysa purge() çalıştırır"""
+        if not self.max_total_bytes:
+            return
+        with self._lock:
+            self._total_bytes += size
+            over = self._total_bytes > self.max_total_bytes
+        # Aynı anda tek temizlik yeterli (diğer thread'ler beklemez)
+        if over and self._purge_lock.acquire(blocking=False):
+            try:
+                self.purge()
+            finally:
+                self._purge_lock.release()
+
+    def purge(self):
+        """
+        Toplam boyut sınırın %90'ına inene kadar en uzun süredir sunulmayan kapakları siler
+        Diğer worker'ların yazdıkları da sayılsın diye dizin baştan taranır
+        """
+        groups = self._scan_objects()
+        total = sum(group[0] for group in groups.values())
+        target = self.max_total_bytes * 0.9
+        evicted = 0
+        for size, _, paths in sorted(groups.values(), key=lambda group: group[1]):
+            if total <= target:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += evicted
+        if evicted:
+            print(f"🧹 Kapak cache'inden {evicted} görsel silindi ({total // 1024} KB kaldı)")
+
+    def _touch(self, path):
+        """Son sunulma zamanını dosyanın mtime'ına yazar (LRU temizliği için)"""
+        try:
+            if time.time() - os.stat(path).st_mtime > self.TOUCH_INTERVAL:
+                os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, key, width=None):
+        """
+        Sunulacak dosyayı döner
+        Returns: (dosya_yolu, content_type, etag)
+        """
+        entry = self._ensure_object(key)
+        content_hash = entry['hash']
+
+        if width and Image is not None:
+            path = self._object_path(content_hash, width)
+            if not os.path.exists(path):
+                self._flight.do(f"{content_hash}:{width}", lambda: self._make_thumbnail(content_hash, width))
+            else:
+                self._touch(path)
+            return path, 'image/jpeg', f"{content_hash[:32]}-w{width}"
+        path = self._object_path(content_hash)
+        self._touch(path)
+        return path, entry.get('content_type') or 'image/jpeg', content_hash[:32]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'storage_dir': self.storage_dir,
+                'widths': list(self.widths),
+                'thumbnails_enabled': Image is not None,
+                'registered': len(self._registered),
+                'downloads': self.downloads,
+                'download_errors': self.download_errors,
+                'thumbnails': self.thumbnails,
+                'bytes': self._total_bytes,
+                'max_total_bytes': self.max_total_bytes,
+                'evictions': self.evictions
+            }
@@ -1,11 +1,88 @@
 import json
 import os
+import atexit
+import contextlib
+import functools
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 import hashlib
 
+from journal import FileLock, JournalGapError, MutationJournal, apply_operation, file_locking_available
+
+
+# Abonelik türü -> kullanıcı kaydındaki liste alanı
+LIST_FIELDS = {'manga': 'manga_list', 'anime': 'anime_list'}
+
+
+def _unique(titles):
+    """Tekrar eden başlıkları ilk görülme sırasını koruyarak atar (SQLite deposundaki birincil anahtarla aynı)"""
+    return list(dict.fromkeys(titles or []))
+
+def _mutates(method):
+    """
+    Değişikliği depo kilidi altında yapar (arka plan flush'ı yarım kalmış veriyi yazmasın)
+    Paylaşımlı modda process'ler arası kilit de alınır ve önce diğer worker'ların değişiklikleri uygulanır
+
+    Senkron yazım kilitler bırakıldıktan sonra yapılır: flush önce _write_lock'u
+    sonra _lock'u alır, sıra her yerde aynı kalır (kapanışla yarışan bir
+    değişiklik devam eden flush ile kilitlenmez)
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self._shared_lock:
+            self._refresh()
+            result = method(self, *args, **kwargs)
+        if self._dirty.is_set() and (not self.write_behind or self._closed):
+            self.flush()
+        return result
+    return wrapper
+
+
+def _reads(method):
+    """Paylaşımlı modda okumadan önce diğer worker'ların değişikliklerini uygular"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.shared:
+            with self._lock:
+                self._refresh()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class DatabaseManager:
-    def __init__(self, db_path='database.json'):
+    """
+    JSON dosyası tabanlı kullanıcı / bölüm deposu
+
+    Dosya her zaman geçici dosyaya yazılıp fsync edildikten sonra atomik
+    rename ile değiştirilir; yazma sırasında çökme dosyayı yarım bırakmaz.
+
+    write-behind modunda (DATABASE_WRITE_BEHIND=true) değişiklikler yalnızca
+    depoyu kirli işaretler; arka plandaki flusher en fazla
+    DATABASE_FLUSH_INTERVAL_MS'de bir (ve kapanışta) tek seferde yazar.
+    Bir scheduler turundaki yüzlerce değişiklik tek dosya yazımına iner.
+
+    journal modunda (DATABASE_JOURNAL=true) her değişiklik <dosya>.journal'a
+    tek satır olarak eklenir (bkz. journal.py); açılışta snapshot + günlük
+    oynatılır, günlük DATABASE_JOURNAL_MAX_BYTES'ı geçince arka planda yeni
+    snapshot yazılıp günlük sıfırlanır.
+
+    Paylaşımlı modda (DATABASE_SHARED=true, çok worker'lı gunicorn) günlük
+    zorunludur: değişiklikler <dosya>.lock üzerindeki flock altında, önce
+    diğer worker'ların eklediği kayıtlar uygulanarak günlüğe yazılır. Her
+    okumada yalnızca günlüğün boyutuna bakılır; değiştiyse sadece yeni
+    satırlar okunur (tüm dosya yeniden yüklenmez).
+
+    Tüm değişiklikler _mutate() üzerinden yol bazlı işlemler olarak yapılır.
+    Abonelik indeksleri (başlık -> aboneler, kullanıcı -> başlıklar) her
+    değişiklikte artımlı güncellenir; bildirim dağıtımı ve takip edilen
+    başlıkların listesi kullanıcı sayısından bağımsızdır. Kullanıcı listeleri
+    SQLite deposundaki gibi tekrarsız tutulur (ilk görülme sırası korunur).
+    """
+
+    def __init__(self, db_path='database.json', write_behind=None, flush_interval_ms=None, journal=None,
+                 shared=None):
         # Render için persistent disk kullan
         if os.environ.get('RENDER'):
             # Render disk mount path (render.yaml'da tanımlanacak)
@@ -14,16 +91,77 @@ class DatabaseManager:
         else:
             self.db_path = db_path
         
-        self.db = self._load_database()
-        print(f"📁 Database yolu: {self.db_path}")
+        if shared is None:
+            shared = os.environ.get('DATABASE_SHARED', 'false').lower() == 'true'
+        if shared and not file_locking_available():
+            print("⚠ DATABASE_SHARED bu platformda desteklenmiyor (fcntl yok), tek process modu kullanılıyor")
+            shared = False
+        self.shared = shared
+        if journal is None:
+            journal = os.environ.get('DATABASE_JOURNAL', 'false').lower() == 'true'
+        # Process'ler yalnızca ortak günlük üzerinden haberleşir
+        journal = journal or shared
+        if write_behind is None:
+            write_behind = os.environ.get('DATABASE_WRITE_BEHIND', 'false').lower() == 'true'
+        # Günlük varken snapshot yalnızca sıkıştırmada yazılır, write-behind gereksiz
+        self.write_behind = write_behind and not journal
+        self.flush_interval = (flush_interval_ms or int(os.environ.get('DATABASE_FLUSH_INTERVAL_MS', 500))) / 1000
+        
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._closed = False
+        self._compacting = False
+        self.flushes = 0
+        self.reloads = 0
+        self._shared_lock = FileLock(f"{self.db_path}.lock") if shared else contextlib.nullcontext()
+        
+        # Başka bir worker açılış sırasında sıkıştırma yapmasın (snapshot + günlük tutarlı okunur)
+        with self._shared_lock:
+            self.db = self._load_database()
+            self.journal = None
+            if journal:
+                self._open_journal()
+            self._normalize_lists()
+            self._build_indexes()
+        print(f"📁 Database yolu: {self.db_path}{' (paylaşımlı)' if shared else ''}")
         print(f"📊 Başlangıçta {len(self.db.get('users', {}))} kullanıcı yüklendi")
+        
+        if self.write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, name='db-flusher', daemon=True)
+            self._flusher.start()
+        if self.write_behind or self.journal:
+            atexit.register(self.close)
+    
+    def _open_journal(self):
+        """Günlüğü açar; büyümüşse sıkıştırmayı başlatır"""
+        self.journal = MutationJournal(f"{self.db_path}.journal", shared=self.shared)
+        self._replay_journal()
+        if self.journal.needs_compaction():
+            self._start_compaction()
+    
+    def _replay_journal(self):
+        """Günlüğü snapshot'ın üzerine oynatır ve eklemeye açar"""
+        snapshot_seq = self.db.get('journal_seq') or 0
+        self.journal.reset(snapshot_seq)
+        replayed = 0
+        for op in self.journal.replay(after=snapshot_seq):
+            apply_operation(self.db, op)
+            replayed += 1
+        self.journal.open(after=snapshot_seq)
+        if replayed:
+            print(f"📜 Günlükten {replayed} değişiklik oynatıldı (seq {self.journal.seq})")
     
     def _load_database(self):
         """Veritabanını yükler, yoksa oluşturur"""
         if os.path.exists(self.db_path):
             try:
                 with open(self.db_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    db = json.load(f)
+                # Eski dosyalarda olmayan bölümler baştan eklenir (okuyucular depoyu değiştirmesin)
+                for key, value in self._create_empty_db().items():
+                    db.setdefault(key, value)
+                return db
             except Exception as e:
                 print(f"Veritabanı yükleme hatası: {e}")
                 return self._create_empty_db()
@@ -36,19 +174,219 @@ class DatabaseManager:
             'users': {},  # {username: {password_hash, fcm_token, manga_list, anime_list, created_at}}
             'manga_chapters': {},  # {manga_name: {chapter, url, image, last_checked}}
             'anime_episodes': {},  # {anime_name: {episode, url, image, last_checked}}
+            'mangadex_ids': {},  # {normalized_title: {manga_id, cover_filename, resolved_at}}
+            'anime_watch_urls': {},  # {normalized_title: {url, image, resolved_at}}
             'last_check': None
         }
     
+    def _mutate(self, kind, path, value=None):
+        """
+        Yol bazlı değişiklik: set / del / append / remove
+        Günlük açıksa önce günlüğe yazılır (write-ahead), sonra bellekte uygulanır
+        """
+        if self.journal:
+            op = self.journal.append(kind, path, value)
+        else:
+            op = {'o': kind, 'p': path, 'v': value}
+        apply_operation(self.db, op)
+        self._index_operation(op)
+    
+    def _refresh(self):
+        """Paylaşımlı modda diğer process'lerin günlüğe eklediği değişiklikleri uygular (çağıran _lock'u tutar)"""
+        if not self.shared:
+            return
+        try:
+            ops = self.journal.tail()
+        except JournalGapError as e:
+            print(f"⚠ {e}, snapshot yeniden yükleniyor")
+            self._reload()
+            return
+        for op in ops:
+            apply_operation(self.db, op)
+            self._index_operation(op)
+    
+    def _reload(self):
+        """
+        Başka bir worker bu process hiç okumadan iki kez sıkıştırdıysa aradaki kayıtlar
+        yalnızca snapshot'tadır: snapshot + günlük process kilidi altında baştan yüklenir
+        """
+        with self._shared_lock:
+            self.db = self._load_database()
+            self._replay_journal()
+            self._normalize_lists()
+            self._build_indexes()
+            self.reloads += 1
+    
+    # ABONELİK İNDEKSLERİ
+    
+    def _normalize_lists(self):
+        """Eski kayıtlardaki tekrar eden başlıkları atar (sonraki yazımda dosyaya da yansır)"""
+        for user in self.db['users'].values():
+            for field in LIST_FIELDS.values():
+                if field in user and len(set(user[field])) != len(user[field]):
+                    user[field] = _unique(user[field])
+    
+    def _build_indexes(self):
+        """Başlık -> aboneler ve kullanıcı -> başlıklar indekslerini baştan kurar"""
+        self._subscribers = {kind: {} for kind in LIST_FIELDS}  # {kind: {title: {username}}}
+        self._user_titles = {kind: {} for kind in LIST_FIELDS}  # {kind: {username: {title}}}
+        for username in self.db['users']:
+            self._reindex_user(username)
+    
+    def _index_operation(self, op):
+        """Uygulanan değişikliği indekslere yansıtır; yalnızca kullanıcı kayıtları ilgilendirir"""
+        path = op['p']
+        if len(path) < 2 or path[0] != 'users':
+            return
+        username = path[1]
+        if len(path) == 2:
+            self._reindex_user(username)  # Kullanıcı eklendi / silindi / baştan yazıldı
+            return
+        for kind, field in LIST_FIELDS.items():
+            if path[2:] != [field]:
+                continue
+            if op['o'] == 'append':
+                self._index_add(kind, username, op['v'])
+            elif op['o'] == 'remove':
+                self._index_remove(kind, username, op['v'])
+            else:
+                self._reindex_user(username, kinds=(kind,))
+    
+    def _reindex_user(self, username, kinds=LIST_FIELDS):
+        """Kullanıcının indeks girdilerini güncel listeleriyle farkı alarak düzeltir"""
+        user = self.db['users'].get(username) or {}
+        for kind in kinds:
+            old = self._user_titles[kind].get(username, set())
+            new = set(user.get(LIST_FIELDS[kind]) or [])
+            for title in old - new:
+                self._index_remove(kind, username, title)
+            for title in new - old:
+                self._index_add(kind, username, title)
+    
+    def _index_add(self, kind, username, title):
+        self._subscribers[kind].setdefault(title, set()).add(username)
+        self._user_titles[kind].setdefault(username, set()).add(title)
+    
+    def _index_remove(self, kind, username, title):
+        subscribers = self._subscribers[kind].get(title)
+        if subscribers is not None:
+            subscribers.discard(username)
+            if not subscribers:
+                del self._subscribers[kind][title]
+        titles = self._user_titles[kind].get(username)
+        if titles is not None:
+            titles.discard(title)
+            if not titles:
+                del self._user_titles[kind][username]
+    
     def _save_database(self):
-        """Veritabanını dosyaya kaydeder"""
+        """
+        Veritabanını kaydedilmek üzere işaretler (çağıran _lock'u tutar, burada yazılmaz)
+        - journal modunda değişiklik zaten günlükte; yalnızca sıkıştırma gerekip gerekmediğine bakılır
+        - write-behind modunda arka plandaki flusher yazar
+        - diğer durumlarda (ve kapanıştan sonra) _mutates kilidi bırakınca yazar
+        """
+        if self.journal:
+            if self.journal.needs_compaction():
+                self._start_compaction()
+            return True
+        self._dirty.set()
+        return True
+    
+    def _start_compaction(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, args=(False,), name='db-compaction', daemon=True).start()
+    
+    def compact(self, force=True):
+        """Güncel durumu yeni snapshot olarak yazar ve günlüğü sıfırlar"""
+        try:
+            # Paylaşımlı modda process kilidi snapshot yazılıp eski günlük silinene kadar tutulur
+            with self._write_lock, contextlib.ExitStack() as shared_lock:
+                with self._lock:
+                    shared_lock.enter_context(self._shared_lock)
+                    self._refresh()
+                    if not force and not self.journal.needs_compaction():
+                        return  # Başka bir worker az önce sıkıştırdı
+                    # Snapshot hangi günlük kaydına kadar olanları kapsadığını bilir
+                    self.db['journal_seq'] = self.journal.rotate()
+                    data = json.dumps(self.db, indent=2, ensure_ascii=False)
+                self._write_file(data)
+                self.journal.discard_rotated()
+                self.flushes += 1
+            print(f"🗜 Günlük snapshot'a sıkıştırıldı (seq {self.db['journal_seq']})")
+        except Exception as e:
+            # Kenara alınan günlük açılışta tekrar oynatılır, veri kaybolmaz
+            print(f"Günlük sıkıştırma hatası: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+    
+    def iter_changes(self, since_seq=0):
+        """
+        Son sıkıştırmadan bu yana `since_seq`'ten sonraki değişiklikleri üretir
+        (ucuz değişiklik akışı; her kayıt: {s, o, p, v})
+        """
+        if not self.journal:
+            return iter(())
+        return MutationJournal(self.journal.path).replay(after=since_seq)
+    
+    def _write_file(self, data):
+        """Geçici dosyaya yazıp fsync eder, sonra atomik olarak yerine koyar"""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.db_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.db_path)
+        # Rename'in kendisinin de diske inmesi için dizin fsync'i (Windows'ta desteklenmez)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    def flush(self, force=False):
+        """Bekleyen değişiklikleri dosyaya yazar"""
         try:
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.db, f, indent=2, ensure_ascii=False)
+            with self._write_lock:
+                # Serileştirme kilit altında, disk yazımı kilit dışında yapılır
+                with self._lock:
+                    if not force and not self._dirty.is_set():
+                        return True
+                    self._dirty.clear()
+                    data = json.dumps(self.db, indent=2, ensure_ascii=False)
+                self._write_file(data)
+                self.flushes += 1
             return True
         except Exception as e:
+            self._dirty.set()  # Sonraki turda tekrar denensin
             print(f"Veritabanı kaydetme hatası: {e}")
             return False
     
+    def _flush_loop(self):
+        """İlk değişiklikten flush_interval sonra o ana kadarki tüm değişiklikleri tek seferde yazar"""
+        while not self._closed:
+            self._dirty.wait()
+            time.sleep(self.flush_interval)
+            if not self.flush() and not self._closed:
+                time.sleep(self.flush_interval)
+    
+    def close(self):
+        """Bekleyen değişiklikleri yazar, flusher'ı durdurur ve günlüğü kapatır"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.write_behind:
+            self.flush()
+        if self.journal:
+            self.journal.close()
+    
     def _hash_password(self, password: str) -> str:
         """Şifreyi hash'ler"""
         return hashlib.sha256(password.encode()).hexdigest()
@@ -59,19 +397,20 @@ class DatabaseManager:
     
     # USER OPERATIONS
     
+    @_mutates
     def create_user(self, username: str, password: str, fcm_token: str = None) -> bool:
         """Yeni kullanıcı oluşturur"""
         if username in self.db['users']:
             print(f"⚠️ Kullanıcı zaten var: {username}")
             return False  # Kullanıcı zaten var
         
-        self.db['users'][username] = {
+        self._mutate('set', ['users', username], {
             'password_hash': self._hash_password(password),
             'fcm_token': fcm_token or '',
             'manga_list': [],
             'anime_list': [],
             'created_at': datetime.now().isoformat()
-        }
+        })
         
         print(f"✅ Kullanıcı oluşturuldu: {username}")
         print(f"📊 Toplam kullanıcı sayısı: {len(self.db['users'])}")
@@ -80,6 +419,7 @@ class DatabaseManager:
         print(f"💾 Database kaydedildi: {saved} - Path: {self.db_path}")
         return True
     
+    @_reads
     def authenticate_user(self, username: str, password: str) -> bool:
         """Kullanıcı girişini doğrular"""
         user = self.db['users'].get(username)
@@ -88,32 +428,35 @@ class DatabaseManager:
         
         return self._verify_password(password, user['password_hash'])
     
+    @_mutates
     def update_fcm_token(self, username: str, fcm_token: str) -> bool:
         """Kullanıcının FCM token'ını günceller"""
         if username in self.db['users']:
-            self.db['users'][username]['fcm_token'] = fcm_token
+            self._mutate('set', ['users', username, 'fcm_token'], fcm_token)
             self._save_database()
             return True
         return False
     
+    @_mutates
     def add_or_update_user(self, device_id: str, token: str, manga_list: List[str] = None):
         """Eski API uyumluluğu için - DEPRECATED"""
         # Geriye dönük uyumluluk için username olarak device_id kullan
         if device_id not in self.db['users']:
-            self.db['users'][device_id] = {
+            self._mutate('set', ['users', device_id], {
                 'password_hash': '',  # Eski kullanıcılar için boş
                 'fcm_token': token,
-                'manga_list': manga_list or [],
+                'manga_list': _unique(manga_list),
                 'created_at': datetime.now().isoformat()
-            }
+            })
         else:
-            self.db['users'][device_id]['fcm_token'] = token
+            self._mutate('set', ['users', device_id, 'fcm_token'], token)
             if manga_list is not None:
-                self.db['users'][device_id]['manga_list'] = manga_list
+                self._mutate('set', ['users', device_id, 'manga_list'], _unique(manga_list))
         
         self._save_database()
         return True
     
+    @_reads
     def get_user(self, username: str) -> Optional[Dict]:
         """Kullanıcı bilgilerini getirir (şifre hash'i hariç)"""
         user = self.db['users'].get(username)
@@ -128,6 +471,7 @@ class DatabaseManager:
             }
         return None
     
+    @_reads
     def get_all_users(self) -> Dict:
         """Tüm kullanıcıları getirir"""
         print(f"📋 get_all_users çağrıldı - Kullanıcı sayısı: {len(self.db['users'])}")
@@ -135,56 +479,63 @@ class DatabaseManager:
         print(f"👥 Kullanıcılar: {list(self.db['users'].keys())}")
         return self.db['users']
     
+    @_mutates
     def update_user_manga_list(self, username: str, manga_list: List[str]) -> bool:
         """Kullanıcının manga listesini günceller"""
         if username in self.db['users']:
-            self.db['users'][username]['manga_list'] = manga_list
+            self._mutate('set', ['users', username, 'manga_list'], _unique(manga_list))
             self._save_database()
             return True
         return False
     
+    @_mutates
     def add_manga_to_user(self, username: str, manga_name: str) -> bool:
         """Kullanıcının listesine manga ekler"""
         if username in self.db['users']:
-            if manga_name not in self.db['users'][username]['manga_list']:
-                self.db['users'][username]['manga_list'].append(manga_name)
+            if not self.is_subscribed(username, manga_name, 'manga'):
+                self._mutate('append', ['users', username, 'manga_list'], manga_name)
                 self._save_database()
             return True
         return False
     
+    @_mutates
     def remove_manga_from_user(self, username: str, manga_name: str) -> bool:
         """Kullanıcının listesinden manga çıkarır"""
         if username in self.db['users']:
-            if manga_name in self.db['users'][username]['manga_list']:
-                self.db['users'][username]['manga_list'].remove(manga_name)
+            if self.is_subscribed(username, manga_name, 'manga'):
+                self._mutate('remove', ['users', username, 'manga_list'], manga_name)
                 self._save_database()
             return True
         return False
     
+    @_mutates
     def remove_user(self, username: str) -> bool:
         """Kullanıcıyı siler"""
         if username in self.db['users']:
-            del self.db['users'][username]
+            self._mutate('del', ['users', username])
             self._save_database()
             return True
         return False
     
     # MANGA OPERATIONS
     
+    @_mutates
     def update_manga_chapter(self, manga_name: str, chapter: str, url: str = None, image: str = None):
         """Manga bölüm bilgisini günceller"""
-        self.db['manga_chapters'][manga_name] = {
+        self._mutate('set', ['manga_chapters', manga_name], {
             'chapter': chapter,
             'url': url,
             'image': image,
             'last_checked': datetime.now().isoformat()
-        }
+        })
         self._save_database()
     
+    @_reads
     def get_manga_chapter(self, manga_name: str) -> Optional[Dict]:
         """Manga bölüm bilgisini getirir"""
         return self.db['manga_chapters'].get(manga_name)
     
+    @_reads
     def get_all_manga_chapters(self) -> Dict:
         """Tüm manga bölüm bilgilerini getirir"""
         return self.db['manga_chapters']
@@ -203,67 +554,128 @@ class DatabaseManager:
         has_changed = old_data.get('chapter') != new_chapter
         return (False, has_changed)  # İlk değil, değişiklik kontrolü
     
+    @_mutates
     def update_last_check(self):
         """Son kontrol zamanını günceller"""
-        self.db['last_check'] = datetime.now().isoformat()
+        self._mutate('set', ['last_check'], datetime.now().isoformat())
         self._save_database()
     
+    @_reads
     def get_last_check(self) -> Optional[str]:
         """Son kontrol zamanını getirir"""
         return self.db['last_check']
     
+    # MANGADEX ID CACHE
+    
+    @_reads
+    def get_mangadex_id(self, title_key: str) -> Optional[Dict]:
+        """Başlık için çözümlenmiş MangaDex ID ve kapak bilgisini getirir"""
+        if 'mangadex_ids' not in self.db:
+            self.db['mangadex_ids'] = {}
+        return self.db['mangadex_ids'].get(title_key)
+    
+    @_mutates
+    def set_mangadex_id(self, title_key: str, manga_id: str, cover_filename: str = None):
+        """Başlığın MangaDex ID'sini kalıcı olarak kaydeder"""
+        self._mutate('set', ['mangadex_ids', title_key], {
+            'manga_id': manga_id,
+            'cover_filename': cover_filename,
+            'resolved_at': datetime.now().isoformat()
+        })
+        self._save_database()
+    
+    @_mutates
+    def remove_mangadex_id(self, title_key: str) -> bool:
+        """Geçersiz hale gelen MangaDex ID kaydını siler"""
+        if title_key in self.db.get('mangadex_ids', {}):
+            self._mutate('del', ['mangadex_ids', title_key])
+            self._save_database()
+            return True
+        return False
+    
     # ANIME OPERATIONS
     
+    @_mutates
     def update_user_anime_list(self, username: str, anime_list: List[str]) -> bool:
         """Kullanıcının anime listesini günceller"""
         if username in self.db['users']:
-            if 'anime_list' not in self.db['users'][username]:
-                self.db['users'][username]['anime_list'] = []
-            self.db['users'][username]['anime_list'] = anime_list
+            self._mutate('set', ['users', username, 'anime_list'], _unique(anime_list))
             self._save_database()
             return True
         return False
     
+    @_mutates
     def add_anime_to_user(self, username: str, anime_name: str) -> bool:
         """Kullanıcının listesine anime ekler"""
         if username in self.db['users']:
-            if 'anime_list' not in self.db['users'][username]:
-                self.db['users'][username]['anime_list'] = []
-            if anime_name not in self.db['users'][username]['anime_list']:
-                self.db['users'][username]['anime_list'].append(anime_name)
+            if not self.is_subscribed(username, anime_name, 'anime'):
+                self._mutate('append', ['users', username, 'anime_list'], anime_name)
                 self._save_database()
             return True
         return False
     
+    @_mutates
     def remove_anime_from_user(self, username: str, anime_name: str) -> bool:
         """Kullanıcının listesinden anime çıkarır"""
         if username in self.db['users']:
-            if 'anime_list' in self.db['users'][username]:
-                if anime_name in self.db['users'][username]['anime_list']:
-                    self.db['users'][username]['anime_list'].remove(anime_name)
-                    self._save_database()
+            if self.is_subscribed(username, anime_name, 'anime'):
+                self._mutate('remove', ['users', username, 'anime_list'], anime_name)
+                self._save_database()
+            return True
+        return False
+    
+    @_reads
+    def get_anime_watch_url(self, title_key: str) -> Optional[Dict]:
+        """Anime için çözümlenmiş 9animetv izleme sayfasını getirir"""
+        if 'anime_watch_urls' not in self.db:
+            self.db['anime_watch_urls'] = {}
+        return self.db['anime_watch_urls'].get(title_key)
+    
+    @_mutates
+    def set_anime_watch_url(self, title_key: str, url: str, image: str = None):
+        """
+        Anime'nin izleme sayfası URL'ini (ve posterini) kalıcı olarak kaydeder
+        Poster kayıtlıysa sonraki kontrollerde yalnızca bölüm listesi okunur
+        """
+        current = self.db['anime_watch_urls'].get(title_key)
+        if current and current.get('url') == url and (not image or current.get('image') == image):
+            return
+        
+        self._mutate('set', ['anime_watch_urls', title_key], {
+            'url': url,
+            'image': image or (current.get('image') if current and current.get('url') == url else None),
+            'resolved_at': datetime.now().isoformat()
+        })
+        self._save_database()
+    
+    @_mutates
+    def remove_anime_watch_url(self, title_key: str) -> bool:
+        """Geçersiz hale gelen izleme sayfası kaydını siler"""
+        if title_key in self.db.get('anime_watch_urls', {}):
+            self._mutate('del', ['anime_watch_urls', title_key])
+            self._save_database()
             return True
         return False
     
+    @_mutates
     def update_anime_episode(self, anime_name: str, episode: str, url: str = None, image: str = None):
         """Anime bölüm bilgisini günceller"""
-        if 'anime_episodes' not in self.db:
-            self.db['anime_episodes'] = {}
-        
-        self.db['anime_episodes'][anime_name] = {
+        self._mutate('set', ['anime_episodes', anime_name], {
             'episode': episode,
             'url': url,
             'image': image,
             'last_checked': datetime.now().isoformat()
-        }
+        })
         self._save_database()
     
+    @_reads
     def get_anime_episode(self, anime_name: str) -> Optional[Dict]:
         """Anime bölüm bilgisini getirir"""
         if 'anime_episodes' not in self.db:
             self.db['anime_episodes'] = {}
         return self.db['anime_episodes'].get(anime_name)
     
+    @_reads
     def get_all_anime_episodes(self) -> Dict:
         """Tüm anime bölüm bilgilerini getirir"""
         if 'anime_episodes' not in self.db:
@@ -286,6 +698,7 @@ class DatabaseManager:
     
     # ANALYTICS
     
+    @_reads
     def get_stats(self) -> Dict:
         """İstatistikleri döner"""
         anime_count = len(self.db.get('anime_episodes', {}))
@@ -296,16 +709,62 @@ class DatabaseManager:
             'last_check': self.db['last_check']
         }
     
+    @_reads
     def get_all_tracked_manga(self) -> List[str]:
         """Tüm kullanıcıların takip ettiği benzersiz manga listesi"""
-        all_manga = set()
-        for user in self.db['users'].values():
-            all_manga.update(user.get('manga_list', []))
-        return list(all_manga)
+        with self._lock:
+            return list(self._subscribers['manga'])
     
+    @_reads
     def get_all_tracked_anime(self) -> List[str]:
         """Tüm kullanıcıların takip ettiği benzersiz anime listesi"""
-        all_anime = set()
-        for user in self.db['users'].values():
-            all_anime.update(user.get('anime_list', []))
-        return list(all_anime)
+        with self._lock:
+            return list(self._subscribers['anime'])
+    
+    # ABONELİK SORGULARI
+    
+    @_reads
+    def get_subscribers(self, title: str, kind: str = 'manga') -> List[str]:
+        """Başlığı takip eden kullanıcı adları (kind: manga / anime)"""
+        with self._lock:
+            return list(self._subscribers[kind].get(title, ()))
+    
+    @_reads
+    def get_subscriber_tokens(self, title: str, kind: str = 'manga') -> List[str]:
+        """Başlığı takip eden kullanıcıların boş olmayan FCM token'ları (tekrarsız)"""
+        tokens = {}
+        with self._lock:
+            for username in self._subscribers[kind].get(title, ()):
+                user = self.db['users'].get(username) or {}
+                # Eski kayıtlarda token 'token' alanında olabilir
+                token = user.get('fcm_token') or user.get('token')
+                if token:
+                    tokens[token] = None
+        return list(tokens)
+    
+    @_reads
+    def get_user_titles(self, username: str, kind: str = 'manga') -> List[str]:
+        """Kullanıcının takip ettiği başlıklar (sırasız)"""
+        with self._lock:
+            return list(self._user_titles[kind].get(username, ()))
+    
+    @_reads
+    def is_subscribed(self, username: str, title: str, kind: str = 'manga') -> bool:
+        """Kullanıcı başlığı takip ediyor mu (O(1))"""
+        with self._lock:
+            return title in self._user_titles[kind].get(username, ())
+    
+    @_reads
+    def get_subscriber_count(self, title: str, kind: str = 'manga') -> int:
+        """Başlığın abone sayısı"""
+        with self._lock:
+            return len(self._subscribers[kind].get(title, ()))
+
+
+def create_database_manager():
+    """DATABASE_BACKEND ayarına göre depoyu oluşturur: json (varsayılan) ya da sqlite"""
+    backend = os.environ.get('DATABASE_BACKEND', 'json').lower()
+    if backend == 'sqlite':
+        from sqlite_database import SQLiteDatabaseManager
+        return SQLiteDatabaseManager()
+    return DatabaseManager()
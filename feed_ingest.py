@@ -0,0 +1,215 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from lookup_cache import normalize_title
+from parsers import parse_ravenscans_latest_updates
+
+
+class LatestFeedIngestor:
+    """
+    Site geneli "son güncellemeler" akışlarını okuyup takip edilen başlıklarla karşılaştırır
+
+    - Raven Scans: Ana sayfadaki son güncellemeler listesi (en yeni önce)
+      sayfa sayfa okunur; kayıtlı bölümü değişmemiş bir başlığın
+      bulunduğu sayfadan sonra durulur, çünkü sonraki girişler daha eskidir.
+    - MangaDex: /chapter?updatedAtSince= ile son okumadan beri güncellenen
+      İngilizce bölümler sayfalanarak alınır.
+
+    Böylece her döngüde başlık sayısı kadar istek yerine birkaç istek atılır.
+    Akışlarla durumu kesinleşmeyen başlıklar için scheduler tekil sorguya düşer.
+    """
+
+    def __init__(self, manga_scraper, db_manager, http_client=None):
+        self.scraper = manga_scraper
+        self.db_manager = db_manager
+        self.http = http_client or manga_scraper.http
+        self.raven_max_pages = int(os.environ.get('RAVEN_FEED_MAX_PAGES', 3))
+        self.mangadex_max_pages = int(os.environ.get('MANGADEX_FEED_MAX_PAGES', 5))
+        self.mangadex_window = timedelta(hours=float(os.environ.get('MANGADEX_FEED_WINDOW_HOURS', 24)))
+        self.last_mangadex_ingest = None  # datetime.now() - son tam MangaDex okuması
+        self._verified_at = {}  # {manga_name: datetime} - bölümü en son doğrulanan zaman
+
+    def mark_verified(self, manga_name, age=0):
+        """Başlığın bölümünün `age` saniye önce tekil sorguyla doğrulandığını kaydeder"""
+        self._verified_at[manga_name] = datetime.now() - timedelta(seconds=age)
+
+    def _verified_since(self, manga_name, stored, since):
+        verified_at = self._verified_at.get(manga_name)
+        if verified_at and verified_at >= since:
+            return True
+        return bool(stored and stored.get('last_checked') and stored['last_checked'] >= since.isoformat())
+
+    def _known_source(self, manga_name, stored):
+        """Başlığın hangi kaynaktan takip edildiğini bulur"""
+        return self.scraper.get_source_affinity(manga_name) or self.scraper.source_from_url((stored or {}).get('url'))
+
+    def _make_info(self, manga_name, chapter, url, image):
+        return {
+            'name': manga_name,
+            'chapter': chapter,
+            'found': True,
+            'url': url,
+            'image': image
+        }
+
+    def collect(self, manga_names):
+        """
+        Returns: (results, covered)
+            - results: {manga_name: manga_info} akışlarda yeni bölümü görülen başlıklar
+            - covered: Akışlarla durumu kesinleşen başlıklar (değişmeyenler dahil)
+        """
+        raven_titles = {}    # {slug: [manga_name]}
+        mangadex_titles = {}  # {manga_id: [manga_name]}
+        stored_by_name = {}
+
+        for manga_name in manga_names:
+            stored = self.db_manager.get_manga_chapter(manga_name)
+            stored_by_name[manga_name] = stored
+            source = self._known_source(manga_name, stored)
+            if source == 'mangadex':
+                record = self.db_manager.get_mangadex_id(normalize_title(manga_name))
+                if record and record.get('manga_id'):
+                    mangadex_titles.setdefault(record['manga_id'], []).append(manga_name)
+            elif source == 'ravenscans':
+                raven_titles.setdefault(self.scraper.ravenscans_slug(manga_name), []).append(manga_name)
+
+        results = {}
+        covered = set()
+
+        if raven_titles and self.http.is_available('ravenscans.org'):
+            try:
+                self._collect_ravenscans(raven_titles, stored_by_name, results, covered)
+            except Exception as e:
+                print(f"⚠ Raven Scans akışı okunamadı: {e}")
+
+        if mangadex_titles and self.http.is_available('api.mangadex.org'):
+            try:
+                self._collect_mangadex(mangadex_titles, stored_by_name, results, covered)
+            except Exception as e:
+                print(f"⚠ MangaDex akışı okunamadı: {e}")
+
+        # Yeni sonuçları lookup cache'ine de yaz (API aynı veriyi tekrar çekmesin)
+        for manga_name, manga_info in results.items():
+            self.scraper.cache.set(normalize_title(manga_name), manga_info)
+
+        return results, covered
+
+    def _collect_ravenscans(self, raven_titles, stored_by_name, results, covered):
+        complete = False
+        seen = set()
+        stop_point = None  # Akışta değişmeden görülen başlıkların en eski kayıt zamanı
+
+        for page in range(1, self.raven_max_pages + 1):
+            url = "https://ravenscans.org/" if page == 1 else f"https://ravenscans.org/page/{page}/"
+            response = self.http.get(url, headers=self.scraper.headers)
+            if response.status_code != 200:
+                break
+
+            entries = parse_ravenscans_latest_updates(response.content)
+            if not entries:
+                complete = True
+                break
+
+            for slug, chapter, chapter_url in entries:
+                if slug in seen:
+                    continue
+                seen.add(slug)
+
+                for manga_name in raven_titles.get(slug, []):
+                    stored = stored_by_name.get(manga_name)
+                    covered.add(manga_name)
+                    if stored and stored.get('chapter') == chapter:
+                        complete = True
+                        recorded_at = self._parse_time(stored.get('last_checked'))
+                        if recorded_at and (stop_point is None or recorded_at < stop_point):
+                            stop_point = recorded_at
+                    else:
+                        image = stored.get('image') if stored else None
+                        results[manga_name] = self._make_info(manga_name, chapter, chapter_url, image)
+
+            # Liste güncellenme sırasına göre; değişmemiş bir başlık görüldüyse
+            # sonraki sayfalar daha eskidir (sayfa içi küçük sıra kaymalarına
+            # karşı sayfa sonuna kadar okunur)
+            if complete:
+                break
+
+        now = datetime.now()
+        for names in raven_titles.values():
+            for manga_name in names:
+                if manga_name in covered:
+                    self._verified_at[manga_name] = now
+                elif complete and stop_point and self._verified_since(manga_name, stored_by_name.get(manga_name), stop_point):
+                    # Akışta görünmeyen başlığın son güncellemesi durma noktasındaki başlığınkinden
+                    # eskidir; o başlığın bölümü kaydedildikten sonra doğrulanmışsa değişmemiştir.
+                    # Kaydı olmayan ya da eski kalmış başlıklar tekil sorguya düşer.
+                    covered.add(manga_name)
+                    self._verified_at[manga_name] = now
+
+    @staticmethod
+    def _parse_time(value):
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def _collect_mangadex(self, mangadex_titles, stored_by_name, results, covered):
+        now = datetime.now()
+        since = (self.last_mangadex_ingest - timedelta(minutes=1)) if self.last_mangadex_ingest else now - self.mangadex_window
+        since_utc = datetime.now(timezone.utc) - (now - since)
+
+        latest = {}  # {manga_id: (chapter_float, chapter, chapter_id)}
+        complete = False
+        limit = 100
+        for page in range(self.mangadex_max_pages):
+            response = self.http.get("https://api.mangadex.org/chapter", params={
+                'updatedAtSince': since_utc.strftime('%Y-%m-%dT%H:%M:%S'),
+                'translatedLanguage[]': ['en'],
+                'contentRating[]': ['safe', 'suggestive', 'erotica'],
+                'order[updatedAt]': 'desc',
+                'includeFutureUpdates': '0',
+                'limit': limit,
+                'offset': page * limit
+            })
+            if response.status_code != 200:
+                break
+
+            data = response.json()
+            for chapter in data.get('data') or []:
+                chapter_num = chapter['attributes'].get('chapter')
+                manga_id = next((rel['id'] for rel in chapter.get('relationships', []) if rel['type'] == 'manga'), None)
+                if not chapter_num or manga_id not in mangadex_titles:
+                    continue
+                try:
+                    value = float(chapter_num)
+                except ValueError:
+                    continue
+                if manga_id not in latest or value > latest[manga_id][0]:
+                    latest[manga_id] = (value, chapter_num, chapter['id'])
+
+            if (page + 1) * limit >= data.get('total', 0):
+                complete = True
+                break
+
+        for manga_id, (value, chapter_num, chapter_id) in latest.items():
+            for manga_name in mangadex_titles[manga_id]:
+                stored = stored_by_name.get(manga_name)
+                covered.add(manga_name)
+                try:
+                    if stored and float(stored.get('chapter')) >= value:
+                        continue
+                except (TypeError, ValueError):
+                    pass
+                record = self.db_manager.get_mangadex_id(normalize_title(manga_name)) or {}
+                cover = record.get('cover_filename')
+                image = f"https://uploads.mangadex.org/covers/{manga_id}/{cover}" if cover else (stored or {}).get('image')
+                results[manga_name] = self._make_info(manga_name, chapter_num, f"https://mangadex.org/chapter/{chapter_id}", image)
+
+        if complete:
+            self.last_mangadex_ingest = now
+            # Akış penceresinin başından beri doğrulanmış ve akışta görünmeyen
+            # başlıklar değişmemiştir
+            for names in mangadex_titles.values():
+                for manga_name in names:
+                    if manga_name in covered or self._verified_since(manga_name, stored_by_name.get(manga_name), since):
+                        covered.add(manga_name)
+                        self._verified_at[manga_name] = now
@@ -0,0 +1,81 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class LookupEngine:
+    """
+    Başlık listelerini paralel sorgulayan, sınırlı thread havuzlu motor
+
+    Sonuçlar istek sırasıyla döner. Kaynak sitelere karşı nezaket,
+    HttpClient içindeki host bazlı token-bucket ile sağlanır.
+
+    Kaynak bazlı şeritler (lane) tanımlanabilir: route(item) bir şerit adı
+    dönerse iş o kaynağın eşzamanlılık bütçesi kadar thread'i olan ayrı
+    havuzda çalışır. Böylece yavaş/kısıtlı bir kaynağı bekleyen işler,
+    başka kaynaklara gidecek işlerin thread'lerini tüketmez.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or int(os.environ.get('LOOKUP_MAX_WORKERS', 8))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='lookup'
+        )
+        self._lanes = {}  # {şerit_adı: ThreadPoolExecutor}
+        self._lanes_lock = threading.Lock()
+
+    def set_lane(self, name, max_workers):
+        """Bir kaynak için ayrı, `max_workers` thread'lik şerit tanımlar"""
+        with self._lanes_lock:
+            if name in self._lanes:
+                return
+            self._lanes[name] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f'lookup-{name}'
+            )
+
+    def _executor_for(self, item, route):
+        if route is None:
+            return self._executor
+        with self._lanes_lock:
+            return self._lanes.get(route(item), self._executor)
+
+    def _submit_all(self, func, items, route):
+        return [self._executor_for(item, route).submit(func, item) for item in items]
+
+    def map_ordered(self, func, items, route=None):
+        """func'ı her eleman için paralel çalıştırır, sonuçları giriş sırasıyla döner"""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        futures = self._submit_all(func, items, route)
+        return [future.result() for future in futures]
+
+    def map_as_completed(self, func, items, route=None):
+        """
+        func'ı her eleman için paralel çalıştırır, (index, sonuç) çiftlerini
+        tamamlanma sırasıyla üretir (streaming cevaplar için)
+        """
+        items = list(items)
+        if len(items) <= 1:
+            for index, item in enumerate(items):
+                yield index, func(item)
+            return
+
+        futures = {future: index for index, future in enumerate(self._submit_all(func, items, route))}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # İstemci bağlantıyı kestiyse henüz başlamamış işleri iptal et
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait=True):
+        """Thread havuzlarını kapatır"""
+        self._executor.shutdown(wait=wait)
+        with self._lanes_lock:
+            for executor in self._lanes.values():
+                executor.shutdown(wait=wait)
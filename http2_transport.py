@@ -0,0 +1,115 @@
+"""
+API tipi kaynaklar için opsiyonel HTTP/2 taşıma katmanı (httpx + h2)
+
+HTTP/2'de aynı host'a giden eşzamanlı istekler tek bir bağlantı üzerinde
+ayrı stream'ler olarak çoklanır (multiplexing); her paralel sorgu için ayrı
+TCP+TLS bağlantısı açılmaz. Sunucu ALPN ile HTTP/2 önermezse httpx aynı
+bağlantıda HTTP/1.1 konuşur.
+
+Cevaplar requests.Response'a çevrilir; böylece HttpClient'ın hız sınırı,
+devre kesici, conditional GET ve kayıt/tekrar oynatma katmanları aynen çalışır.
+"""
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx'in http2=True modu için gerekli)
+except ImportError:  # httpx[http2] kurulu değilse HTTP/1.1 (requests) kullanılır
+    httpx = None
+
+
+DECODED_HEADERS = {'content-encoding', 'content-length'}
+
+class Http2TransportError(Exception):
+    """HTTP/2 bağlantısı kurulamadı ya da koptu; istek HTTP/1.1 ile tekrarlanabilir"""
+    pass
+
+
+def http2_available():
+    """httpx ve h2 kuruluysa True döner"""
+    return httpx is not None
+
+
+class Http2Transport:
+    """
+    httpx.Client(http2=True) sarmalayıcısı
+
+    - prior_knowledge: TLS'siz (h2c) sunucular için HTTP/2'yi doğrudan başlatır
+      (lokal HTTP/2 stub'ı); gerçek sitelerde ALPN kullanıldığından gerekmez
+    - max_connections: Host başına bağlantı sınırı; HTTP/2'de tek bağlantı
+      yeterli olduğundan havuz boyutu HTTP/1.1'e göre küçük tutulabilir
+    """
+
+    def __init__(self, timeout, headers=None, max_connections=10, prior_knowledge=False):
+        if httpx is None:
+            raise RuntimeError("HTTP/2 için httpx[http2] gerekli (pip install 'httpx[http2]')")
+        self.prior_knowledge = prior_knowledge
+        self._client = httpx.Client(
+            http1=not prior_knowledge,
+            http2=True,
+            timeout=timeout,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.http2_responses = 0
+        self.fallbacks = 0
+
+    def request(self, method, url, params=None, headers=None, timeout=None, allow_redirects=True, **kwargs):
+        """
+        İsteği httpx ile gönderir, cevabı requests.Response olarak döner
+        (stream=True yok sayılır: API cevapları küçük olduğundan gövde tamamen okunur)
+
+        Zaman aşımları requests.Timeout olarak fırlatılır (devre kesici için);
+        diğer taşıma hataları Http2TransportError olur ve çağıran HTTP/1.1'e düşer.
+        """
+        try:
+            response = self._client.request(
+                method, url, params=params, headers=headers,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                follow_redirects=allow_redirects
+            )
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e))
+        except httpx.TransportError as e:
+            with self._lock:
+                self.fallbacks += 1
+            raise Http2TransportError(str(e))
+
+        with self._lock:
+            self.requests += 1
+            if response.http_version == 'HTTP/2':
+                self.http2_responses += 1
+        return self._to_requests_response(method, response)
+
+    @staticmethod
+    def _to_requests_response(method, response):
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        # httpx gövdeyi zaten açtığından sıkıştırma başlıkları artık geçerli değil
+        converted.headers = CaseInsensitiveDict(
+            (name, value) for name, value in response.headers.items() if name.lower() not in DECODED_HEADERS
+        )
+        converted._content = response.content
+        converted._content_consumed = True
+        converted.url = str(response.url)
+        converted.encoding = requests.utils.get_encoding_from_headers(converted.headers)
+        converted.reason = response.reason_phrase
+        converted.request = requests.Request(method, str(response.request.url)).prepare()
+        return converted
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'prior_knowledge': self.prior_knowledge,
+                'requests': self.requests,
+                'http2_responses': self.http2_responses,
+                'fallbacks': self.fallbacks
+            }
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,376 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from http2_transport import Http2Transport, Http2TransportError, http2_available
+from http_recorder import prepare_url, recorder_from_env
+from rate_limiter import HostRateLimiter
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+class ValidatorStore:
+    """
+    URL bazlı ETag / Last-Modified / içerik hash'i ve son parse sonucu
+
+    Boyutu sınırlıdır; en az kullanılan URL'ler atılır.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or int(os.environ.get('HTTP_VALIDATOR_CACHE_SIZE', 2000))
+        self._entries = OrderedDict()  # {key: {etag, last_modified, body_hash, parsed}}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class HttpClient:
+    """
+    Scraper'ların ortak kullandığı, thread-safe HTTP istemcisi
+
+    Her host için ayrı bir keep-alive bağlantı havuzu tutar; böylece
+    ravenscans.org, api.mangadex.org ve 9animetv.to isteklerinde her
+    seferinde yeni TCP+TLS el sıkışması yapılmaz.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, timeout=None, max_retries=None, rate_limiter=None,
+                 host_overrides=None, recorder=None, http2_hosts=None, http2_prior_knowledge=None):
+        # Havuz ayarları environment variable ile değiştirilebilir
+        self.pool_connections = pool_connections or int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))
+        self.pool_maxsize = pool_maxsize or int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+        self.timeout = timeout or float(os.environ.get('HTTP_TIMEOUT', 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get('HTTP_MAX_RETRIES', 0))
+
+        self.default_headers = {
+            'User-Agent': DEFAULT_USER_AGENT
+        }
+
+        # Host bazlı hız sınırı (eski sabit time.sleep(0.5) yerine)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else HostRateLimiter()
+
+        # Benchmark/test için host yönlendirmesi: {'ravenscans.org': 'http://127.0.0.1:8001'}
+        self.host_overrides = host_overrides or {}
+
+        # Offline ölçüm için kayıt / tekrar oynatma (bkz. http_recorder.py)
+        self.recorder = recorder if recorder is not None else recorder_from_env()
+
+        # Conditional GET için URL bazlı doğrulayıcılar
+        self.validators = ValidatorStore()
+
+        # Host bazlı devre kesiciler (site çöktüğünde timeout beklememek için)
+        self.breakers = {}
+
+        self._session = self._create_session()
+        self._lock = threading.Lock()
+
+        # API tipi kaynaklar için opsiyonel HTTP/2: HTTP2_HOSTS="api.mangadex.org"
+        if http2_hosts is None:
+            http2_hosts = [host.strip() for host in os.environ.get('HTTP2_HOSTS', '').split(',') if host.strip()]
+        if http2_prior_knowledge is None:
+            http2_prior_knowledge = os.environ.get('HTTP2_PRIOR_KNOWLEDGE', 'false').lower() == 'true'
+        self.http2_hosts = set(http2_hosts)
+        self._http2 = None
+        if self.http2_hosts:
+            if http2_available():
+                self._http2 = Http2Transport(
+                    timeout=self.timeout,
+                    headers=self.default_headers,
+                    max_connections=self.pool_maxsize,
+                    prior_knowledge=http2_prior_knowledge
+                )
+            else:
+                print("⚠ httpx[http2] kurulu değil, HTTP2_HOSTS yok sayılıyor (HTTP/1.1 kullanılacak)")
+        self._request_counts = {}  # {host: istek sayısı}
+        self._conditional_counts = {'not_modified': 0, 'unchanged': 0, 'parsed': 0}
+
+        # Streaming parse ayarları: okunacak en fazla byte ve okuma parçası
+        self.stream_max_bytes = int(os.environ.get('STREAM_MAX_BYTES', 2 * 1024 * 1024))
+        self.stream_chunk_size = int(os.environ.get('STREAM_CHUNK_SIZE', 16 * 1024))
+        # Erken kesmede kalan gövde bu kadar küçükse okunup bağlantı havuza döner
+        self.stream_drain_bytes = int(os.environ.get('STREAM_DRAIN_BYTES', 64 * 1024))
+        self._stream_counts = {'early_stops': 0, 'capped': 0, 'bytes_read': 0, 'bytes_skipped': 0}
+
+    def _create_session(self):
+        """Bağlantı havuzlu requests.Session oluşturur"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+            pool_block=False
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.default_headers)
+        return session
+
+    def _count_request(self, host):
+        """Host bazlı istek sayacını artırır"""
+        with self._lock:
+            self._request_counts[host] = self._request_counts.get(host, 0) + 1
+
+    def get_breaker(self, host):
+        """Host için devre kesiciyi döner (yoksa oluşturur)"""
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host)
+                self.breakers[host] = breaker
+            return breaker
+
+    def is_available(self, host):
+        """Host'un devresi açık değilse True döner"""
+        return self.get_breaker(host).is_available()
+
+    def _rewrite_url(self, parsed):
+        """host_overrides tanımlıysa isteği yönlendirilen adrese çevirir"""
+        target = self.host_overrides.get(parsed.netloc)
+        if not target:
+            return urlunparse(parsed)
+        target = urlparse(target)
+        return urlunparse(parsed._replace(scheme=target.scheme, netloc=target.netloc))
+
+    def request(self, method, url, breaker_key=None, **kwargs):
+        """
+        Havuzdaki bağlantıyı kullanarak istek gönderir
+        breaker_key: Devre kesici anahtarı (varsayılan host); ör. kapak indirmeleri
+        aynı host'taki bölüm sorgularının devresini açmasın diye ayrı anahtar kullanır
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        parsed = urlparse(url)
+        host = parsed.netloc
+
+        full_url = None
+        if self.recorder:
+            full_url = prepare_url(url, kwargs.get('params'))
+            if self.recorder.replaying:
+                self._count_request(host)
+                return self.recorder.replay(method, full_url)
+
+        breaker = self.get_breaker(breaker_key or host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"{breaker.name} devresi açık, istek gönderilmedi")
+
+        # Her çıkış yolunda sonuç kaydedilir; aksi halde yarım deneme isteği
+        # half-open devreyi kalıcı olarak kilitler
+        try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(host)
+            self._count_request(host)
+            if self.host_overrides:
+                url = self._rewrite_url(parsed)
+            response = self._send(host, method, url, **kwargs)
+        except Exception:
+            # Ağ hataları dışında httpx/decode hataları da kaynak arızası sayılır
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # KeyboardInterrupt / SystemExit: kaynak hakkında bilgi yok
+            breaker.release_probe()
+            raise
+
+        # Sunucu hataları ve throttle cevapları kaynak arızası sayılır
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        # 304 cevapları gövdesiz olduğundan kaydedilmez, önceki 200 kaydı kalır
+        if full_url and response.status_code != 304:
+            self.recorder.record(method, full_url, response)
+        return response
+
+    def _send(self, host, method, url, **kwargs):
+        """HTTP/2 açık host'larda httpx, diğerlerinde requests havuzu ile gönderir"""
+        if self._http2 is not None and host in self.http2_hosts:
+            try:
+                return self._http2.request(method, url, **kwargs)
+            except Http2TransportError:
+                pass  # HTTP/2 bağlantısı kurulamadı, HTTP/1.1 ile tekrar dene
+        return self._session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET isteği gönderir (requests.get ile aynı imza)"""
+        return self.request('GET', url, **kwargs)
+
+    def _count_conditional(self, outcome):
+        with self._lock:
+            self._conditional_counts[outcome] += 1
+
+    def _read_streamed(self, response, stream_parser):
+        """
+        Gövdeyi parça parça stream_parser'a verir; parser yeterli bilgiyi
+        topladığında ya da byte sınırı aşıldığında okumayı keser
+        Returns: (okunan kısmın hash'i, parse sonucu)
+        """
+        hasher = hashlib.sha1()
+        read = 0
+        outcome = None
+        # Kesildikten sonra kalan da aynı iterator'dan okunur; chunked gövdede yarım
+        # bırakılan iterator kapanırken urllib3 bağlantıyı kapatır
+        chunks = response.iter_content(chunk_size=self.stream_chunk_size)
+        try:
+            for chunk in chunks:
+                hasher.update(chunk)
+                read += len(chunk)
+                if stream_parser.feed(chunk):
+                    outcome = 'early_stops'
+                    break
+                if read >= self.stream_max_bytes:
+                    outcome = 'capped'
+                    break
+
+            skipped = 0
+            if outcome:
+                length = response.headers.get('Content-Length')
+                if length and length.isdigit():
+                    # Content-Length sıkıştırılmış gövdeyi sayar; raw.tell() de ağdan okunan byte'ları
+                    skipped = max(int(length) - response.raw.tell(), 0)
+                    # Az veri kaldıysa oku: bağlantı kapanmaz, havuza geri döner
+                    if skipped <= self.stream_drain_bytes and self._drain(response, chunks, skipped):
+                        skipped = 0
+                else:
+                    # Chunked: kalan boyut bilinmez; sınıra kadar okunur, bitmezse bağlantı kapanır
+                    self._drain(response, chunks, self.stream_drain_bytes)
+        finally:
+            response.close()
+
+        with self._lock:
+            self._stream_counts['bytes_read'] += read
+            if outcome:
+                self._stream_counts[outcome] += 1
+                self._stream_counts['bytes_skipped'] += skipped
+        return hasher.hexdigest(), stream_parser.close()
+
+    def _drain(self, response, chunks, limit):
+        """
+        Gövdenin kalanını en fazla limit byte okuyarak tüketir
+        (raw.tell() ağdan okunan sıkıştırılmış byte'ları sayar; chunked
+        gövdede güncellenmediğinden orada çözülmüş byte sayısı kullanılır)
+        Returns: gövde sonuna gelindiyse True (bağlantı havuza döner)
+        """
+        chunked = getattr(response.raw, 'chunked', False)
+        start = response.raw.tell()
+        drained = 0
+        for chunk in chunks:
+            drained = drained + len(chunk) if chunked else response.raw.tell() - start
+            if drained > limit:
+                return False
+        return True
+
+    def get_parsed(self, url, parse, params=None, headers=None, stream_parser=None, **kwargs):
+        """
+        Conditional GET yapar ve parse(response) sonucunu döner
+
+        Önceki cevabın ETag / Last-Modified değerleri If-None-Match /
+        If-Modified-Since olarak gönderilir. 304 gelirse ya da site
+        doğrulayıcıları yok sayıp aynı içeriği dönerse (içerik hash'i aynı)
+        sayfa tekrar parse edilmez, önceki sonuç döner.
+
+        stream_parser verilirse (feed(chunk) -> bitti_mi, close() -> sonuç)
+        gövde indirilirken parse edilir ve gerekli kısım okununca bağlantı
+        kesilir; parse bu durumda kullanılmaz. İçerik hash'i okunan kısım
+        üzerinden hesaplanır.
+
+        Returns: (status_code, parsed) - 200/304 dışındaki cevaplarda parsed None
+        """
+        key = url if not params else f"{url}?{sorted(params.items())}"
+        cached = self.validators.get(key)
+
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        streaming = stream_parser is not None
+        response = self.get(url, params=params, headers=request_headers, stream=streaming, **kwargs)
+
+        if response.status_code == 304 and cached:
+            self._count_conditional('not_modified')
+            return 200, cached['parsed']
+
+        if response.status_code != 200:
+            if streaming:
+                response.close()
+            return response.status_code, None
+
+        if streaming:
+            body_hash, parsed = self._read_streamed(response, stream_parser)
+            self._count_conditional('unchanged' if cached and cached.get('body_hash') == body_hash else 'parsed')
+        else:
+            body_hash = hashlib.sha1(response.content).hexdigest()
+            if cached and cached.get('body_hash') == body_hash:
+                parsed = cached['parsed']
+                self._count_conditional('unchanged')
+            else:
+                parsed = parse(response)
+                self._count_conditional('parsed')
+
+        self.validators.set(key, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'parsed': parsed
+        })
+        return 200, parsed
+
+    def get_stats(self):
+        """Host bazlı istek istatistiklerini döner"""
+        with self._lock:
+            return {
+                'pool_connections': self.pool_connections,
+                'pool_maxsize': self.pool_maxsize,
+                'timeout': self.timeout,
+                'requests_per_host': dict(self._request_counts),
+                'conditional': dict(self._conditional_counts),
+                'streaming': dict(self._stream_counts),
+                'validators': len(self.validators),
+                'breakers': {host: breaker.get_stats() for host, breaker in self.breakers.items()},
+                'recorder': self.recorder.get_stats() if self.recorder else None,
+                'http2': dict(self._http2.get_stats(), hosts=sorted(self.http2_hosts)) if self._http2 else None
+            }
+
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapatır"""
+        self._session.close()
+        if self._http2 is not None:
+            self._http2.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process genelinde paylaşılan HttpClient örneğini döner"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
@@ -0,0 +1,140 @@
+"""
+HttpClient için kayıt / tekrar oynatma (record / replay) katmanı
+
+record modunda gerçek sitelerden gelen cevaplar fixture dizinine yazılır;
+replay modunda aynı istekler ağa çıkmadan bu dosyalardan cevaplanır.
+Böylece scraper performansı gerçek sayfalarla, tamamen offline ölçülebilir.
+
+Dizin yapısı (host bazlı, içerik elle incelenebilir):
+    <dizin>/<host>/<anahtar>.json   -> method, url, status, headers
+    <dizin>/<host>/<anahtar>.body   -> ham cevap gövdesi
+"""
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+# Tekrar oynatmada anlamsız ya da yanıltıcı olan başlıklar saklanmaz
+SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'connection', 'content-length', 'set-cookie'}
+
+
+class FixtureMissingError(requests.ConnectionError):
+    """Replay modunda kaydı olmayan bir istek yapıldığında fırlatılır"""
+    pass
+
+
+def prepare_url(url, params=None):
+    """params'ı URL'e ekleyerek requests'in göndereceği tam URL'i döner"""
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+def fixture_key(method, url):
+    """Tam URL (query dahil) için dosya adı olarak kullanılacak anahtar"""
+    return hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+
+class HttpRecorder:
+    """
+    mode:
+        - 'record': Cevaplar fixture dizinine yazılır (istekler gerçekten gönderilir)
+        - 'replay': İstekler fixture dizininden cevaplanır, ağa çıkılmaz
+    """
+
+    MODES = ('record', 'replay')
+
+    def __init__(self, directory, mode='replay'):
+        if mode not in self.MODES:
+            raise ValueError(f"Geçersiz kayıt modu: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def _paths(self, method, url):
+        host = urlparse(url).netloc
+        key = fixture_key(method, url)
+        base = os.path.join(self.directory, host, key)
+        return f"{base}.json", f"{base}.body"
+
+    def load(self, method, url):
+        """Kaydı (meta, gövde) olarak döner, yoksa None"""
+        meta_path, body_path = self._paths(method, url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        return meta, body
+
+    def replay(self, method, url):
+        """Kayıtlı cevabı requests.Response olarak döner"""
+        record = self.load(method, url)
+        if record is None:
+            with self._lock:
+                self.missing += 1
+            raise FixtureMissingError(f"Fixture bulunamadı: {method} {url}")
+
+        meta, body = record
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.headers = CaseInsensitiveDict(meta.get('headers') or {})
+        response._content = body
+        # stream=True ile yapılan isteklerde iter_content hazır gövdeden okusun
+        response._content_consumed = True
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = requests.Request(method, url).prepare()
+        with self._lock:
+            self.replayed += 1
+        return response
+
+    def record(self, method, url, response):
+        """Gerçek cevabı fixture dizinine yazar"""
+        meta_path, body_path = self._paths(method, url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in SKIPPED_HEADERS
+        }
+        with open(body_path, 'wb') as f:
+            f.write(response.content)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'method': method.upper(),
+                'url': url,
+                'status': response.status_code,
+                'headers': headers
+            }, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            self.recorded += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'directory': self.directory,
+                'recorded': self.recorded,
+                'replayed': self.replayed,
+                'missing': self.missing
+            }
+
+
+def recorder_from_env():
+    """HTTP_RECORD_MODE / HTTP_FIXTURES_DIR tanımlıysa recorder oluşturur"""
+    mode = os.environ.get('HTTP_RECORD_MODE', '').lower()
+    if not mode or mode == 'off':
+        return None
+    return HttpRecorder(os.environ.get('HTTP_FIXTURES_DIR', 'fixtures'), mode)
@@ -0,0 +1,187 @@
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class JobQueueFullError(Exception):
+    """Bekleyen iş sayısı sınıra ulaştığında fırlatılır"""
+    pass
+
+
+class JobManager:
+    """
+    Büyük sorgu listeleri için arka plan iş kuyruğu
+
+    İşler sınırlı bir thread havuzunda çalışır; durum ve kısmi sonuçlar
+    `storage_dir` altında iş başına bir JSON dosyasına yazılır. Gunicorn
+    worker'ları ayrı process'ler olduğundan, işi başlatan worker'dan farklı
+    bir worker da aynı dosyadan durumu okuyabilir. Sonuçlar `ttl` saniye
+    sonra silinir.
+    """
+
+    def __init__(self, storage_dir=None, max_workers=None, ttl=None, max_pending=None):
+        self.storage_dir = storage_dir or os.environ.get(
+            'JOB_STORAGE_DIR',
+            os.path.join(tempfile.gettempdir(), 'manga_notificator_jobs')
+        )
+        self.max_workers = max_workers or int(os.environ.get('JOB_MAX_WORKERS', 2))
+        self.ttl = ttl if ttl is not None else float(os.environ.get('JOB_RESULT_TTL', 3600))
+        self.max_pending = max_pending or int(os.environ.get('JOB_MAX_PENDING', 20))
+        # Kısmi sonuçların diske yazılma aralığı (saniye)
+        self.write_interval = float(os.environ.get('JOB_WRITE_INTERVAL', 0.5))
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _path(self, job_id):
+        return os.path.join(self.storage_dir, f"{job_id}.json")
+
+    def _write(self, job):
+        """İş durumunu atomik olarak (geçici dosya + rename) yazar"""
+        path = self._path(job['id'])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id):
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def submit(self, kind, items, run):
+        """
+        Yeni iş oluşturur ve kuyruğa ekler
+
+        run(items) -> (index, sonuç) çiftleri üreten bir iterator dönmelidir
+        Returns: İşin ilk durumu (dict)
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError(f"En fazla {self.max_pending} iş bekleyebilir")
+            self._pending += 1
+
+        try:
+            self.purge_expired()
+            job = {
+                'id': uuid.uuid4().hex,
+                'type': kind,
+                'status': 'queued',
+                'total': len(items),
+                'completed': 0,
+                'results': [None] * len(items),
+                'error': None,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+            }
+            self._write(job)
+            snapshot = dict(job)
+            self._executor.submit(self._run, job, items, run)
+        except BaseException:
+            # İş kuyruğa girmedi (ör. disk dolu): ayrılan yer geri verilir
+            with self._lock:
+                self._pending -= 1
+            raise
+        return snapshot
+
+    def _run(self, job, items, run):
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+
+        try:
+            self._write(job)
+            last_write = time.monotonic()
+            for index, result in run(items):
+                job['results'][index] = result
+                job['completed'] += 1
+                if time.monotonic() - last_write >= self.write_interval:
+                    self._write(job)
+                    last_write = time.monotonic()
+            job['status'] = 'done'
+        except Exception as e:
+            print(f"❌ İş hatası ({job['id']}): {e}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = time.time()
+            try:
+                self._write(job)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+    def get(self, job_id):
+        """İşin güncel durumunu döner, yoksa ya da süresi dolmuşsa None"""
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        job = self._read(job_id)
+        if job and job['finished_at'] and time.time() - job['finished_at'] > self.ttl:
+            self._delete(job_id)
+            return None
+        return job
+
+    def wait(self, job_id, timeout, since=0):
+        """
+        Long-poll: İş bitene ya da `since`'ten fazla sonuç tamamlanana kadar
+        en fazla `timeout` saniye bekler
+        """
+        if not math.isfinite(timeout):
+            raise ValueError(f"Geçersiz bekleme süresi: {timeout}")
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job and job['status'] in ('queued', 'running') and job['completed'] <= since:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.write_interval, remaining))
+            job = self.get(job_id)
+        return job
+
+    def _delete(self, job_id):
+        try:
+            os.remove(self._path(job_id))
+        except OSError:
+            pass
+
+    def purge_expired(self):
+        """Süresi dolmuş iş dosyalarını siler"""
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.storage_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.storage_dir, name)
+            try:
+                # Biten işler bir daha yazılmadığından mtime ≈ finished_at
+                if os.path.getmtime(path) < cutoff:
+                    job = self._read(name[:-len('.json')])
+                    if not job or job['finished_at']:
+                        os.remove(path)
+            except OSError:
+                pass
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'ttl': self.ttl
+            }
@@ -0,0 +1,360 @@
+"""
+DatabaseManager için append-only değişiklik günlüğü (journal)
+
+Her değişiklik tek satırlık kompakt bir JSON kaydı olarak dosyanın sonuna
+eklenir; tüm veritabanını yeniden yazmak yerine O(1) ekleme yapılır.
+
+Kayıt biçimi (tek satır):
+    {"s": 42, "o": "set", "p": ["users", "ali", "fcm_token"], "v": "..."}
+    s: sıra numarası, o: işlem (set / del / append / remove), p: yol, v: değer
+
+İşlemler idempotenttir (append zaten varsa eklemez, remove/del yoksa bir şey
+yapmaz); bu yüzden snapshot ile günlük arasında çakışan kayıtların tekrar
+uygulanması sonucu değiştirmez. Sıkıştırma (compaction) sırasında mevcut
+günlük <dosya>.compacting adıyla kenara alınır, snapshot yazılınca silinir.
+
+Paylaşımlı modda (birden fazla gunicorn worker'ı) aynı günlüğe tüm process'ler
+FileLock altında ekleme yapar; diğer process'lerin eklediği kayıtlar tail() ile
+yalnızca yeni baytlar okunarak alınır. Günlük boyutu ve inode'u ucuz bir
+değişiklik sayacı (generation) işlevi görür.
+
+Sıkıştırmanın açtığı her yeni günlük {"base": <seq>} başlık satırıyla başlar
+(kendisinden önceki son sıra numarası). Okuyucu iki sıkıştırma arasında hiç
+okuma yapmadıysa aradaki nesil silinmiş olur; başlık (ya da ilk kaydın sıra
+numarası) bu boşluğu gösterir ve tail() JournalGapError fırlatır, çağıran
+snapshot + günlüğü baştan yüklemelidir.
+"""
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: process'ler arası kilit yok, paylaşımlı mod kullanılamaz
+    fcntl = None
+
+
+class JournalGapError(Exception):
+    """Okuyucunun görmediği bir günlük nesli snapshot'a sıkıştırılıp silindiğinde fırlatılır"""
+    pass
+
+
+def apply_operation(db, op):
+    """Tek bir günlük kaydını sözlüğe uygular"""
+    path = op['p']
+    parent = db
+    for key in path[:-1]:
+        parent = parent.setdefault(key, {})
+    last = path[-1]
+    kind = op['o']
+    if kind == 'set':
+        parent[last] = op.get('v')
+    elif kind == 'del':
+        parent.pop(last, None)
+    elif kind == 'append':
+        items = parent.setdefault(last, [])
+        if op['v'] not in items:
+            items.append(op['v'])
+    elif kind == 'remove':
+        items = parent.get(last)
+        if items and op['v'] in items:
+            items.remove(op['v'])
+    else:
+        raise ValueError(f"Bilinmeyen günlük işlemi: {kind}")
+
+
+def file_locking_available():
+    """fcntl.flock destekleniyorsa True döner"""
+    return fcntl is not None
+
+
+class FileLock:
+    """
+    Process'ler arası özel kilit (fcntl.flock)
+
+    Aynı process içinde yeniden girilebilir; thread'ler RLock ile sıralanır.
+    Kilit dosyası fork sonrası yeniden açılır (flock açık dosya başına tutulur,
+    fork ile paylaşılan tanımlayıcı worker'ları birbirinden ayırmaz).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self._pid = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                if self._pid != os.getpid():
+                    if self._fd is not None:
+                        os.close(self._fd)
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    self._pid = os.getpid()
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+
+class MutationJournal:
+    """
+    Satır bazlı değişiklik günlüğü
+
+    - fsync: Her kayıttan sonra fsync (elektrik kesintisine karşı); kapalıyken
+      kayıtlar işletim sistemine flush edilir, process çökmesinde kaybolmaz
+    - max_bytes: Günlük bu boyutu geçince sahibi snapshot'a sıkıştırmalıdır
+    - shared: Günlüğe başka process'ler de yazıyor; ekleme ve sıkıştırma
+      çağıranın FileLock'u altında yapılmalıdır
+    """
+
+    def __init__(self, path, max_bytes=None, fsync=None, shared=False):
+        self.path = path
+        self.rotated_path = f"{path}.compacting"
+        self.max_bytes = max_bytes or int(os.environ.get('DATABASE_JOURNAL_MAX_BYTES', 4 * 1024 * 1024))
+        if fsync is None:
+            fsync = os.environ.get('DATABASE_JOURNAL_FSYNC', 'false').lower() == 'true'
+        self.fsync = fsync
+        self.shared = shared
+        self.seq = 0
+        self.appended = 0
+        self.tailed = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._reader = None
+        self._reader_offset = 0
+
+    def _repair_tail(self):
+        """Çökme sonucu yarım kalmış son satırı keser (sonraki ekleme onunla birleşmesin)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # Son satır sonunu geriye doğru ara
+            position = size - 1
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    f.truncate(position - step + newline + 1)
+                    return
+                position -= step
+            f.truncate(0)
+
+    def _read(self, path, after):
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # Yarım kalmış son satır
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue
+                if op.get('s', 0) > after:
+                    yield op
+
+    def replay(self, after=0):
+        """Kenara alınmış ve güncel günlükteki `after`'dan sonraki kayıtları sırayla üretir"""
+        for path in (self.rotated_path, self.path):
+            for op in self._read(path, after):
+                self.seq = max(self.seq, op['s'])
+                yield op
+
+    def open(self, after=0):
+        """Günlüğü ekleme için açar; sıra numarası en az `after` olur"""
+        self._repair_tail()
+        with self._lock:
+            self.seq = max(self.seq, after)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self.shared:
+                # Buraya kadarki kayıtlar replay ile okundu; tail bundan sonrasını okur
+                self._reader = os.open(self.path, os.O_RDONLY)
+                self._reader_offset = os.fstat(self._reader).st_size
+        return self
+
+    def _follow_rotation(self):
+        """Başka bir process günlüğü sıkıştırdıysa ekleme dosyasını yenisine geçirir (kilit altında)"""
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self._file.fileno()).st_ino:
+            self._file.close()
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _read_new(self):
+        size = os.fstat(self._reader).st_size
+        if size <= self._reader_offset:
+            return []
+        # pread: fork ile paylaşılan tanımlayıcının konumuna dokunmaz
+        data = os.pread(self._reader, size - self._reader_offset, self._reader_offset)
+        end = data.rfind(b'\n') + 1  # Yazılmakta olan yarım satır sonraki tura kalır
+        lines = data[:end].splitlines()
+        if self._reader_offset == 0 and lines:
+            self._check_gap(lines[0])
+        self._reader_offset += end
+        ops = []
+        for line in lines:
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue
+            if op.get('s', 0) > self.seq:
+                self.seq = op['s']
+                ops.append(op)
+        return ops
+
+    def _check_gap(self, first_line):
+        """Yeni günlüğün ilk satırı bu process'in son gördüğü kayıttan sonrasını başlatmıyorsa JournalGapError"""
+        try:
+            first = json.loads(first_line)
+        except ValueError:
+            return
+        if 'base' in first:
+            base = first['base']
+        elif 's' in first:
+            base = first['s'] - 1  # Başlıksız (eski) günlük
+        else:
+            return
+        if base > self.seq:
+            raise JournalGapError(f"Günlükte {self.seq + 1}-{base} arası kayıtlar görülmedi")
+
+    def tail(self):
+        """
+        Bu process'in görmediği (başka process'lerin eklediği) kayıtları sırayla döner
+        Değişiklik yoksa maliyeti iki stat çağrısıdır. Günlük sıkıştırma ile
+        değiştirildiyse eski dosyanın kalanı okunup yeni dosyaya geçilir; arada
+        okunmamış bir nesil kaldıysa JournalGapError fırlatılır (kayıtlar uygulanmaz).
+        """
+        if not self.shared or self._reader is None:
+            return []
+        with self._lock:
+            ops = self._read_new()
+            while True:
+                try:
+                    current = os.stat(self.path).st_ino
+                except FileNotFoundError:
+                    break  # Sıkıştırma dosyayı değiştirmek üzere; sonraki çağrıda okunur
+                if current == os.fstat(self._reader).st_ino:
+                    break
+                os.close(self._reader)
+                self._reader = os.open(self.path, os.O_RDONLY)
+                self._reader_offset = 0
+                ops.extend(self._read_new())
+            self.tailed += len(ops)
+            return ops
+
+    def append(self, kind, path, value=None):
+        """Kaydı günlüğe ekler, kaydı döner"""
+        op = {'o': kind, 'p': path}
+        if kind != 'del':
+            op['v'] = value
+        with self._lock:
+            if self.shared:
+                self._follow_rotation()
+            self.seq += 1
+            op['s'] = self.seq
+            self._file.write(json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.appended += 1
+        return op
+
+    @property
+    def size(self):
+        with self._lock:
+            if not self._file:
+                return 0
+            if self.shared:
+                self._follow_rotation()
+            return os.fstat(self._file.fileno()).st_size
+
+    def needs_compaction(self):
+        return self.size >= self.max_bytes
+
+    def rotate(self):
+        """
+        Güncel günlüğü kenara alıp boş günlükle devam eder
+        Returns: kenara alınan son sıra numarası (snapshot bu noktayı kapsamalı)
+        """
+        with self._lock:
+            self._file.close()
+            if os.path.exists(self.rotated_path):
+                # Önceki sıkıştırma yarım kaldıysa kayıtları birleştir
+                with open(self.rotated_path, 'a', encoding='utf-8') as rotated, \
+                        open(self.path, 'r', encoding='utf-8') as current:
+                    rotated.write(current.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # Okuyucular yeni günlüğün hangi kayıttan sonra başladığını bilsin
+            self._file.write(json.dumps({'base': self.seq}) + '\n')
+            self._file.flush()
+            if self._reader is not None:
+                # Çağıran kilit altında tail() yaptı; okuyucu da yeni günlüğe geçer
+                os.close(self._reader)
+                self._reader = os.open(self.path, os.O_RDONLY)
+                self._reader_offset = os.fstat(self._reader).st_size
+            return self.seq
+
+    def discard_rotated(self):
+        """Snapshot yazıldıktan sonra kenara alınan günlüğü siler"""
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def reset(self, after):
+        """Dosyaları kapatır ve sıra numarasını snapshot'ınkine çeker (snapshot yeniden yüklenmeden önce)"""
+        with self._lock:
+            self._close_files()
+            self.seq = after
+
+    def get_stats(self):
+        return {
+            'path': self.path,
+            'seq': self.seq,
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'appended': self.appended,
+            'tailed': self.tailed,
+            'fsync': self.fsync,
+            'shared': self.shared
+        }
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+    def _close_files(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._reader is not None:
+            os.close(self._reader)
+            self._reader = None
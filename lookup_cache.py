@@ -0,0 +1,215 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_title(name: str) -> str:
+    """Cache anahtarı için başlığı normalize eder (küçük harf, tek boşluk)"""
+    return re.sub(r'\s+', ' ', str(name)).strip().lower()
+
+
+class _Call:
+    """Devam eden tek bir yükleme çağrısı"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Aynı anahtar için eşzamanlı çağrıları tek bir çağrıda birleştirir
+
+    İlk gelen çağrı fn()'i çalıştırır; o sırada aynı anahtarla gelen
+    diğer çağrılar bekler ve aynı sonucu (veya hatayı) alır.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self):
+        """Şu anda devam eden çağrı sayısı"""
+        with self._lock:
+            return len(self._calls)
+
+
+class LookupCache:
+    """
+    TTL + LRU sonuç cache'i
+
+    - ttl: Bu süre içindeki kayıtlar taze kabul edilir
+    - stale_ttl: TTL dolduktan sonra bu süre boyunca eski kayıt hemen
+      döner ve arka planda yenilenir (stale-while-revalidate)
+    - negative_ttl: Bulunamayan sonuçlar için daha kısa TTL
+    - maxsize: Aşıldığında en az kullanılan kayıt atılır
+
+    Cache'te olmayan bir anahtar için aynı anda gelen istekler SingleFlight
+    ile tek bir loader() çağrısında birleştirilir.
+    """
+
+    def __init__(self, name='lookup', maxsize=None, ttl=None, stale_ttl=None, negative_ttl=None, is_negative=None):
+        self.name = name
+        self.maxsize = maxsize or int(os.environ.get('LOOKUP_CACHE_SIZE', 1000))
+        self.ttl = ttl if ttl is not None else float(os.environ.get('LOOKUP_CACHE_TTL', 600))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.environ.get('LOOKUP_CACHE_STALE_TTL', 1800))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.environ.get('LOOKUP_CACHE_NEGATIVE_TTL', 120))
+        self.is_negative = is_negative or (lambda value: isinstance(value, dict) and not value.get('found'))
+
+        self._entries = OrderedDict()  # {key: (value, stored_at, ttl)}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def _store(self, key, value):
+        ttl = self.negative_ttl if self.is_negative(value) else self.ttl
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _load(self, key, loader):
+        """loader()'ı çalıştırıp sonucu cache'e yazar"""
+        value = loader()
+        self._store(key, value)
+        return value
+
+    def _refresh(self, key, loader):
+        """Arka planda kaydı yeniler"""
+        try:
+            self._flight.do(key, lambda: self._load(key, loader))
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            print(f"⚠ Cache yenileme hatası ({self.name}/{key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key, max_age=None):
+        """Taze kaydı (max_age verilmişse en fazla o kadar saniyelik olanı) döner, yoksa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < min(entry[2], max_age if max_age is not None else entry[2]):
+                self._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    def age(self, key):
+        """Kaydın kaç saniye önce yazıldığını döner, yoksa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.monotonic() - entry[1] if entry else None
+
+    def get_or_load(self, key, loader):
+        """
+        Kayıt tazeyse cache'ten, bayatsa cache'ten dönüp arka planda yeniler,
+        hiç yoksa ya da tamamen eskimişse loader() ile yükler
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                value, stored_at, ttl = entry
+                age = now - stored_at
+                if age < ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return value
+                if age < ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return value
+            self.misses += 1
+
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def get_recent_or_load(self, key, loader, max_age):
+        """
+        Kayıt en fazla `max_age` saniyelikse döner, değilse loader() ile yükleyip
+        cache'e yazar; bayat kayıt hiç dönmez (scheduler'ın doğrulama okuması)
+        """
+        value = self.get(key, max_age)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def set(self, key, value):
+        """Dışarıda (ör. toplu sorguyla) alınmış bir sonucu cache'e yazar"""
+        self._store(key, value)
+
+    def invalidate(self, key):
+        """Tek bir kaydı siler"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Tüm cache'i temizler"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Hit/miss sayaçlarını döner"""
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'refreshes': self.refreshes,
+                'coalesced': self._flight.coalesced,
+                'in_flight': self._flight.in_flight(),
+                'hit_rate': round((self.hits + self.stale_hits) / total, 3) if total else 0.0
+            }
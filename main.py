@@ -1,10 +1,11 @@
-import requests
+from http_client import get_http_client
 from bs4 import BeautifulSoup
 import re
 import time
 
 class MangaScraper:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_http_client()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
@@ -16,7 +17,7 @@ class MangaScraper:
             manga_slug = manga_name.lower().replace(' ', '-').replace(':', '')
             url = f"https://ravenscans.org/manga/{manga_slug}/"
             
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.http.get(url, headers=self.headers)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -53,7 +54,7 @@ class MangaScraper:
                 'contentRating[]': ['safe', 'suggestive', 'erotica'],
                 'order[relevance]': 'desc'
             }
-            response = requests.get(search_url, params=params, timeout=10)
+            response = self.http.get(search_url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -80,7 +81,7 @@ class MangaScraper:
                                 'includeFutureUpdates': '0'
                             }
                             time.sleep(0.5)  # Rate limiting
-                            chapters_response = requests.get(chapters_url, params=chapters_params, timeout=10)
+                            chapters_response = self.http.get(chapters_url, params=chapters_params)
                             
                             if chapters_response.status_code == 200:
                                 chapters_data = chapters_response.json()
@@ -0,0 +1,285 @@
+"""
+Hızlı, hedefli HTML parse yardımcıları (lxml + XPath)
+
+Tüm sayfa için BeautifulSoup ağacı kurmak yerine lxml ile parse edip
+yalnızca ihtiyaç duyulan düğümleri XPath ile seçer. Sonuç formatı
+scraper'lardaki BeautifulSoup tabanlı parser'larla aynıdır:
+(bölüm_numarası, bölüm_url, görsel_url)
+"""
+import html
+import json
+import os
+import re
+
+import lxml.html
+from lxml import etree
+
+
+# 'soup' seçilirse eski BeautifulSoup parser'ları kullanılır
+PARSER_MODE = os.environ.get('PARSER_MODE', 'fast').lower()
+
+# Raven Scans sayfalarını indirirken parça parça parse edip bölüm listesi
+# bitince okumayı kesme (yalnızca hızlı parser ile)
+STREAM_PARSE = os.environ.get('STREAM_PARSE', 'true').lower() == 'true'
+
+# 9animetv'de izleme sayfası yerine sayfanın kendisinin yüklediği
+# /ajax/episode/list/<id> parçasını okuma
+ANIME_EPISODE_LIST = os.environ.get('ANIME_EPISODE_LIST', 'true').lower() == 'true'
+
+CHAPTER_TEXT_PATTERN = re.compile(r'Chapter\s+(\d+(?:\.\d+)?)', re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+EPISODE_TITLE_PATTERN = re.compile(r'Episode\s+(\d+)', re.IGNORECASE)
+
+RAVEN_COVER_XPATH = etree.XPath(
+    "//img[contains(@class, 'wp-post-image') or contains(@class, 'attachment')]"
+)
+LAZY_IMG_XPATH = etree.XPath("//img[@loading='lazy']")
+CHAPTER_LINKS_XPATH = etree.XPath("//a[contains(@href, $pattern)]")
+
+LATEST_UPDATE_ITEMS_XPATH = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' utao ')]"
+)
+SERIES_LINK_XPATH = etree.XPath(".//a[contains(@href, '/manga/')]")
+ITEM_CHAPTER_LINKS_XPATH = etree.XPath(".//a[contains(@href, '-chapter-')]")
+SERIES_SLUG_PATTERN = re.compile(r'/manga/([^/?#]+)')
+CHAPTER_URL_PATTERN = re.compile(r'-chapter-(\d+(?:\.\d+)?)')
+
+ANIME_POSTER_XPATH = etree.XPath(
+    "//img[contains(concat(' ', normalize-space(@class), ' '), ' film-poster-img ')]"
+)
+EPISODES_SECTION_XPATH = etree.XPath("//div[@id='episodes-content']")
+SS_LIST_XPATH = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' ss-list ')]")
+EPISODE_LINKS_XPATH = etree.XPath(".//a[contains(concat(' ', normalize-space(@class), ' '), ' ep-item ')]")
+ANIME_ID_PATTERN = re.compile(r'-(\d+)/?$')
+# Bölüm listesi parçası yalnızca ep-item linklerinden oluşur; ağaç kurmadan etiketler taranır
+EPISODE_TAG_PATTERN = re.compile(r'<a\s[^>]*ep-item[^>]*>')
+DATA_NUMBER_PATTERN = re.compile(r'data-number\s*=\s*["\'](\d+)["\']')
+ATTRIBUTE_PATTERN = re.compile(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+def use_fast_parser() -> bool:
+    return PARSER_MODE != 'soup'
+
+
+def use_stream_parser() -> bool:
+    return STREAM_PARSE and use_fast_parser()
+
+
+def use_episode_list() -> bool:
+    return ANIME_EPISODE_LIST
+
+
+def _absolute(url, base_url):
+    if url and not url.startswith('http'):
+        return f"{base_url}{url}"
+    return url
+
+
+def parse_ravenscans_page(content, manga_slug, base_url='https://ravenscans.org'):
+    """Raven Scans manga sayfasından son bölümü ve kapağı çıkarır"""
+    if not content:
+        return None, None, None
+    doc = lxml.html.fromstring(content)
+
+    # Manga kapak görselini bul
+    image_url = None
+    images = RAVEN_COVER_XPATH(doc) or LAZY_IMG_XPATH(doc)
+    if images:
+        image_url = _absolute(images[0].get('src') or images[0].get('data-src'), base_url)
+
+    latest_chapter_num = None
+    latest_chapter_url = None
+    for link in CHAPTER_LINKS_XPATH(doc, pattern=f'/{manga_slug}-chapter-'):
+        chapter_text = link.text_content()
+        match = CHAPTER_TEXT_PATTERN.search(chapter_text) or NUMBER_PATTERN.search(chapter_text)
+        if match:
+            chapter_num = float(match.group(1))
+            if latest_chapter_num is None or chapter_num > latest_chapter_num:
+                latest_chapter_num = chapter_num
+                latest_chapter_url = link.get('href')
+
+    if latest_chapter_num:
+        return str(int(latest_chapter_num)), _absolute(latest_chapter_url, base_url), image_url
+    return None, None, None
+
+
+class RavenscansStreamParser:
+    """
+    Raven Scans manga sayfasını indirilirken parça parça parse eder
+
+    feed(chunk) bölüm listesi (#chapterlist) kapandığında ve kapak bulunduğunda
+    True döner; çağıran taraf okumayı kesebilir. Liste sonrasındaki yorum,
+    script ve reklam bölümleri hiç indirilmez. Sonuç parse_ravenscans_page ile
+    aynı formattadır; yalnızca listeden sonra gelen linkler dikkate alınmaz.
+    """
+
+    def __init__(self, manga_slug, base_url='https://ravenscans.org'):
+        self.base_url = base_url
+        self._pattern = f'/{manga_slug}-chapter-'
+        # Yalnızca ilgilenilen etiketler için olay üretilir (#chapterlist bir div)
+        self._parser = etree.HTMLPullParser(events=('end',), tag=('img', 'a', 'div'))
+        self._cover = None
+        self._lazy_cover = None
+        self._latest_num = None
+        self._latest_url = None
+        self._list_closed = False
+
+    def _handle(self, element):
+        tag = element.tag
+        if tag == 'img':
+            src = element.get('src') or element.get('data-src')
+            classes = element.get('class') or ''
+            if self._cover is None and ('wp-post-image' in classes or 'attachment' in classes):
+                self._cover = src
+            elif self._lazy_cover is None and element.get('loading') == 'lazy':
+                self._lazy_cover = src
+        elif tag == 'a':
+            if self._pattern in (element.get('href') or ''):
+                chapter_text = ''.join(element.itertext())
+                match = CHAPTER_TEXT_PATTERN.search(chapter_text) or NUMBER_PATTERN.search(chapter_text)
+                if match:
+                    chapter_num = float(match.group(1))
+                    if self._latest_num is None or chapter_num > self._latest_num:
+                        self._latest_num = chapter_num
+                        self._latest_url = element.get('href')
+        elif element.get('id') == 'chapterlist':
+            self._list_closed = True
+
+    @property
+    def done(self):
+        return self._list_closed and (self._cover or self._lazy_cover) is not None
+
+    def feed(self, chunk):
+        """Yeni veri parçasını işler, yeterli bilgi toplandıysa True döner"""
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            self._handle(element)
+        return self.done
+
+    def close(self):
+        """(bölüm_numarası, bölüm_url, görsel_url) döner"""
+        if not self.done:
+            try:
+                self._parser.close()
+                for _, element in self._parser.read_events():
+                    self._handle(element)
+            except etree.LxmlError:
+                pass
+        image_url = _absolute(self._cover or self._lazy_cover, self.base_url)
+        if self._latest_num:
+            return str(int(self._latest_num)), _absolute(self._latest_url, self.base_url), image_url
+        return None, None, None
+
+
+def parse_ravenscans_latest_updates(content, base_url='https://ravenscans.org'):
+    """
+    Raven Scans ana sayfasındaki "son güncellemeler" listesini parse eder
+    Returns: [(slug, bölüm_numarası, bölüm_url)] - sayfadaki sırayla (en yeni önce)
+    """
+    if not content:
+        return []
+    doc = lxml.html.fromstring(content)
+
+    entries = []
+    for item in LATEST_UPDATE_ITEMS_XPATH(doc):
+        series_links = SERIES_LINK_XPATH(item)
+        if not series_links:
+            continue
+        slug_match = SERIES_SLUG_PATTERN.search(series_links[0].get('href', ''))
+        if not slug_match:
+            continue
+
+        latest_num = None
+        latest_url = None
+        for link in ITEM_CHAPTER_LINKS_XPATH(item):
+            match = CHAPTER_URL_PATTERN.search(link.get('href', '')) or CHAPTER_TEXT_PATTERN.search(link.text_content())
+            if match:
+                chapter_num = float(match.group(1))
+                if latest_num is None or chapter_num > latest_num:
+                    latest_num = chapter_num
+                    latest_url = link.get('href')
+
+        if latest_num:
+            entries.append((slug_match.group(1), str(int(latest_num)), _absolute(latest_url, base_url)))
+    return entries
+
+
+def latest_episode_from_links(episode_links, base_url):
+    """ep-item linkleri arasından en yüksek bölümü bulur"""
+    latest_episode_num = None
+    latest_episode_url = None
+    for link in episode_links:
+        ep_num = None
+        ep_data_number = link.get('data-number')
+        if ep_data_number:
+            try:
+                ep_num = int(ep_data_number)
+            except ValueError:
+                pass
+        if not ep_num:
+            match = EPISODE_TITLE_PATTERN.search(link.get('title', ''))
+            if match:
+                ep_num = int(match.group(1))
+        if ep_num and (latest_episode_num is None or ep_num > latest_episode_num):
+            latest_episode_num = ep_num
+            latest_episode_url = link.get('href')
+
+    if latest_episode_num:
+        return str(latest_episode_num), _absolute(latest_episode_url, base_url)
+    return None, None
+
+
+def parse_anime_page(content, base_url='https://9animetv.to'):
+    """9animetv izleme sayfasından son bölümü ve posteri çıkarır"""
+    if not content:
+        return None, None, None
+    doc = lxml.html.fromstring(content)
+
+    image_url = None
+    posters = ANIME_POSTER_XPATH(doc)
+    if posters:
+        image_url = _absolute(posters[0].get('src') or posters[0].get('data-src'), base_url)
+
+    sections = EPISODES_SECTION_XPATH(doc) or SS_LIST_XPATH(doc)
+    if sections:
+        episode, url = latest_episode_from_links(EPISODE_LINKS_XPATH(sections[0]), base_url)
+        if episode:
+            return episode, url, image_url
+    return None, None, None
+
+
+def anime_id_from_watch_url(url):
+    """İzleme sayfası URL'inden (/watch/one-piece-100) 9animetv anime ID'sini çıkarır"""
+    if not url:
+        return None
+    match = ANIME_ID_PATTERN.search(url.split('?', 1)[0].split('#', 1)[0])
+    return match.group(1) if match else None
+
+
+def parse_anime_episode_list(content, base_url='https://9animetv.to'):
+    """
+    /ajax/episode/list/<id> cevabından ({"status": true, "html": "..."})
+    son bölümü çıkarır
+    Returns: (bölüm_numarası, bölüm_url)
+    """
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return None, None
+    fragment = payload.get('html') if isinstance(payload, dict) else None
+    if not fragment:
+        return None, None
+    # Yalnızca en yüksek numaralı etiketin öznitelikleri ayrıştırılır
+    latest_num, latest_tag = None, None
+    for match in EPISODE_TAG_PATTERN.finditer(fragment):
+        tag = match.group(0)
+        number = DATA_NUMBER_PATTERN.search(tag) or EPISODE_TITLE_PATTERN.search(tag)
+        if number and (latest_num is None or int(number.group(1)) > latest_num):
+            latest_num, latest_tag = int(number.group(1)), tag
+    if latest_tag is None:
+        return None, None
+    attributes = {
+        name.lower(): html.unescape(double or single)
+        for name, double, single in ATTRIBUTE_PATTERN.findall(latest_tag)
+    }
+    return str(latest_num), _absolute(attributes.get('href'), base_url)
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Basit token-bucket hız sınırlayıcı
+
+    Saniyede `rate` token eklenir, en fazla `burst` token birikir.
+    acquire() token yoksa gerekli süre kadar bekler.
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Token alır, beklenen süreyi (saniye) döner"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            self._refill(time.monotonic())
+            # Token'ı şimdiden ayır, gerekirse eksiye düşür ve farkı bekle
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    Host bazlı token-bucket havuzu
+
+    Varsayılan hız SOURCE_RATE_LIMIT (istek/saniye) ve SOURCE_RATE_BURST ile,
+    host'a özel hızlar SOURCE_RATE_LIMITS="api.mangadex.org=5,ravenscans.org=2"
+    formatında ayarlanır.
+    """
+
+    def __init__(self, default_rate=None, default_burst=None, overrides=None):
+        self.default_rate = default_rate if default_rate is not None else float(os.environ.get('SOURCE_RATE_LIMIT', 2))
+        self.default_burst = default_burst if default_burst is not None else float(os.environ.get('SOURCE_RATE_BURST', 4))
+        self.overrides = overrides if overrides is not None else self._parse_overrides(os.environ.get('SOURCE_RATE_LIMITS', ''))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_overrides(value):
+        """'host=rate,host=rate' formatındaki ayarı sözlüğe çevirir"""
+        overrides = {}
+        for item in value.split(','):
+            if '=' not in item:
+                continue
+            host, rate = item.split('=', 1)
+            try:
+                overrides[host.strip()] = float(rate)
+            except ValueError:
+                print(f"⚠ Geçersiz rate limit ayarı: {item}")
+        return overrides
+
+    def set_rate(self, host, rate, burst=None):
+        """Bir host için hız sınırını değiştirir"""
+        with self._lock:
+            self.overrides[host] = rate
+            self._buckets[host] = TokenBucket(rate, burst if burst is not None else self.default_burst)
+
+    def _get_bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = self.overrides.get(host, self.default_rate)
+                bucket = TokenBucket(rate, self.default_burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, host) -> float:
+        """İlgili host için token alır"""
+        return self._get_bucket(host).acquire()
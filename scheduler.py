@@ -4,9 +4,12 @@ import time
 import os
 from database import DatabaseManager
 from firebase_config import FirebaseNotificationService
+from feed_ingest import LatestFeedIngestor
+from lookup_cache import normalize_title
 
 class MangaScheduler:
-    def __init__(self, manga_scraper, anime_scraper, notification_service: FirebaseNotificationService, db_manager: DatabaseManager):
+    def __init__(self, manga_scraper, anime_scraper, notification_service: FirebaseNotificationService, db_manager: DatabaseManager,
+                 feed_ingestor: LatestFeedIngestor = None):
         self.manga_scraper = manga_scraper
         self.anime_scraper = anime_scraper
         self.notification_service = notification_service
@@ -14,6 +17,15 @@ class MangaScheduler:
         self.scheduler = BackgroundScheduler()
         self.is_running = False
         self.test_mode = os.environ.get('TEST_MODE', 'false').lower() == 'true'
+        
+        # Site geneli akış okuma (FEED_INGEST=false ile kapatılabilir)
+        if feed_ingestor is None and os.environ.get('FEED_INGEST', 'true').lower() == 'true':
+            feed_ingestor = LatestFeedIngestor(manga_scraper, db_manager)
+        self.feed_ingestor = feed_ingestor
+        
+        # Kontrolde lookup cache'inden yalnızca bu kadar saniyelik sonuçlar kullanılır;
+        # API'nin bayat (stale-while-revalidate) kayıtları bildirimi geciktirmesin
+        self.verify_max_age = float(os.environ.get('SCHEDULER_CACHE_MAX_AGE', 60))
     
     def check_single_manga_by_position(self):
         """Her 14 dakikada bir, sıradaki pozisyondaki mangaları kontrol eder"""
@@ -55,61 +67,33 @@ class MangaScheduler:
             
             updates_found = []
             
-            # Bu pozisyondaki her mangayı kontrol et
-            for manga_name in manga_at_position:
+            # Site geneli son güncelleme akışlarını oku; akışlarla durumu
+            # kesinleşen başlıklar için tekil sorgu atılmaz
+            feed_results, covered = {}, set()
+            if self.feed_ingestor:
                 try:
-                    print(f"🔍 Kontrol ediliyor: {manga_name}")
-                    
-                    # Manga bilgilerini çek
-                    manga_info = self.manga_scraper.get_latest_chapter(manga_name)
-                    
-                    if manga_info['found']:
-                        new_chapter = manga_info['chapter']
-                        
-                        # Önceki bölüm bilgisini al
-                        old_info = self.db_manager.get_manga_chapter(manga_name)
-                        
-                        # Bölüm değişikliğini kontrol et
-                        is_new, has_changed = self.db_manager.check_chapter_changed(manga_name, new_chapter)
-                        
-                        if is_new:
-                            # İlk kez kontrol ediliyor - sadece kaydet
-                            print(f"  📝 İlk kayıt: {manga_name} - Chapter {new_chapter}")
-                            self.db_manager.update_manga_chapter(
-                                manga_name=manga_name,
-                                chapter=new_chapter,
-                                url=manga_info['url'],
-                                image=manga_info['image']
-                            )
-                        elif has_changed:
-                            # Bölüm değişmiş - güncelle ve bildirim gönder
-                            old_chapter = old_info['chapter'] if old_info else 'unknown'
-                            print(f"  ✅ YENİ BÖLÜM: {manga_name} - {old_chapter} → {new_chapter}")
-                            
-                            # Veritabanını güncelle
-                            self.db_manager.update_manga_chapter(
-                                manga_name=manga_name,
-                                chapter=new_chapter,
-                                url=manga_info['url'],
-                                image=manga_info['image']
-                            )
-                            
-                            # Güncelleme bilgisini kaydet
-                            updates_found.append({
-                                'manga_name': manga_name,
-                                'chapter': new_chapter,
-                                'url': manga_info['url'],
-                                'image': manga_info['image'],
-                                'old_chapter': old_chapter
-                            })
-                        else:
-                            print(f"  ℹ Değişiklik yok: {manga_name} - Chapter {new_chapter}")
-                    else:
-                        print(f"  ❌ Bulunamadı: {manga_name}")
-                    
+                    feed_results, covered = self.feed_ingestor.collect(self.db_manager.get_all_tracked_manga())
+                    print(f"📰 Akışlardan {len(feed_results)} güncelleme, {len(covered)} başlık kapsandı")
                 except Exception as e:
-                    print(f"  ❌ Hata ({manga_name}): {e}")
-                    continue
+                    print(f"⚠ Akış okuma hatası: {e}")
+            
+            for manga_name, manga_info in feed_results.items():
+                print(f"📰 Akıştan: {manga_name}")
+                self._process_manga_info(manga_name, manga_info, updates_found)
+            
+            # Bu pozisyondaki kalan mangaları çek (MangaDex'tekiler toplu sorgulanır).
+            # Cache'ten yalnızca verify_max_age'den yeni sonuçlar okunur
+            manga_names = [manga_name for manga_name in manga_at_position if manga_name not in covered]
+            manga_infos = self.manga_scraper.get_latest_chapters(manga_names, max_age=self.verify_max_age)
+            
+            # Bu pozisyondaki her mangayı kontrol et
+            for manga_name, manga_info in zip(manga_names, manga_infos):
+                print(f"🔍 Kontrol ediliyor: {manga_name}")
+                self._process_manga_info(manga_name, manga_info, updates_found)
+                if manga_info['found'] and self.feed_ingestor:
+                    # Doğrulama zamanı sonucun kaynaktan alındığı an
+                    age = self.manga_scraper.cache.age(normalize_title(manga_name)) or 0
+                    self.feed_ingestor.mark_verified(manga_name, age)
             
             # Güncelleme varsa bildirimleri gönder
             if updates_found:
@@ -134,6 +118,56 @@ class MangaScheduler:
         except Exception as e:
             print(f"❌ Kontrol hatası: {e}")
     
+    def _process_manga_info(self, manga_name, manga_info, updates_found):
+        """Tek bir manganın sonucunu kayıtla karşılaştırır, değiştiyse updates_found'a ekler"""
+        try:
+            if manga_info['found']:
+                new_chapter = manga_info['chapter']
+                
+                # Önceki bölüm bilgisini al
+                old_info = self.db_manager.get_manga_chapter(manga_name)
+                
+                # Bölüm değişikliğini kontrol et
+                is_new, has_changed = self.db_manager.check_chapter_changed(manga_name, new_chapter)
+                
+                if is_new:
+                    # İlk kez kontrol ediliyor - sadece kaydet
+                    print(f"  📝 İlk kayıt: {manga_name} - Chapter {new_chapter}")
+                    self.db_manager.update_manga_chapter(
+                        manga_name=manga_name,
+                        chapter=new_chapter,
+                        url=manga_info['url'],
+                        image=manga_info['image']
+                    )
+                elif has_changed:
+                    # Bölüm değişmiş - güncelle ve bildirim gönder
+                    old_chapter = old_info['chapter'] if old_info else 'unknown'
+                    print(f"  ✅ YENİ BÖLÜM: {manga_name} - {old_chapter} → {new_chapter}")
+                    
+                    # Veritabanını güncelle
+                    self.db_manager.update_manga_chapter(
+                        manga_name=manga_name,
+                        chapter=new_chapter,
+                        url=manga_info['url'],
+                        image=manga_info['image']
+                    )
+                    
+                    # Güncelleme bilgisini kaydet
+                    updates_found.append({
+                        'manga_name': manga_name,
+                        'chapter': new_chapter,
+                        'url': manga_info['url'],
+                        'image': manga_info['image'],
+                        'old_chapter': old_chapter
+                    })
+                else:
+                    print(f"  ℹ Değişiklik yok: {manga_name} - Chapter {new_chapter}")
+            else:
+                print(f"  ❌ Bulunamadı: {manga_name}")
+            
+        except Exception as e:
+            print(f"  ❌ Hata ({manga_name}): {e}")
+    
     def check_manga_updates(self):
         """Eski metod - geriye uyumluluk için"""
         self.check_single_manga_by_position()
@@ -184,7 +218,7 @@ class MangaScheduler:
                     print(f"🔍 Kontrol ediliyor: {anime_name}")
                     
                     # Anime bilgilerini çek
-                    anime_info = self.anime_scraper.get_latest_episode(anime_name)
+                    anime_info = self.anime_scraper.get_latest_episode(anime_name, max_age=self.verify_max_age)
                     
                     if anime_info['found']:
                         new_episode = anime_info['episode']
@@ -264,13 +298,6 @@ class MangaScheduler:
     def _send_anime_update_notifications(self, updates):
         """Güncellenen animeler için bildirimleri gönderir"""
         try:
-            # Tüm kullanıcıları al
-            all_users = self.db_manager.get_all_users()
-            
-            if not all_users:
-                print("⚠ Bildirim gönderilecek kullanıcı yok")
-                return
-            
             # Her güncelleme için
             for update in updates:
                 anime_name = update['anime_name']
@@ -279,13 +306,8 @@ class MangaScheduler:
                 image = update['image']
                 old_episode = update['old_episode']
                 
-                # Bu anime'yi takip eden kullanıcıları bul
-                tokens_to_send = []
-                for device_id, user_data in all_users.items():
-                    if anime_name in user_data.get('anime_list', []):
-                        token = user_data.get('fcm_token') or user_data.get('token')
-                        if token:
-                            tokens_to_send.append(token)
+                # Bu anime'yi takip eden kullanıcıların token'ları (abonelik indeksinden)
+                tokens_to_send = self.db_manager.get_subscriber_tokens(anime_name, 'anime')
                 
                 if tokens_to_send:
                     # Bildirim başlığı ve içeriği
@@ -323,13 +345,6 @@ class MangaScheduler:
     def _send_update_notifications(self, updates):
         """Güncellenen mangalar için bildirimleri gönderir"""
         try:
-            # Tüm kullanıcıları al
-            all_users = self.db_manager.get_all_users()
-            
-            if not all_users:
-                print("⚠ Bildirim gönderilecek kullanıcı yok")
-                return
-            
             # Her güncelleme için
             for update in updates:
                 manga_name = update['manga_name']
@@ -338,11 +353,8 @@ class MangaScheduler:
                 image = update['image']
                 old_chapter = update['old_chapter']
                 
-                # Bu mangayı takip eden kullanıcıları bul
-                tokens_to_send = []
-                for device_id, user_data in all_users.items():
-                    if manga_name in user_data.get('manga_list', []):
-                        tokens_to_send.append(user_data['token'])
+                # Bu mangayı takip eden kullanıcıların token'ları (abonelik indeksinden)
+                tokens_to_send = self.db_manager.get_subscriber_tokens(manga_name, 'manga')
                 
                 if tokens_to_send:
                     # Bildirim başlığı ve içeriği
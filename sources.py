@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+
+from rate_limiter import HostRateLimiter
+
+
+class SourceAdapter:
+    """
+    Tek bir kaynağın (site/API) tanımı
+
+    - host: HttpClient'ın hız sınırı ve devre kesicisinde kullanılan host
+    - fetch(title) -> (bölüm, url, görsel): Başlık için tekil sorgu
+    - parse: Kaynağın sayfa/cevap parser'ı (fetch tarafından kullanılır)
+    - batch(titles) -> {title: sonuç}: Toplu sorgu desteği (opsiyonel)
+    - batch_filter(title) -> bool: Başlık toplu sorguya uygun mu
+    - max_concurrency: Kaynağa aynı anda yapılabilecek en fazla sorgu
+    - rate / burst: Host için saniyedeki istek bütçesi
+
+    Eşzamanlılık sınırları SOURCE_CONCURRENCY="ravenscans.org=2,api.mangadex.org=8"
+    ile host bazlı değiştirilebilir.
+    """
+
+    def __init__(self, name, host, fetch, parse=None, batch=None, batch_filter=None,
+                 max_concurrency=None, rate=None, burst=None):
+        self.name = name
+        self.host = host
+        self.fetch = fetch
+        self.parse = parse
+        self.batch = batch
+        self.batch_filter = batch_filter or (lambda title: True)
+
+        overrides = HostRateLimiter._parse_overrides(os.environ.get('SOURCE_CONCURRENCY', ''))
+        self.max_concurrency = int(overrides.get(host, max_concurrency or 2))
+        self.rate = rate
+        self.burst = burst
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    @property
+    def supports_batch(self):
+        return self.batch is not None
+
+    def _enter(self):
+        self._slots.acquire()
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def run(self, title):
+        """Tekil sorguyu kaynağın eşzamanlılık bütçesi içinde çalıştırır"""
+        self._enter()
+        try:
+            return self.fetch(title)
+        finally:
+            self._exit()
+
+    def run_batch(self, titles):
+        """Toplu sorguyu tek bir eşzamanlılık slotu kullanarak çalıştırır"""
+        self._enter()
+        try:
+            return self.batch(titles)
+        finally:
+            self._exit()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'host': self.host,
+                'max_concurrency': self.max_concurrency,
+                'rate': self.rate,
+                'supports_batch': self.supports_batch,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'calls': self.calls
+            }
+
+
+class SourceRegistry:
+    """
+    Kaynak adaptörlerinin sıralı kaydı (kayıt sırası = varsayılan deneme sırası)
+
+    Kaydedilen kaynağın istek bütçesi paylaşılan HostRateLimiter'a işlenir.
+    SOURCE_RATE_LIMITS ile host'a özel hız verilmişse o ayar korunur;
+    SOURCE_RATE_LIMIT=0 (sınırsız) iken bütçeler uygulanmaz.
+    """
+
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter
+        self._adapters = OrderedDict()
+
+    def register(self, adapter):
+        self._adapters[adapter.name] = adapter
+        limiter = self.rate_limiter
+        if (limiter and adapter.rate is not None and limiter.default_rate > 0
+                and adapter.host not in limiter.overrides):
+            limiter.set_rate(adapter.host, adapter.rate, adapter.burst)
+        return adapter
+
+    def get(self, name):
+        return self._adapters[name]
+
+    def names(self):
+        return list(self._adapters)
+
+    def __iter__(self):
+        return iter(list(self._adapters.values()))
+
+    def __contains__(self, name):
+        return name in self._adapters
+
+    def get_stats(self):
+        return {name: adapter.get_stats() for name, adapter in self._adapters.items()}
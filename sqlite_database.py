@@ -0,0 +1,505 @@
+"""
+DatabaseManager'ın SQLite (WAL) depolama katmanı
+
+JSON dosyasında her değişiklik tüm veritabanını yeniden yazar; burada her
+işlem yalnızca ilgili satırlara dokunur. Metot imzaları ve dönüş biçimleri
+DatabaseManager ile aynıdır, bu yüzden scraper/scheduler kodu değişmez.
+
+Tablolar:
+    users              -> kullanıcı, şifre hash'i, FCM token
+    subscriptions      -> kullanıcı başına manga/anime listeleri (sıra korunur)
+    manga_chapters     -> son bilinen manga bölümleri
+    anime_episodes     -> son bilinen anime bölümleri
+    mangadex_ids       -> başlık -> MangaDex ID
+    anime_watch_urls   -> başlık -> 9animetv izleme sayfası
+    meta               -> last_check ve migrasyon bilgisi
+
+İlk açılışta veritabanı boşsa mevcut database.json tek seferde aktarılır.
+Elle aktarım: python sqlite_database.py [database.json] [database.sqlite3]
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from database import DatabaseManager
+from journal import MutationJournal, apply_operation
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL DEFAULT '',
+    fcm_token TEXT NOT NULL DEFAULT '',
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (username, kind, title)
+);
+CREATE INDEX IF NOT EXISTS subscriptions_by_title ON subscriptions (kind, title);
+CREATE INDEX IF NOT EXISTS subscriptions_by_position ON subscriptions (username, kind, position);
+CREATE TABLE IF NOT EXISTS manga_chapters (
+    name TEXT PRIMARY KEY,
+    chapter TEXT,
+    url TEXT,
+    image TEXT,
+    last_checked TEXT
+);
+CREATE TABLE IF NOT EXISTS anime_episodes (
+    name TEXT PRIMARY KEY,
+    episode TEXT,
+    url TEXT,
+    image TEXT,
+    last_checked TEXT
+);
+CREATE TABLE IF NOT EXISTS mangadex_ids (
+    title_key TEXT PRIMARY KEY,
+    manga_id TEXT NOT NULL,
+    cover_filename TEXT,
+    resolved_at TEXT
+);
+CREATE TABLE IF NOT EXISTS anime_watch_urls (
+    title_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    image TEXT,
+    resolved_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+MANGA = 'manga'
+ANIME = 'anime'
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager ile aynı metotları sunan SQLite deposu
+
+    - WAL modu: okumalar yazmaları beklemez, birden fazla gunicorn worker'ı
+      aynı dosyayı güvenle açabilir (busy_timeout ile kilit beklenir)
+    - Tek bağlantı + kilit: Flask thread'leri ve scheduler aynı bağlantıyı
+      sırayla kullanır; her değişiklik kendi transaction'ında commit edilir
+    """
+
+    def __init__(self, db_path='database.sqlite3', json_path='database.json'):
+        if os.environ.get('RENDER'):
+            disk_path = os.environ.get('DATABASE_PATH', '/var/data')
+            self.db_path = os.path.join(disk_path, 'database.sqlite3')
+            json_path = os.path.join(disk_path, 'database.json')
+        else:
+            self.db_path = db_path
+
+        self.journal = None  # Değişiklikler SQLite'ın kendi WAL günlüğünde
+        self.shared = False  # SQLite kilitlemesi çok process'li erişimi zaten destekler
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(SCHEMA)
+
+        if json_path and os.path.exists(json_path) and self._get_meta('migrated_from') is None \
+                and self._count('users') == 0:
+            migrated = self.migrate_from_json(json_path)
+            print(f"📦 {json_path} SQLite'a aktarıldı: {migrated} kullanıcı")
+
+        print(f"📁 Database yolu: {self.db_path} (SQLite/WAL)")
+        print(f"📊 Başlangıçta {self._count('users')} kullanıcı yüklendi")
+
+    # YARDIMCILAR
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_one(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _execute(self, sql, params=()):
+        """Tek ifadeyi kendi transaction'ında çalıştırır, etkilenen satır sayısını döner"""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def _count(self, table):
+        return self._query_one(f'SELECT COUNT(*) FROM {table}')[0]
+
+    def _get_meta(self, key):
+        row = self._query_one('SELECT value FROM meta WHERE key = ?', (key,))
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def _user_exists(self, username):
+        return self._query_one('SELECT 1 FROM users WHERE username = ?', (username,)) is not None
+
+    def _titles(self, username, kind):
+        rows = self._query(
+            'SELECT title FROM subscriptions WHERE username = ? AND kind = ? ORDER BY position',
+            (username, kind)
+        )
+        return [row[0] for row in rows]
+
+    def _replace_titles(self, username, kind, titles):
+        """Listeyi sırasıyla yeniden yazar (çağıran transaction içinde)"""
+        self._conn.execute('DELETE FROM subscriptions WHERE username = ? AND kind = ?', (username, kind))
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO subscriptions (username, kind, title, position) VALUES (?, ?, ?, ?)',
+            [(username, kind, title, position) for position, title in enumerate(titles)]
+        )
+
+    def _update_titles(self, username, kind, titles):
+        with self._lock, self._conn:
+            if not self._user_exists(username):
+                return False
+            self._replace_titles(username, kind, titles)
+            return True
+
+    def _add_title(self, username, kind, title):
+        with self._lock, self._conn:
+            if not self._user_exists(username):
+                return False
+            self._conn.execute(
+                'INSERT OR IGNORE INTO subscriptions (username, kind, title, position) '
+                'SELECT ?, ?, ?, COALESCE(MAX(position), -1) + 1 FROM subscriptions WHERE username = ? AND kind = ?',
+                (username, kind, title, username, kind)
+            )
+            return True
+
+    def _remove_title(self, username, kind, title):
+        with self._lock, self._conn:
+            if not self._user_exists(username):
+                return False
+            self._conn.execute(
+                'DELETE FROM subscriptions WHERE username = ? AND kind = ? AND title = ?',
+                (username, kind, title)
+            )
+            return True
+
+    def _tracked(self, kind):
+        return [row[0] for row in self._query('SELECT DISTINCT title FROM subscriptions WHERE kind = ?', (kind,))]
+
+    # MIGRASYON
+
+    def migrate_from_json(self, json_path):
+        """database.json içeriğini (varsa günlüğüyle birlikte) tek transaction'da aktarır, kullanıcı sayısını döner"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # JSON deposu journal modunda çalıştıysa snapshot sonrası değişiklikler günlükte
+        for op in MutationJournal(f"{json_path}.journal").replay(after=data.get('journal_seq') or 0):
+            apply_operation(data, op)
+
+        with self._lock, self._conn:
+            conn = self._conn
+            for username, user in (data.get('users') or {}).items():
+                conn.execute(
+                    'INSERT OR REPLACE INTO users (username, password_hash, fcm_token, created_at) VALUES (?, ?, ?, ?)',
+                    (username, user.get('password_hash', ''), user.get('fcm_token') or '', user.get('created_at'))
+                )
+                self._replace_titles(username, MANGA, user.get('manga_list') or [])
+                self._replace_titles(username, ANIME, user.get('anime_list') or [])
+            conn.executemany(
+                'INSERT OR REPLACE INTO manga_chapters (name, chapter, url, image, last_checked) VALUES (?, ?, ?, ?, ?)',
+                [(name, info.get('chapter'), info.get('url'), info.get('image'), info.get('last_checked'))
+                 for name, info in (data.get('manga_chapters') or {}).items()]
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO anime_episodes (name, episode, url, image, last_checked) VALUES (?, ?, ?, ?, ?)',
+                [(name, info.get('episode'), info.get('url'), info.get('image'), info.get('last_checked'))
+                 for name, info in (data.get('anime_episodes') or {}).items()]
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO mangadex_ids (title_key, manga_id, cover_filename, resolved_at) VALUES (?, ?, ?, ?)',
+                [(key, info['manga_id'], info.get('cover_filename'), info.get('resolved_at'))
+                 for key, info in (data.get('mangadex_ids') or {}).items() if info.get('manga_id')]
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO anime_watch_urls (title_key, url, image, resolved_at) VALUES (?, ?, ?, ?)',
+                [(key, info['url'], info.get('image'), info.get('resolved_at'))
+                 for key, info in (data.get('anime_watch_urls') or {}).items() if info.get('url')]
+            )
+            if data.get('last_check'):
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_check', ?)", (data['last_check'],))
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (os.path.abspath(json_path),)
+            )
+        return len(data.get('users') or {})
+
+    # USER OPERATIONS
+
+    def create_user(self, username: str, password: str, fcm_token: str = None) -> bool:
+        """Yeni kullanıcı oluşturur"""
+        inserted = self._execute(
+            'INSERT OR IGNORE INTO users (username, password_hash, fcm_token, created_at) VALUES (?, ?, ?, ?)',
+            (username, self._hash_password(password), fcm_token or '', datetime.now().isoformat())
+        )
+        if not inserted:
+            print(f"⚠️ Kullanıcı zaten var: {username}")
+            return False
+
+        print(f"✅ Kullanıcı oluşturuldu: {username}")
+        print(f"📊 Toplam kullanıcı sayısı: {self._count('users')}")
+        return True
+
+    def authenticate_user(self, username: str, password: str) -> bool:
+        """Kullanıcı girişini doğrular"""
+        row = self._query_one('SELECT password_hash FROM users WHERE username = ?', (username,))
+        if not row:
+            return False
+        return self._verify_password(password, row['password_hash'])
+
+    def update_fcm_token(self, username: str, fcm_token: str) -> bool:
+        """Kullanıcının FCM token'ını günceller"""
+        return self._execute('UPDATE users SET fcm_token = ? WHERE username = ?', (fcm_token, username)) > 0
+
+    def add_or_update_user(self, device_id: str, token: str, manga_list: List[str] = None):
+        """Eski API uyumluluğu için - DEPRECATED"""
+        with self._lock, self._conn:
+            if not self._user_exists(device_id):
+                self._conn.execute(
+                    'INSERT INTO users (username, password_hash, fcm_token, created_at) VALUES (?, ?, ?, ?)',
+                    (device_id, '', token, datetime.now().isoformat())
+                )
+                self._replace_titles(device_id, MANGA, manga_list or [])
+            else:
+                self._conn.execute('UPDATE users SET fcm_token = ? WHERE username = ?', (token, device_id))
+                if manga_list is not None:
+                    self._replace_titles(device_id, MANGA, manga_list)
+        return True
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        """Kullanıcı bilgilerini getirir (şifre hash'i hariç)"""
+        row = self._query_one('SELECT fcm_token, created_at FROM users WHERE username = ?', (username,))
+        if not row:
+            return None
+        return {
+            'username': username,
+            'fcm_token': row['fcm_token'] or '',
+            'manga_list': self._titles(username, MANGA),
+            'anime_list': self._titles(username, ANIME),
+            'created_at': row['created_at']
+        }
+
+    def get_all_users(self) -> Dict:
+        """Tüm kullanıcıları JSON deposundaki biçimde getirir"""
+        with self._lock:
+            users = {
+                row['username']: {
+                    'password_hash': row['password_hash'],
+                    'fcm_token': row['fcm_token'] or '',
+                    'manga_list': [],
+                    'anime_list': [],
+                    'created_at': row['created_at']
+                }
+                for row in self._conn.execute('SELECT * FROM users')
+            }
+            for row in self._conn.execute('SELECT username, kind, title FROM subscriptions ORDER BY username, kind, position'):
+                users[row['username']][f"{row['kind']}_list"].append(row['title'])
+        print(f"📋 get_all_users çağrıldı - Kullanıcı sayısı: {len(users)}")
+        print(f"📄 Database path: {self.db_path}")
+        return users
+
+    def update_user_manga_list(self, username: str, manga_list: List[str]) -> bool:
+        """Kullanıcının manga listesini günceller"""
+        return self._update_titles(username, MANGA, manga_list)
+
+    def add_manga_to_user(self, username: str, manga_name: str) -> bool:
+        """Kullanıcının listesine manga ekler"""
+        return self._add_title(username, MANGA, manga_name)
+
+    def remove_manga_from_user(self, username: str, manga_name: str) -> bool:
+        """Kullanıcının listesinden manga çıkarır"""
+        return self._remove_title(username, MANGA, manga_name)
+
+    def remove_user(self, username: str) -> bool:
+        """Kullanıcıyı (ve listelerini) siler"""
+        return self._execute('DELETE FROM users WHERE username = ?', (username,)) > 0
+
+    # MANGA OPERATIONS
+
+    def update_manga_chapter(self, manga_name: str, chapter: str, url: str = None, image: str = None):
+        """Manga bölüm bilgisini günceller"""
+        self._execute(
+            'INSERT OR REPLACE INTO manga_chapters (name, chapter, url, image, last_checked) VALUES (?, ?, ?, ?, ?)',
+            (manga_name, chapter, url, image, datetime.now().isoformat())
+        )
+
+    def get_manga_chapter(self, manga_name: str) -> Optional[Dict]:
+        """Manga bölüm bilgisini getirir"""
+        row = self._query_one(
+            'SELECT chapter, url, image, last_checked FROM manga_chapters WHERE name = ?', (manga_name,)
+        )
+        return dict(row) if row else None
+
+    def get_all_manga_chapters(self) -> Dict:
+        """Tüm manga bölüm bilgilerini getirir"""
+        rows = self._query('SELECT name, chapter, url, image, last_checked FROM manga_chapters')
+        return {row['name']: {key: row[key] for key in ('chapter', 'url', 'image', 'last_checked')} for row in rows}
+
+    def update_last_check(self):
+        """Son kontrol zamanını günceller"""
+        self._set_meta('last_check', datetime.now().isoformat())
+
+    def get_last_check(self) -> Optional[str]:
+        """Son kontrol zamanını getirir"""
+        return self._get_meta('last_check')
+
+    # MANGADEX ID CACHE
+
+    def get_mangadex_id(self, title_key: str) -> Optional[Dict]:
+        """Başlık için çözümlenmiş MangaDex ID ve kapak bilgisini getirir"""
+        row = self._query_one(
+            'SELECT manga_id, cover_filename, resolved_at FROM mangadex_ids WHERE title_key = ?', (title_key,)
+        )
+        return dict(row) if row else None
+
+    def set_mangadex_id(self, title_key: str, manga_id: str, cover_filename: str = None):
+        """Başlığın MangaDex ID'sini kalıcı olarak kaydeder"""
+        self._execute(
+            'INSERT OR REPLACE INTO mangadex_ids (title_key, manga_id, cover_filename, resolved_at) VALUES (?, ?, ?, ?)',
+            (title_key, manga_id, cover_filename, datetime.now().isoformat())
+        )
+
+    def remove_mangadex_id(self, title_key: str) -> bool:
+        """Geçersiz hale gelen MangaDex ID kaydını siler"""
+        return self._execute('DELETE FROM mangadex_ids WHERE title_key = ?', (title_key,)) > 0
+
+    # ANIME OPERATIONS
+
+    def update_user_anime_list(self, username: str, anime_list: List[str]) -> bool:
+        """Kullanıcının anime listesini günceller"""
+        return self._update_titles(username, ANIME, anime_list)
+
+    def add_anime_to_user(self, username: str, anime_name: str) -> bool:
+        """Kullanıcının listesine anime ekler"""
+        return self._add_title(username, ANIME, anime_name)
+
+    def remove_anime_from_user(self, username: str, anime_name: str) -> bool:
+        """Kullanıcının listesinden anime çıkarır"""
+        return self._remove_title(username, ANIME, anime_name)
+
+    def get_anime_watch_url(self, title_key: str) -> Optional[Dict]:
+        """Anime için çözümlenmiş 9animetv izleme sayfasını getirir"""
+        row = self._query_one('SELECT url, image, resolved_at FROM anime_watch_urls WHERE title_key = ?', (title_key,))
+        return dict(row) if row else None
+
+    def set_anime_watch_url(self, title_key: str, url: str, image: str = None):
+        """
+        Anime'nin izleme sayfası URL'ini (ve posterini) kalıcı olarak kaydeder
+        Aynı URL için yeni poster verilmezse kayıtlı poster korunur
+        """
+        with self._lock, self._conn:
+            current = self._conn.execute(
+                'SELECT url, image FROM anime_watch_urls WHERE title_key = ?', (title_key,)
+            ).fetchone()
+            if current and current['url'] == url:
+                if not image or current['image'] == image:
+                    return
+            elif current is not None:
+                current = None  # URL değişti, eski poster geçersiz
+            self._conn.execute(
+                'INSERT OR REPLACE INTO anime_watch_urls (title_key, url, image, resolved_at) VALUES (?, ?, ?, ?)',
+                (title_key, url, image or (current['image'] if current else None), datetime.now().isoformat())
+            )
+
+    def remove_anime_watch_url(self, title_key: str) -> bool:
+        """Geçersiz hale gelen izleme sayfası kaydını siler"""
+        return self._execute('DELETE FROM anime_watch_urls WHERE title_key = ?', (title_key,)) > 0
+
+    def update_anime_episode(self, anime_name: str, episode: str, url: str = None, image: str = None):
+        """Anime bölüm bilgisini günceller"""
+        self._execute(
+            'INSERT OR REPLACE INTO anime_episodes (name, episode, url, image, last_checked) VALUES (?, ?, ?, ?, ?)',
+            (anime_name, episode, url, image, datetime.now().isoformat())
+        )
+
+    def get_anime_episode(self, anime_name: str) -> Optional[Dict]:
+        """Anime bölüm bilgisini getirir"""
+        row = self._query_one(
+            'SELECT episode, url, image, last_checked FROM anime_episodes WHERE name = ?', (anime_name,)
+        )
+        return dict(row) if row else None
+
+    def get_all_anime_episodes(self) -> Dict:
+        """Tüm anime bölüm bilgilerini getirir"""
+        rows = self._query('SELECT name, episode, url, image, last_checked FROM anime_episodes')
+        return {row['name']: {key: row[key] for key in ('episode', 'url', 'image', 'last_checked')} for row in rows}
+
+    # ANALYTICS
+
+    def get_stats(self) -> Dict:
+        """İstatistikleri döner"""
+        return {
+            'total_users': self._count('users'),
+            'total_manga': self._count('manga_chapters'),
+            'total_anime': self._count('anime_episodes'),
+            'last_check': self.get_last_check()
+        }
+
+    def get_all_tracked_manga(self) -> List[str]:
+        """Tüm kullanıcıların takip ettiği benzersiz manga listesi"""
+        return self._tracked(MANGA)
+
+    def get_all_tracked_anime(self) -> List[str]:
+        """Tüm kullanıcıların takip ettiği benzersiz anime listesi"""
+        return self._tracked(ANIME)
+
+    # ABONELİK SORGULARI (subscriptions_by_title / birincil anahtar indeksleri)
+
+    def get_subscribers(self, title: str, kind: str = MANGA) -> List[str]:
+        """Başlığı takip eden kullanıcı adları (kind: manga / anime)"""
+        rows = self._query('SELECT username FROM subscriptions WHERE kind = ? AND title = ?', (kind, title))
+        return [row[0] for row in rows]
+
+    def get_subscriber_tokens(self, title: str, kind: str = MANGA) -> List[str]:
+        """Başlığı takip eden kullanıcıların boş olmayan FCM token'ları (tekrarsız)"""
+        rows = self._query(
+            "SELECT DISTINCT u.fcm_token FROM subscriptions s JOIN users u ON u.username = s.username "
+            "WHERE s.kind = ? AND s.title = ? AND u.fcm_token != ''",
+            (kind, title)
+        )
+        return [row[0] for row in rows]
+
+    def get_user_titles(self, username: str, kind: str = MANGA) -> List[str]:
+        """Kullanıcının takip ettiği başlıklar"""
+        return self._titles(username, kind)
+
+    def is_subscribed(self, username: str, title: str, kind: str = MANGA) -> bool:
+        """Kullanıcı başlığı takip ediyor mu"""
+        return self._query_one(
+            'SELECT 1 FROM subscriptions WHERE username = ? AND kind = ? AND title = ?',
+            (username, kind, title)
+        ) is not None
+
+    def get_subscriber_count(self, title: str, kind: str = MANGA) -> int:
+        """Başlığın abone sayısı"""
+        return self._query_one(
+            'SELECT COUNT(*) FROM subscriptions WHERE kind = ? AND title = ?', (kind, title)
+        )[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'database.json'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'database.sqlite3'
+    manager = SQLiteDatabaseManager(target, json_path=None)
+    count = manager.migrate_from_json(source)
+    print(f"✅ {source} -> {target}: {count} kullanıcı aktarıldı")
+    manager.close()
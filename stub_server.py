@@ -0,0 +1,498 @@
+"""
+Benchmark ve lokal testler için sahte (stub) kaynak sunucuları
+
+Raven Scans, MangaDex API ve 9animetv sayfalarının yapısını taklit eden
+sentetik cevaplar üretir. Gerçek sitelere istek atmadan scraper ve HTTP
+katmanını ölçmek için kullanılır.
+
+fixtures_dir verilirse önce http_recorder ile kaydedilmiş gerçek cevaplar
+sunulur, kaydı olmayan istekler sentetik cevaplara düşer. Gecikme, gecikme
+sapması (jitter) ve hata oranı ayarlanabilir.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from http_recorder import HttpRecorder
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # h2 yoksa yalnızca HTTP/1.1 stub'ları kullanılabilir
+    h2 = None
+
+
+# Stub site tipi -> taklit ettiği gerçek host
+SITE_HOSTS = {
+    'ravenscans': 'ravenscans.org',
+    'mangadex': 'api.mangadex.org',
+    '9animetv': '9animetv.to',
+}
+
+
+def _slugify(name):
+    cleaned = re.sub(r'[^a-z0-9\s-]', '', name.lower())
+    return re.sub(r'-+', '-', cleaned.replace(' ', '-')).strip('-')
+
+
+def render_ravenscans_title_page(slug, latest_chapter=150, chapter_count=100, padding_kb=200):
+    """Raven Scans manga sayfasını taklit eden HTML üretir"""
+    chapters = []
+    for num in range(latest_chapter, max(latest_chapter - chapter_count, 0), -1):
+        chapters.append(
+            f'<li data-num="{num}"><div class="chbox"><div class="eph-num">'
+            f'<a href="https://ravenscans.org/{slug}-chapter-{num}/">'
+            f'<span class="chapternum">Chapter {num}</span>'
+            f'<span class="chapterdate">January 1, 2025</span></a></div></div></li>'
+        )
+    filler = '<div class="comment"><p>' + ('lorem ipsum dolor sit amet ' * 40) + '</p></div>'
+    padding = filler * max(1, (padding_kb * 1024) // len(filler))
+    return (
+        '<!DOCTYPE html><html><head><title>' + slug + '</title>'
+        '<script>var x = 1;</script></head><body>'
+        '<div class="bigcontent"><div class="thumb">'
+        f'<img width="225" height="320" src="https://ravenscans.org/wp-content/uploads/{slug}.jpg" '
+        'class="attachment- size- wp-post-image" loading="lazy"></div></div>'
+        '<div class="eplister" id="chapterlist"><ul class="clstyle">'
+        + ''.join(chapters) +
+        '</ul></div>'
+        + padding +
+        '</body></html>'
+    )
+
+
+def render_cover_png(seed, width=450, height=640):
+    """Kapak görselini taklit eden, seed'e göre renklenen PNG üretir (Pillow gerektirmez)"""
+    color = hashlib.md5(seed.encode('utf-8')).digest()[:3]
+    row = b'\x00' + color * width
+    raw = row * height
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(raw, 6))
+        + chunk(b'IEND', b'')
+    )
+
+
+def render_ravenscans_front_page(entries):
+    """Raven Scans ana sayfasındaki son güncellemeler listesini taklit eder"""
+    items = []
+    for slug, chapter in entries:
+        items.append(
+            f'<div class="utao"><div class="uta"><div class="luf">'
+            f'<a class="series" href="https://ravenscans.org/manga/{slug}/"><h4>{slug}</h4></a>'
+            f'<ul><li><a href="https://ravenscans.org/{slug}-chapter-{chapter}/">Chapter {chapter}</a></li></ul>'
+            f'</div></div></div>'
+        )
+    return '<html><body><div class="listupd">' + ''.join(items) + '</div></body></html>'
+
+
+def _anime_id(slug):
+    """Stub için slug'a bağlı sabit 9animetv anime ID'si"""
+    return 100 + zlib.crc32(slug.encode('utf-8')) % 90000
+
+
+def render_9anime_search_page(slug):
+    """9animetv arama sonuç sayfasını taklit eder"""
+    return (
+        '<html><body><div class="film_list-wrap">'
+        f'<div class="flw-item item"><div class="film-detail">'
+        f'<a class="name" href="/watch/{slug}-{_anime_id(slug)}">{slug}</a></div></div>'
+        '</div></body></html>'
+    )
+
+
+def render_9anime_episode_items(slug, anime_id, latest_episode=1100):
+    """9animetv bölüm listesi (ep-item) HTML parçasını üretir"""
+    return ''.join(
+        f'<a title="Episode {num}" class="ssl-item ep-item" data-number="{num}" data-id="{num}" '
+        f'href="/watch/{slug}-{anime_id}?ep={num}"><div class="ssli-order">{num}</div></a>'
+        for num in range(1, latest_episode + 1)
+    )
+
+
+def render_9anime_episode_list(anime_id, latest_episode=1100):
+    """/ajax/episode/list/<id> cevabını taklit eder (slug bilinmediğinden genel bir ad kullanılır)"""
+    return {
+        'status': True,
+        'html': '<div class="ss-list">' + render_9anime_episode_items('anime', anime_id, latest_episode) + '</div>'
+    }
+
+
+def render_9anime_watch_page(slug, latest_episode=1100, padding_kb=300):
+    """9animetv izleme sayfasını taklit eder (öneri/yorum blokları dolgu olarak eklenir)"""
+    anime_id = _anime_id(slug)
+    filler = '<div class="flw-item"><p>' + ('lorem ipsum dolor sit amet ' * 40) + '</p></div>'
+    padding = filler * max(1, (padding_kb * 1024) // len(filler))
+    return (
+        f'<html><body><div id="wrapper" data-id="{anime_id}"><div class="anime-detail">'
+        f'<img class="film-poster-img" src="https://9animetv.to/images/{slug}.jpg"></div>'
+        '<div id="episodes-content"><div class="ss-list">'
+        + render_9anime_episode_items(slug, anime_id, latest_episode) +
+        '</div></div>' + padding + '</div></body></html>'
+    )
+
+
+def render_mangadex_search(title, manga_id):
+    """MangaDex /manga arama cevabını taklit eder"""
+    return {
+        'result': 'ok',
+        'data': [{
+            'id': manga_id,
+            'type': 'manga',
+            'attributes': {
+                'title': {'en': title},
+                'altTitles': [],
+                'latestUploadedChapter': f'{manga_id}-latest'
+            },
+            'relationships': [{
+                'type': 'cover_art',
+                'attributes': {'fileName': f'{manga_id}.jpg'}
+            }]
+        }]
+    }
+
+
+def render_mangadex_feed(manga_id, chapter='200'):
+    """MangaDex /manga/{id}/feed cevabını taklit eder"""
+    return {
+        'result': 'ok',
+        'data': [{
+            'id': f'{manga_id}-latest',
+            'type': 'chapter',
+            'attributes': {'chapter': chapter, 'translatedLanguage': 'en'},
+            'relationships': [{'type': 'manga', 'id': manga_id}]
+        }]
+    }
+
+
+def encode_body(body, content_type='text/html; charset=utf-8'):
+    """Cevap gövdesini (bytes, content_type) olarak hazırlar; dict/list JSON'a çevrilir"""
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body)
+        content_type = 'application/json'
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    return data, content_type
+
+
+def route_request(site, raw_path):
+    """Site ve istek yolu için (status, gövde[, content_type]) döner; HTTP/1.1 ve HTTP/2 stub'ları paylaşır"""
+    parsed = urlparse(raw_path)
+    query = parse_qs(parsed.query)
+    path = parsed.path
+
+    if site == 'ravenscans':
+        match = re.match(r'^/manga/([^/]+)/?$', path)
+        if match:
+            return 200, render_ravenscans_title_page(match.group(1))
+        if path.startswith('/wp-content/uploads/'):
+            return 200, render_cover_png(path), 'image/png'
+        if path == '/' or re.match(r'^/page/\d+/?$', path):
+            page = int(path.strip('/').split('/')[-1]) if path != '/' else 1
+            entries = [(f'stub-manga-{i}', 150) for i in range((page - 1) * 20, page * 20)]
+            return 200, render_ravenscans_front_page(entries)
+    elif site == 'mangadex':
+        if path == '/chapter' and 'manga[]' in query:
+            chapters = []
+            for manga_id in query['manga[]']:
+                chapters.extend(render_mangadex_feed(manga_id)['data'])
+            return 200, {'result': 'ok', 'data': chapters, 'limit': 100, 'offset': 0, 'total': len(chapters)}
+        if path == '/chapter' and 'updatedAtSince' in query:
+            return 200, {'result': 'ok', 'data': [], 'limit': 100, 'offset': 0, 'total': 0}
+        if path == '/manga':
+            title = query.get('title', ['stub'])[0]
+            return 200, render_mangadex_search(title, _slugify(title))
+        match = re.match(r'^/manga/([^/]+)/feed$', path)
+        if match:
+            return 200, render_mangadex_feed(match.group(1))
+    elif site == '9animetv':
+        if path == '/filter':
+            keyword = query.get('keyword', ['stub'])[0]
+            return 200, render_9anime_search_page(_slugify(keyword))
+        if path.startswith('/images/'):
+            return 200, render_cover_png(path), 'image/png'
+        match = re.match(r'^/watch/(.+)-(\d+)$', path)
+        if match:
+            return 200, render_9anime_watch_page(match.group(1))
+        match = re.match(r'^/ajax/episode/list/(\d+)$', path)
+        if match:
+            return 200, render_9anime_episode_list(int(match.group(1)))
+
+    return 404, 'not found', 'text/plain'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Site tipine göre sahte cevap dönen handler"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, *content_type):
+        data, content_type = encode_body(body, *content_type)
+
+        # Conditional GET desteği: ETag eşleşirse 304 dön
+        etag = None
+        if status == 200 and self.server.etags:
+            etag = '"' + hashlib.md5(data).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_recorded(self, meta, body):
+        """Kaydedilmiş gerçek cevabı olduğu gibi gönderir"""
+        self.send_response(meta['status'])
+        for name, value in (meta.get('headers') or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            delay = server.latency + (server.random.random() * server.jitter if server.jitter else 0)
+            failed = server.error_rate and server.random.random() < server.error_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            with server.lock:
+                server.error_count += 1
+            return self._send(503, 'stub error', 'text/plain')
+
+        if server.recorder:
+            record = server.recorder.load('GET', f"https://{SITE_HOSTS[server.site]}{self.path}")
+            if record:
+                return self._send_recorded(*record)
+
+        return self._send(*route_request(server.site, self.path))
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connection_count += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        # İstemcinin okumayı erken kesmesi (streaming parse) normal bir durum
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Arka planda çalışan tek bir stub site sunucusu"""
+
+    def __init__(self, site, host='127.0.0.1', port=0, latency=0.0, etags=True, jitter=0.0, error_rate=0.0,
+                 fixtures_dir=None, seed=None):
+        self.httpd = _StubHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = site
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.error_rate = error_rate
+        self.httpd.etags = etags
+        self.httpd.recorder = HttpRecorder(fixtures_dir, 'replay') if fixtures_dir else None
+        self.httpd.random = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.error_count = 0
+        self.httpd.connection_count = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def error_count(self):
+        return self.httpd.error_count
+
+    @property
+    def connection_count(self):
+        return self.httpd.connection_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _H2StubProtocol(asyncio.Protocol):
+    """Tek bir h2c (prior knowledge) bağlantısı; her stream ayrı bir görevde cevaplanır"""
+
+    def __init__(self, server):
+        self.server = server
+        self.conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        self.transport = None
+        self._window_updated = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        with self.server.lock:
+            self.server.connection_count += 1
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        try:
+            events = self.conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.write(self.conn.data_to_send())
+            self.transport.close()
+            return
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                path = dict(event.headers).get(b':path', b'/').decode('utf-8')
+                asyncio.ensure_future(self._respond(event.stream_id, path))
+            elif isinstance(event, h2.events.WindowUpdated):
+                self._window_updated.set()
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    async def _respond(self, stream_id, path):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        if server.latency:
+            await asyncio.sleep(server.latency)
+        status, *body = route_request(server.site, path)
+        data, content_type = encode_body(*body)
+        try:
+            self.conn.send_headers(stream_id, [
+                (':status', str(status)),
+                ('content-type', content_type),
+                ('content-length', str(len(data))),
+            ])
+            # Büyük gövdeler (Raven sayfaları) akış kontrol penceresi açıldıkça gönderilir
+            while data:
+                window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                if window <= 0:
+                    self._window_updated.clear()
+                    await self._window_updated.wait()
+                    continue
+                self.conn.send_data(stream_id, data[:window])
+                data = data[window:]
+                self.transport.write(self.conn.data_to_send())
+            self.conn.end_stream(stream_id)
+        except h2.exceptions.StreamClosedError:
+            return  # İstemci stream'i iptal etti
+        self.transport.write(self.conn.data_to_send())
+
+
+class H2StubServer:
+    """
+    HTTP/2 (h2c, prior knowledge) konuşan stub site sunucusu
+
+    Aynı sentetik cevapları StubServer ile paylaşır; tek bağlantı üzerinden
+    çoklanan (multiplexed) istemciyi HTTP/1.1 havuzuyla karşılaştırmak için
+    kullanılır. TLS/ALPN yoktur, istemci HTTP/2'yi doğrudan başlatmalıdır.
+    """
+
+    def __init__(self, site, host='127.0.0.1', port=0, latency=0.0):
+        if h2 is None:
+            raise RuntimeError("HTTP/2 stub için h2 paketi gerekli (pip install h2)")
+        self.site = site
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.connection_count = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                self._loop.create_server(lambda: _H2StubProtocol(self), self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        def close():
+            self._server.close()
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(close)
+        self._thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stub kaynak siteleri')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', default=None, help='http_recorder ile kaydedilmiş cevaplar')
+    args = parser.parse_args()
+
+    servers = [
+        StubServer(site, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                   fixtures_dir=args.fixtures).start()
+        for site in SITE_HOSTS
+    ]
+    for site, server in zip(SITE_HOSTS, servers):
+        print(f"🧪 {site}: {server.base_url}")
+    print("Durdurmak için CTRL+C")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
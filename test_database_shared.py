@@ -0,0 +1,60 @@
+"""
+Paylaşımlı mod (DATABASE_SHARED) günlük testi
+
+Çalıştırma: python test_database_shared.py  (ya da pytest)
+"""
+import os
+import tempfile
+
+from database import DatabaseManager
+
+
+def _open(path):
+    return DatabaseManager(path, shared=True)
+
+
+def test_reader_survives_repeated_compaction():
+    """Okuyucu boştayken diğer worker iki+ kez sıkıştırsa da kayıt kaybolmamalı"""
+    old_max = os.environ.get('DATABASE_JOURNAL_MAX_BYTES')
+    os.environ['DATABASE_JOURNAL_MAX_BYTES'] = '400'
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'database.json')
+            writer = _open(path)
+            reader = _open(path)
+            try:
+                for i in range(40):
+                    writer.add_or_update_user(f'device{i}', f'token{i}', ['Solo Leveling'])
+                    if i % 10 == 0:
+                        writer.compact()
+                writer.compact()
+                writer.compact()
+
+                assert len(reader.get_all_users()) == 40
+                assert reader.get_subscriber_count('Solo Leveling') == 40
+                assert reader.reloads == 1
+
+                # Okuyucunun yazıp sıkıştırması diğer worker'ın kayıtlarını silmemeli
+                reader.add_or_update_user('reader', 'token', ['Lookism'])
+                reader.compact()
+                assert len(writer.get_all_users()) == 41
+                assert writer.reloads == 0
+            finally:
+                writer.close()
+                reader.close()
+
+            fresh = _open(path)
+            try:
+                assert len(fresh.get_all_users()) == 41
+            finally:
+                fresh.close()
+    finally:
+        if old_max is None:
+            os.environ.pop('DATABASE_JOURNAL_MAX_BYTES', None)
+        else:
+            os.environ['DATABASE_JOURNAL_MAX_BYTES'] = old_max
+
+
+if __name__ == "__main__":
+    test_reader_survives_repeated_compaction()
+    print("✅ Paylaşımlı günlük testi geçti")